@@ -44,13 +44,20 @@ GLOBAL_COMPILER = None
 
 
 def get_grammar() -> Lark:
+    """
+    Returns the mcscript grammar.
+    Its transformer is a `ParseEvents` instance, which records the variable accesses for the analyzer while parsing.
+    Use `ParseEvents.parse` to get these events.
+    """
     global GLOBAL_GRAMMAR
     if GLOBAL_GRAMMAR is None:
+        from mcscript.analyzer.ParseEvents import ParseEvents
         GLOBAL_GRAMMAR = Lark(
             resources.read_text("mcscript", "McScript.lark"),
             parser="lalr",
             propagate_positions=True,
-            maybe_placeholders=True
+            maybe_placeholders=True,
+            transformer=ParseEvents()
         )
         Logger.debug("Grammar loaded")
     return GLOBAL_GRAMMAR
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple, Union
+
+from lark import Lark, Tree, Token
+from lark.visitors import Transformer_InPlace
+
+
+@dataclass()
+class VariableEvent:
+    """
+    An access to a variable.
+
+    kind is one of
+        - "read": reads the variable if it exists
+        - "assign": declares the variable or writes to it if it exists
+        - "update": writes to the variable, which must exist
+        - "index_update": writes to an index of the variable, which must exist
+    """
+    kind: str
+    identifier: str
+    access: Tree
+
+    @property
+    def start_pos(self) -> int:
+        return self.access.meta.start_pos
+
+
+@dataclass()
+class ScopeEvent:
+    """
+    Closes the scope of a block. The scope contains all events after `open_index`.
+    """
+    block: Tree
+    # variables that are declared when the scope opens, ie. function parameters
+    declarations: List[Tuple[str, Union[Tree, Token]]] = field(default_factory=list)
+    # the scope starts before the block, ie. for the iterable of a for loop
+    start_position: Optional[int] = None
+    open_index: int = -1
+
+    @property
+    def start_pos(self) -> int:
+        if self.start_position is not None:
+            return self.start_position
+        return self.block.meta.start_pos
+
+
+Event = Union[VariableEvent, ScopeEvent]
+
+
+class ParseEvents(Transformer_InPlace):
+    """
+    Records the variable accesses and scopes of a mcscript program while it is parsed.
+
+    The callbacks are called by the lalr parser every time a rule is reduced, so the events are stored in postorder.
+    The trees are not modified. Use `Analyzer.analyze` to resolve the events to variable contexts.
+
+    The parser is shared, so the events are stored per thread and several threads can parse at once.
+    Parsing is not reentrant within a thread, which `parse` asserts.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @property
+    def events(self) -> List[Event]:
+        """ The events of the rules reduced so far in this thread """
+        if not hasattr(self._local, "events"):
+            self._local.events = []
+        return self._local.events
+
+    def parse(self, parser: Lark, code: str) -> Tuple[Tree, List[Event]]:
+        """
+        Parses the code with a parser that uses this transformer.
+
+        Returns:
+            the tree and the events that were recorded while parsing it
+        """
+        if getattr(self._local, "parsing", False):
+            raise RuntimeError("Parsing is not reentrant: the parser is already running in this thread")
+
+        self._local.parsing = True
+        # clear the events of a previous parse that failed
+        self._local.events = []
+        try:
+            tree = parser.parse(code)
+            return tree, self._local.finished_events
+        finally:
+            self._local.parsing = False
+            self._local.finished_events = None
+
+    def start(self, tree: Tree) -> Tree:
+        # the whole program was parsed. The events are only kept for `parse`, which returns them
+        if getattr(self._local, "parsing", False):
+            self._local.finished_events = self.events
+        self._local.events = []
+        return tree
+
+    def block(self, tree: Tree) -> Tree:
+        self.events.append(ScopeEvent(tree))
+        return tree
+
+    def struct_block(self, tree: Tree) -> Tree:
+        self.events.append(ScopeEvent(tree))
+        return tree
+
+    def function_definition(self, tree: Tree) -> Tree:
+        *_, parameter_list, _return_type, _body = tree.children
+        # the body is the last rule that was reduced
+        scope = self.events[-1]
+        self_type, *parameters = parameter_list.children
+
+        if self_type:
+            scope.declarations.append((str(self_type), self_type))
+        for parameter in parameters:
+            name, _type = parameter.children
+            scope.declarations.append((str(name), parameter))
+        return tree
+
+    def control_for(self, tree: Tree) -> Tree:
+        _, var, _, expression, _block = tree.children
+        # the iterable is evaluated in the scope of the loop body
+        scope = self.events[-1]
+        scope.declarations.append((str(var), var))
+        scope.start_position = expression.meta.start_pos
+        return tree
+
+    def declaration(self, tree: Tree) -> Tree:
+        accessor, _expression = tree.children
+
+        # for now, treat every property of an object as the object itself
+        identifier, *_ignore_children = accessor.children
+        self.events.append(VariableEvent("assign", str(identifier), tree))
+        return tree
+
+    def multi_declaration(self, tree: Tree) -> Tree:
+        *values, _expression = tree.children
+
+        for value in values:
+            identifier, *_ignore_children = value.children
+            self.events.append(VariableEvent("assign", str(identifier), tree))
+        return tree
+
+    def variable_update(self, tree: Tree) -> Tree:
+        accessor, expression = tree.children
+
+        # for now, treat every property of an object as the object itself
+        identifier, *_ignore_children = accessor.children
+        self.events.append(VariableEvent("assign", str(identifier), expression))
+        return tree
+
+    def operation_ip(self, tree: Tree) -> Tree:
+        accessor, _operator, _expression = tree.children
+
+        identifier, *_ = accessor.children
+        self.events.append(VariableEvent("update", str(identifier), tree))
+        return tree
+
+    def index_setter(self, tree: Tree) -> Tree:
+        accessor, _index, _expression = tree.children
+
+        identifier, *not_implemented = accessor.children
+        if not not_implemented:
+            self.events.append(VariableEvent("index_update", str(identifier), tree))
+        return tree
+
+    def value(self, tree: Tree) -> Tree:
+        value, = tree.children
+
+        # simply extract the accessor part
+        if isinstance(value, Tree) and value.data == "array_accessor":
+            value = value.children[0]
+
+        if isinstance(value, Tree) and value.data == "accessor":
+            identifier, *not_implemented = value.children
+            if not not_implemented:
+                self.events.append(VariableEvent("read", str(identifier), tree))
+        elif isinstance(value, Tree) and value.data == "function_call":
+            accessor, *_arguments = value.children
+            base_obj, *children = accessor.children
+            if children:
+                self.events.append(VariableEvent("assign", str(base_obj), value))
+        return tree
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from lark import Tree
 
@@ -33,6 +33,22 @@ class VariableContext:
 
 @dataclass()
 class NamespaceContext:
-    variables: List[VariableContext]
-    inner_contexts: List[NamespaceContext]
+    """
+    The scope of a block. Scopes form a tree, so every scope only stores the variables declared in itself.
+    """
     definition: Tuple[int, int]
+    parent: Optional[NamespaceContext] = field(default=None, repr=False, compare=False)
+    variables: Dict[str, VariableContext] = field(default_factory=dict)
+    children: List[NamespaceContext] = field(default_factory=list, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.parent is not None:
+            self.parent.children.append(self)
+
+    def descendants(self) -> Iterator[NamespaceContext]:
+        """ Iterates over all scopes that are nested in this scope """
+        stack = list(reversed(self.children))
+        while stack:
+            context = stack.pop()
+            yield context
+            stack.extend(reversed(context.children))
@@ -1,27 +1,74 @@
+from __future__ import annotations
+
 import json
-from typing import Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from mcscript import Logger
+from mcscript.assets import data_store
+from mcscript.assets.block_table import BlockTable, load_block_table
 from mcscript.assets.data_generator import makeData
 
 
 class DataManager:
-    def __init__(self, version: str = None):
+    """
+    Provides the minecraft data of a version.
+    The data is loaded on first use from the data store, which shares identical parts between versions.
+    """
+    _managers: Dict[Tuple[Optional[str], Optional[str]], DataManager] = {}
+
+    def __init__(self, version: str = None, server_jar: str = None):
         self.version = version
-        self.data: Optional[Dict] = None
+        self.server_jar = server_jar
+        self.manifest: Optional[Dict] = None
+        self.block_table: Optional[BlockTable] = None
+        self.registries: Dict[Tuple[str, ...], Dict[str, int]] = {}
+
+    @classmethod
+    def get(cls, version: str = None, server_jar: str = None) -> DataManager:
+        """ Returns the shared data manager for a version, so that every version is loaded at most once """
+        key = version, server_jar
+        if key not in cls._managers:
+            cls._managers[key] = DataManager(version, server_jar)
+        return cls._managers[key]
 
     def assertData(self):
-        if self.data is None:
-            file = makeData(self.version)
+        if self.manifest is None:
+            file = makeData(self.version, self.server_jar)
             with open(file, encoding="utf-8") as f:
                 try:
-                    self.data = json.load(f)
+                    self.manifest = json.load(f)
                 except Exception as e:
                     Logger.info("[DataManager] could not parse json.\n" + f.read())
                     raise e
 
-    def get_data(self, key: str = None) -> Dict:
+    def get_data(self, key: str) -> Any:
+        """ Returns a part of the data, like `blocks` or `registries` """
         self.assertData()
-        if not key:
-            return self.data
-        return self.data[key]
+        if key == "registries":
+            return {name: data_store.get(value) for name, value in self.manifest["registries"].items()}
+        return data_store.get(self.manifest["objects"][key])
+
+    def get_block_table(self) -> BlockTable:
+        """ Returns the blocks as memory-mapped table, which loads much faster than the json data """
+        if self.block_table is None or self.block_table.closed:
+            self.assertData()
+            self.block_table = load_block_table(self.manifest["objects"]["blocks"])
+        return self.block_table
+
+    def get_registry(self, *names: str) -> Dict[str, int]:
+        """
+        Returns the protocol ids of the entries of a registry from the registries report.
+        The first of `names` that exists is used, because some registries were renamed between versions.
+
+        Raises:
+            KeyError: if none of the registries exists
+        """
+        if names not in self.registries:
+            self.assertData()
+            registries = self.manifest["registries"]
+            key = next((registries[name] for name in names if name in registries), None)
+            if key is None:
+                raise KeyError(f"Unknown registry {names[0]}")
+            entries = data_store.get(key)["entries"]
+            self.registries[names] = {entry: value["protocol_id"] for entry, value in entries.items()}
+        return self.registries[names]
@@ -0,0 +1,161 @@
+"""
+A compact binary form of the blocks report, which can be memory-mapped instead of parsing the json data.
+
+Layout, all numbers are unsigned 32 bit integers in native byte order:
+    header:      magic, format version, block count, blockstate count, value count, string count, string bytes
+    blocks:      (name, first state id, first blockstate, blockstate count) per block
+    blockstates: (name, first value, value count) per blockstate
+    values:      string index per blockstate value
+    strings:     the offsets of all strings in the string pool followed by the end of the last string
+    string pool: all strings utf-8 encoded
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from array import array
+from os.path import exists
+from typing import Dict, List, Tuple
+
+from mcscript.assets import data_store
+
+MAGIC = int.from_bytes(b"MCSB", "little")
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("=7I")
+_BLOCK_FIELDS = 4
+_BLOCKSTATE_FIELDS = 3
+
+# the mapped tables by the hash of their blocks report
+_TABLES: Dict[str, BlockTable] = {}
+
+
+class BlockTable:
+    """
+    Read-only view of a block table file.
+    The arrays are views on the mapped file, so only the accessed strings are decoded.
+    """
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        self.closed = False
+        magic, version, blocks, blockstates, values, strings, _ = _HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Not a block table or the format version is outdated")
+
+        integers = memoryview(buffer)[_HEADER.size:].cast("B")
+        integers = integers[:(len(integers) // 4) * 4].cast("I")
+        offset = 0
+        self._blocks = integers[offset:offset + blocks * _BLOCK_FIELDS]
+        offset += blocks * _BLOCK_FIELDS
+        self._blockstates = integers[offset:offset + blockstates * _BLOCKSTATE_FIELDS]
+        offset += blockstates * _BLOCKSTATE_FIELDS
+        self._values = integers[offset:offset + values]
+        offset += values
+        self._string_offsets = integers[offset:offset + strings + 1]
+        offset += strings + 1
+        self._string_pool = memoryview(buffer)[_HEADER.size + offset * 4:]
+
+        self.block_count = blocks
+
+    def string(self, index: int) -> str:
+        return str(self._string_pool[self._string_offsets[index]:self._string_offsets[index + 1]], "utf-8")
+
+    def block_name(self, block: int) -> str:
+        return self.string(self._blocks[block * _BLOCK_FIELDS])
+
+    def block_index(self, block: int) -> int:
+        """ The first state id of the block """
+        return self._blocks[block * _BLOCK_FIELDS + 1]
+
+    def blockstates(self, block: int) -> List[Tuple[str, List[str]]]:
+        """ The names and values of the blockstates of the block """
+        first, count = self._blocks[block * _BLOCK_FIELDS + 2:block * _BLOCK_FIELDS + 4]
+        result = []
+        for blockstate in range(first, first + count):
+            name, first_value, value_count = \
+                self._blockstates[blockstate * _BLOCKSTATE_FIELDS:(blockstate + 1) * _BLOCKSTATE_FIELDS]
+            values = [self.string(i) for i in self._values[first_value:first_value + value_count]]
+            result.append((self.string(name), values))
+        return result
+
+    def close(self):
+        """ Releases the views on the buffer and closes a mapped file. The table can not be used afterwards. """
+        if self.closed:
+            return
+        for view in (self._blocks, self._blockstates, self._values, self._string_offsets, self._string_pool):
+            view.release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self.closed = True
+
+
+def write_block_table(report: Dict, path: str):
+    """ Writes the blocks report of the minecraft data generator as block table """
+    strings: Dict[str, int] = {}
+
+    def intern(string: str) -> int:
+        return strings.setdefault(string, len(strings))
+
+    blocks, blockstates, values = array("I"), array("I"), array("I")
+    for name, block in report.items():
+        properties = block.get("properties", {})
+        first_state = min(state["id"] for state in block["states"])
+        blocks.extend((intern(name), first_state, len(blockstates) // _BLOCKSTATE_FIELDS, len(properties)))
+        for property_name, property_values in properties.items():
+            blockstates.extend((intern(property_name), len(values), len(property_values)))
+            values.extend(intern(value) for value in property_values)
+
+    pool = bytearray()
+    offsets = array("I")
+    for string in strings:
+        offsets.append(len(pool))
+        pool += string.encode("utf-8")
+    offsets.append(len(pool))
+
+    # write to a temporary file first, so that a concurrent reader never sees a partial file.
+    # On Windows the replace fails while another process maps the old file, but the tables are content addressed
+    # and their path contains the format version, so an existing table is only replaced if it is broken.
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(blocks) // _BLOCK_FIELDS,
+                             len(blockstates) // _BLOCKSTATE_FIELDS, len(values), len(strings), len(pool)))
+        for integers in (blocks, blockstates, values, offsets):
+            integers.tofile(f)
+        f.write(pool)
+    os.replace(temp_path, path)
+
+
+def load_block_table(key: str) -> BlockTable:
+    """
+    Maps the block table of a blocks report in the data store.
+    The table is created next to the report on first use and shared by all versions with the same blocks.
+    """
+    if key not in _TABLES or _TABLES[key].closed:
+        path = data_store.object_path(key) + f".blocks.{FORMAT_VERSION}.bin"
+        if not _is_current(path):
+            write_block_table(data_store.get(key), path)
+        _TABLES[key] = _map(path)
+    return _TABLES[key]
+
+
+def close_block_tables():
+    """ Closes all mapped tables. A table that is loaded again is mapped again. """
+    for table in _TABLES.values():
+        table.close()
+    _TABLES.clear()
+
+
+def _map(path: str) -> BlockTable:
+    with open(path, "rb") as f:
+        return BlockTable(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def _is_current(path: str) -> bool:
+    if not exists(path):
+        return False
+
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+    return len(header) == _HEADER.size and _HEADER.unpack(header)[:2] == (MAGIC, FORMAT_VERSION)
@@ -1,18 +1,29 @@
 import json
+import shutil
 import tempfile
-from os.path import exists, join, split
+import zipfile
+from os.path import exists, join
 from subprocess import run
-from typing import Dict
+from typing import Dict, Optional
 
 from mcscript import Logger, assets
-from mcscript.assets.download import download_minecraft_server, get_latest_version
+from mcscript.assets import data_store
+from mcscript.assets.download import get_latest_version, get_minecraft_server
+from mcscript.assets.downloader import file_sha1
 from mcscript.utils.dirPaths import getVersionDir
 
+# the reports written by the data generator that are stored in the data file
+REPORTS = ("blocks", "commands", "registries")
 
-def makeData(version: str) -> str:
+
+def makeData(version: str, server_jar: Optional[str] = None) -> str:
     """
-    writes all important minecraft data to a file and returns the path
+    writes all important minecraft data to the data store and returns the path of the manifest of the version.
     Note that this wil crash if the version is below 1.14.
+
+    Args:
+        version: the minecraft version or None for the latest release
+        server_jar: a local server jar of that version, which is used instead of downloading the server
     """
 
     version = version or get_latest_version()
@@ -27,46 +38,103 @@ def makeData(version: str) -> str:
                 if data.get("version", 0) != assets.__version__:
                     Logger.warn(f"File '{file}' uses old version format {data.get('version', 0)} "
                                 f"(Required {assets.__version__})")
+                elif not data_store.is_complete(data):
+                    Logger.warn(f"Missing data for version {version}")
                 else:
                     Logger.debug(f"Already got data for version {version}")
                     return file
             except json.JSONDecodeError:
                 pass
 
-    contents = getDataJson(version)
-    contents["version"] = assets.__version__
+    manifest = data_store.put_data(getDataJson(version, server_jar))
+    manifest["version"] = assets.__version__
     with open(file, "w+") as f:
-        json.dump(contents, f)
+        json.dump(manifest, f)
     Logger.info(f"Create data file {file}")
     return file
 
 
-def getDataJson(version: str) -> Dict:
+def getDataJson(version: str, server_jar: Optional[str] = None) -> Dict:
     """ Creates a json file containing all important minecraft data"""
-    def getBlocks(path: str) -> Dict:
-        """ returns a dict containing all blocks and blockstates"""
-        file = join(path, "reports", "blocks.json")
-        with open(file) as f:
-            data = json.load(f)
-        return {
-            "blocks": data
-        }
+    return readReports(getReports(version, server_jar))
 
-    with tempfile.TemporaryDirectory() as tempdir:
-        generated = runDataGenerator(version, tempdir)
-        return getBlocks(generated)
 
+def readReports(path: str) -> Dict:
+    """
+    Reads the reports of the data generator.
+    Items and entities are the ids of the respective registries.
+    """
+    data = {}
+    for report in REPORTS:
+        with open(join(path, f"{report}.json"), encoding="utf-8") as f:
+            data[report] = json.load(f)
+
+    registries = data["registries"]
+    data["items"] = list(registries["minecraft:item"]["entries"])
+    data["entities"] = list(registries["minecraft:entity_type"]["entries"])
+    return data
+
+
+def getReports(version: str, server_jar: Optional[str] = None) -> str:
+    """
+    Returns the directory of the generated reports for the version.
+    The reports are cached in the version directory together with the checksum of the jar they were generated from.
+    They are only generated again if a different local jar is given, so no download is needed once they exist.
+    """
+    generated = join(getVersionDir(version), "generated")
+    reports = join(generated, "reports")
+    checksum_file = join(generated, "server.sha1")
 
-def runDataGenerator(version: str, fpath: str) -> str:
-    """ Downloads the versions, runs the data generator and returns the full path to the generated data"""
-    path, file = split(download_minecraft_server(version, fpath))
+    checksum = file_sha1(server_jar) if server_jar is not None else None
+    if exists(checksum_file) and all(exists(join(reports, f"{report}.json")) for report in REPORTS):
+        with open(checksum_file) as f:
+            if checksum is None or f.read() == checksum:
+                Logger.debug(f"[Assets] Using cached reports for version {version}")
+                return reports
+
+    if server_jar is None:
+        server_jar = get_minecraft_server(version)
+        checksum = file_sha1(server_jar)
+
+    # the reports are cached for this version, so they must not be generated by the jar of another version
+    jar_version = getJarVersion(server_jar)
+    if jar_version is not None and jar_version != version:
+        raise ValueError(f"[Assets] The server jar '{server_jar}' is for version {jar_version}, not {version}")
+
+    shutil.rmtree(generated, ignore_errors=True)
+    runDataGenerator(server_jar, generated)
+    with open(checksum_file, "w") as f:
+        f.write(checksum)
+    return reports
+
+
+def getJarVersion(server_jar: str) -> Optional[str]:
+    """ Returns the version id of a server jar, or None if the jar has no version.json (before 1.14) """
+    with zipfile.ZipFile(server_jar) as jar:
+        if "version.json" not in jar.namelist():
+            return None
+        return json.loads(jar.read("version.json"))["id"]
+
+
+def runDataGenerator(server_jar: str, output: str):
+    """ Runs the data generator of the server jar and writes the reports to `output`"""
     Logger.info("[Assets] generating minecraft data...")
 
     # test if java is installed
-    process = run(["java", "-version"], cwd=path)
+    process = run(["java", "-version"])
     Logger.info("Process java version result: {}".format(process.returncode))
 
-    completedProcess = run(["java", "-cp", file, "net.minecraft.data.Main", "-all"], cwd=path)
-    completedProcess.check_returncode()
+    # only the reports are needed, which is much faster than generating all data
+    arguments = ["net.minecraft.data.Main", "--reports", "--output", output]
+    with zipfile.ZipFile(server_jar) as jar:
+        # since 1.18 the server jar bundles its libraries and has to unpack them first
+        is_bundler = "META-INF/versions.list" in jar.namelist()
+    if is_bundler:
+        command = ["java", "-DbundlerMainClass=net.minecraft.data.Main", "-jar", server_jar, *arguments[1:]]
+    else:
+        command = ["java", "-cp", server_jar, *arguments]
 
-    return join(path, "generated")
+    # the data generator writes its logs and libraries to the working directory
+    with tempfile.TemporaryDirectory() as tempdir:
+        completedProcess = run(command, cwd=tempdir)
+    completedProcess.check_returncode()
@@ -0,0 +1,65 @@
+"""
+A content-addressed store for the minecraft data that is shared by all versions.
+
+Every part of the data (a report or a single registry) is stored once under the sha1 of its json,
+so versions with identical blocks or registries share the same files and the data file of a version
+only records the hashes of its parts:
+    {
+        "version": data format,
+        "objects": {"blocks": hash, "commands": hash, "items": hash, "entities": hash},
+        "registries": {registry name: hash}
+    }
+Parsed parts are cached by hash, so loading several versions in one process parses every distinct part once.
+"""
+import hashlib
+import json
+import os
+from os import makedirs
+from os.path import exists, join
+from typing import Any, Dict
+
+from mcscript.utils.dirPaths import ASSET_DIRECTORY
+
+OBJECT_DIR = join(ASSET_DIRECTORY, "objects")
+
+_OBJECTS: Dict[str, Any] = {}
+
+
+def object_path(key: str) -> str:
+    return join(OBJECT_DIR, key[:2], key)
+
+
+def put(content: Any) -> str:
+    """ Stores the content if it is not stored yet and returns its hash """
+    data = json.dumps(content, separators=(",", ":")).encode("utf-8")
+    key = hashlib.sha1(data).hexdigest()
+    path = object_path(key)
+    if not exists(path):
+        makedirs(join(OBJECT_DIR, key[:2]), exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+    return key
+
+
+def get(key: str) -> Any:
+    """ Returns the parsed content of a stored object """
+    if key not in _OBJECTS:
+        with open(object_path(key), encoding="utf-8") as f:
+            _OBJECTS[key] = json.load(f)
+    return _OBJECTS[key]
+
+
+def put_data(data: Dict) -> Dict:
+    """ Stores the data of a version and returns its manifest without the format version """
+    registries = data["registries"]
+    return {
+        "objects": {key: put(value) for key, value in data.items() if key != "registries"},
+        "registries": {name: put(registry) for name, registry in registries.items()}
+    }
+
+
+def is_complete(manifest: Dict) -> bool:
+    """ Whether all objects of the manifest are stored """
+    keys = [*manifest.get("objects", {}).values(), *manifest.get("registries", {}).values()]
+    return bool(keys) and all(exists(object_path(key)) for key in keys)
@@ -1,21 +1,26 @@
+import asyncio
 import json
-from os.path import join
+import os
+from functools import lru_cache
+from os.path import exists, getmtime, join
+from time import time
 from typing import Dict
-from urllib.request import urlopen
 
-import certifi
 import click
 
 from mcscript import Logger
-from mcscript.utils.utils import run_function_once
+from mcscript.assets.downloader import download_file, file_sha1, read_url
+from mcscript.utils.dirPaths import ASSET_DIRECTORY, getVersionDir
 
 VERSION_MANIFEST_URL = "https://launchermeta.mojang.com/mc/game/version_manifest.json"
+# the time in seconds for which the version manifest is cached
+MANIFEST_TTL = 24 * 60 * 60
 
 
-@run_function_once
 def downloadVersionManifest() -> Dict:
     """
-    Downloads the minecraft version manifest and returns it parsed as a dictionary
+    Downloads the minecraft version manifest and returns it parsed as a dictionary.
+    The manifest is cached for `MANIFEST_TTL` seconds. If it can not be downloaded, an outdated cached manifest is used.
 
     Format:
         {
@@ -37,14 +42,38 @@ def downloadVersionManifest() -> Dict:
     Returns:
         The version manifest
     """
+    path = join(ASSET_DIRECTORY, "version_manifest.json")
+    if exists(path) and time() - getmtime(path) < MANIFEST_TTL:
+        return _read_manifest(path)
+
     Logger.info("[Assets] Fetching version manifest...")
-    request = _get(VERSION_MANIFEST_URL)
-    manifest = json.load(request)
+    try:
+        data = read_url(VERSION_MANIFEST_URL)
+    except ConnectionError:
+        if not exists(path):
+            raise
+        Logger.warning("[Assets] Could not fetch version manifest, using the cached manifest")
+        return _read_manifest(path)
+
+    with open(path + ".tmp", "wb") as f:
+        f.write(data)
+    os.replace(path + ".tmp", path)
     Logger.info("[Assets] Successfully fetched version manifest")
+    return _read_manifest(path)
+
+
+@lru_cache()
+def _read_manifest_cached(path: str, mtime: float) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
     Logger.debug(manifest)
     return manifest
 
 
+def _read_manifest(path: str) -> Dict:
+    return _read_manifest_cached(path, getmtime(path))
+
+
 def get_latest_version() -> str:
     return downloadVersionManifest()["latest"]["release"]
 
@@ -71,53 +100,69 @@ def getVersionUrl(version_id: str) -> str:
     raise ValueError(f"Could not find version '{version_id}'")
 
 
-def download_minecraft_server(version_id: str, target: str) -> str:
+def get_version_json(version_id: str) -> Dict:
+    """
+    Returns the version json of a version.
+    The json is cached in the version directory, so it is only downloaded once.
+    """
+    path = join(getVersionDir(version_id), "version.json")
+    if exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    url = getVersionUrl(version_id)
+    Logger.info(f"[Assets] Downloading minecraft server json at {url}")
+    version = json.loads(read_url(url))
+    Logger.info("[Assets] Downloaded version.json")
+    Logger.debug(version)
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(version, f)
+    return version
+
+
+def get_minecraft_server(version_id: str) -> str:
     """
-    Downloads the minecraft server for version `version_id` and returns the full path.
+    Returns the path of the server jar for a version.
+    The jar is cached in the version directory and downloaded again if its checksum does not match.
 
     Args:
         version_id: the id for the version
-        target: the target directory
 
     Returns:
         The full file path to `server.jar`
+    """
+    server = get_version_json(version_id)["downloads"]["server"]
+    fpath = join(getVersionDir(version_id), "server.jar")
+    if exists(fpath) and file_sha1(fpath) == server["sha1"]:
+        Logger.debug(f"[Assets] Using cached server jar {fpath}")
+        return fpath
+
+    return download_minecraft_server(version_id, fpath)
+
 
+def download_minecraft_server(version_id: str, fpath: str) -> str:
     """
-    url = getVersionUrl(version_id)
+    Downloads the minecraft server for version `version_id` and verifies its checksum.
+    An interrupted download is resumed.
 
-    Logger.info(f"[Assets] Downloading minecraft server json at {url}")
+    Args:
+        version_id: the id for the version
+        fpath: the target file
 
-    version = json.load(_get(url))
+    Returns:
+        The full file path to the server jar
 
-    Logger.info("[Assets] Downloaded version.json")
-    Logger.debug(version)
+    Raises:
+        ConnectionError: if the download fails or does not match the checksum of the version json
+    """
+    version = get_version_json(version_id)
+    server = version["downloads"]["server"]
 
-    server_url = version["downloads"]["server"]["url"]
     Logger.info(f"[Assets] Starting to download server {version['id']}...")
-    with _get(server_url) as server:
-        download_size = server.length
-        with click.progressbar(length=download_size, label="Downloading server jar") as bar:
-            fpath = join(target, "server.jar")
-            with open(fpath, "wb+") as f:
-                while chunk := server.read(16384):
-                    f.write(chunk)
-                    bar.update(len(chunk))
-        Logger.info(f"[Assets] Downloaded {download_size / 1000000:.2f} mb")
-        Logger.info(f"[Assets] Created server.jar at {fpath}")
+    with click.progressbar(length=server["size"], label="Downloading server jar") as bar:
+        asyncio.run(download_file(server["url"], fpath, server["sha1"], server["size"], progress=bar.update))
+    Logger.info(f"[Assets] Downloaded {server['size'] / 1000000:.2f} mb")
+    Logger.info(f"[Assets] Created server jar at {fpath}")
 
     return fpath
-
-
-def _get(url: str):
-    try:
-        request = urlopen(url, cafile=certifi.where(), timeout=20)
-    except Exception as e:
-        raise ConnectionError(f"[Assets] Request 'GET {url}' failed") from e
-    if request is None:
-        raise ConnectionError(f"Could not download the version manifest file")
-    if request.status != 200:
-        raise ConnectionError(
-            f"Could not download the version manifest file: Bad response <{request.status} {request.msg}>"
-        )
-
-    return request
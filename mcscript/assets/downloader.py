@@ -0,0 +1,183 @@
+"""
+Downloads large files with several connections in parallel.
+
+The file is split into parts which are downloaded with http range requests into separate part files.
+An interrupted download resumes every part where it stopped, and the finished file is verified with its sha1.
+The blocking requests of urllib run in the default executor of the event loop, so no http library is needed.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import re
+import ssl
+from os.path import exists, getsize
+from typing import Callable, List, Optional, Tuple
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import certifi
+
+TIMEOUT = 20
+# the size of the parts that are downloaded in parallel
+PART_SIZE = 1 << 22
+READ_SIZE = 1 << 16
+CONNECTIONS = 4
+RETRIES = 3
+
+_CONTENT_RANGE = re.compile(r"bytes \d+-\d+/(\d+)")
+_SSL_CONTEXT = ssl.create_default_context(cafile=certifi.where())
+
+Progress = Callable[[int], None]
+
+
+def request(url: str, start: int = None, end: int = None):
+    """
+    Opens a GET request, optionally for the bytes from `start` up to `end` exclusive.
+
+    Raises:
+        ConnectionError: if the request fails
+    """
+    headers = {}
+    if start is not None:
+        headers["Range"] = f"bytes={start}-{'' if end is None else end - 1}"
+    try:
+        return urlopen(Request(url, headers=headers), timeout=TIMEOUT, context=_SSL_CONTEXT)
+    except HTTPError as e:
+        raise ConnectionError(f"[Assets] Request 'GET {url}' failed: Bad response <{e.code} {e.reason}>") from e
+    except OSError as e:
+        raise ConnectionError(f"[Assets] Request 'GET {url}' failed") from e
+
+
+def read_url(url: str) -> bytes:
+    """ Downloads a small file at once """
+    with request(url) as response:
+        return response.read()
+
+
+def file_sha1(path: str) -> str:
+    """ Returns the hex sha1 of a file """
+    checksum = hashlib.sha1()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
+
+def get_size(url: str) -> Optional[int]:
+    """ Returns the size of the file if the server supports range requests, otherwise None """
+    with request(url, 0, 1) as response:
+        if response.status != 206:
+            return None
+        match = _CONTENT_RANGE.fullmatch(response.headers.get("Content-Range", ""))
+        return int(match.group(1)) if match else None
+
+
+def parts(size: int, part_size: int = PART_SIZE) -> List[Tuple[int, int]]:
+    """
+    Splits a file into parts of `part_size` bytes
+
+    >>> parts(10, 4)
+    [(0, 4), (4, 8), (8, 10)]
+    """
+    return [(start, min(start + part_size, size)) for start in range(0, size, part_size)]
+
+
+def download_part(url: str, path: str, start: int, end: Optional[int], progress: Progress):
+    """
+    Downloads the bytes from `start` to `end` into the part file at `path`.
+    If the part file already contains some bytes, only the missing bytes are requested.
+    Without `end` the whole file is downloaded without range requests.
+    """
+    done = getsize(path) if exists(path) and end is not None else 0
+    progress(done)
+    for attempt in range(RETRIES):
+        if end is not None and start + done >= end:
+            return
+        try:
+            response = request(url, start + done, end) if end is not None else request(url)
+            if end is not None and response.status != 206:
+                response.close()
+                raise ConnectionError(f"[Assets] Server of '{url}' does not support range requests")
+            length = response.headers.get("Content-Length")
+            with response, open(path, "ab" if done else "wb") as f:
+                while chunk := response.read(READ_SIZE):
+                    f.write(chunk)
+                    done += len(chunk)
+                    progress(len(chunk))
+            if end is None:
+                # the read ends normally if the connection closes early
+                if length is not None and done != int(length):
+                    raise ConnectionError(f"[Assets] Download of '{url}' ended after {done} of {length} bytes")
+                return
+        except (ConnectionError, OSError):
+            # without range support the download has to start again
+            if end is None:
+                progress(-done)
+                done = 0
+            if attempt == RETRIES - 1:
+                raise
+    if end is not None and start + done < end:
+        raise ConnectionError(f"[Assets] Download of '{url}' ended after {start + done} of {end} bytes")
+
+
+async def download_file(url: str, path: str, sha1: str = None, size: int = None, connections: int = CONNECTIONS,
+                        part_size: int = PART_SIZE, progress: Progress = None) -> str:
+    """
+    Downloads a file with up to `connections` parallel requests.
+    The parts are kept if the download fails, so calling this function again resumes the download.
+
+    Args:
+        url: the url of the file
+        path: the target file
+        sha1: the expected hex sha1 of the file
+        size: the size of the file if it is known
+        connections: the maximum amount of parallel requests
+        part_size: the size of the parts that are downloaded in parallel
+        progress: called with the amount of newly downloaded bytes
+
+    Returns:
+        The path of the file
+
+    Raises:
+        ConnectionError: if the download fails or the checksum does not match
+    """
+    loop = asyncio.get_running_loop()
+    report: Progress = (lambda amount: loop.call_soon_threadsafe(progress, amount)) if progress else (lambda _: None)
+
+    if size is None:
+        size = await loop.run_in_executor(None, get_size, url)
+
+    if size is None:
+        ranges = [(0, None)]
+    else:
+        ranges = parts(size, part_size)
+    part_paths = [f"{path}.part{index}" for index in range(len(ranges))]
+
+    semaphore = asyncio.Semaphore(connections)
+
+    async def download(part_path: str, start: int, end: Optional[int]):
+        async with semaphore:
+            await loop.run_in_executor(None, download_part, url, part_path, start, end, report)
+
+    await asyncio.gather(*(download(part_path, *part) for part_path, part in zip(part_paths, ranges)))
+
+    checksum = hashlib.sha1()
+    with open(path + ".tmp", "wb") as f:
+        for part_path in part_paths:
+            with open(part_path, "rb") as part:
+                while chunk := part.read(1 << 20):
+                    f.write(chunk)
+                    checksum.update(chunk)
+
+    # the parts are removed in any case, because the part files of a corrupted download can not be resumed
+    for part_path in part_paths:
+        os.remove(part_path)
+
+    if sha1 is not None and checksum.hexdigest() != sha1:
+        os.remove(path + ".tmp")
+        raise ConnectionError(f"[Assets] Download of '{url}' has checksum {checksum.hexdigest()}, expected {sha1}")
+
+    os.replace(path + ".tmp", path)
+    return path
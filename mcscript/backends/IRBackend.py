@@ -122,6 +122,18 @@ class IRBackend(Generic[T], ABC):
     def handle_store_var_from_result_node(self, node: StoreVarFromResultNode):
         ...
 
+    @abstractmethod
+    def handle_merge_var_node(self, node: MergeVarNode):
+        ...
+
+    @abstractmethod
+    def handle_save_frame_node(self, node: SaveFrameNode):
+        ...
+
+    @abstractmethod
+    def handle_restore_frame_node(self, node: RestoreFrameNode):
+        ...
+
     @abstractmethod
     def handle_fast_var_operation_node(self, node: FastVarOperationNode):
         ...
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from typing import Dict, List
+from zlib import crc32
+
+from mcscript.ir import IRNode
+from mcscript.ir.command_components import ScoreRange
+from mcscript.ir.components import (FunctionNode, StoreFastVarNode, CommandNode, IfNode, ConditionalNode,
+                                    FunctionCallNode)
+from mcscript.utils.Scoreboard import Scoreboard
+from mcscript.utils.resources import ScoreboardValue, Identifier, ResourceSpecifier
+
+
+class ConstantPool:
+    """
+    Collects the constants that are used by scoreboard operations of all functions.
+
+    The score `#N` always holds the value N, so the constants are stored in an objective that is shared by
+    all mcscript datapacks and that is not reset on load.
+    Each datapack stores a fingerprint of its constants next to them.
+    On load, the constants are only initialized if this fingerprint does not match.
+    """
+
+    def __init__(self, scoreboard: Scoreboard, project_name: str):
+        self.scoreboard = scoreboard
+        self.constants: Dict[int, ScoreboardValue] = {}
+        self.fingerprint_value = ScoreboardValue(Identifier(f"#{project_name}.pool"), scoreboard)
+
+    def get(self, value: int) -> ScoreboardValue:
+        """
+        Returns the score that holds this value and adds it to the pool if necessary.
+
+        Args:
+            value: the constant value
+
+        Returns:
+            The scoreboard value of the constant
+        """
+        if value not in self.constants:
+            self.constants[value] = ScoreboardValue(Identifier(f"#{value}"), self.scoreboard)
+        return self.constants[value]
+
+    def fingerprint(self) -> int:
+        """ Returns a non-negative 32-bit checksum over all constants in the pool """
+        return crc32(",".join(str(i) for i in sorted(self.constants)).encode()) & 0x7FFFFFFF
+
+    def make_init_function(self, name: ResourceSpecifier) -> FunctionNode:
+        """
+        Creates a function that initializes all constants of the pool.
+
+        Args:
+            name: the name of the function
+
+        Returns:
+            The function node
+        """
+        nodes: List[IRNode] = [StoreFastVarNode(self.constants[i], i) for i in sorted(self.constants)]
+        nodes.append(StoreFastVarNode(self.fingerprint_value, self.fingerprint()))
+        return FunctionNode(name, nodes)
+
+    def make_init_check(self, init_function: FunctionNode) -> List[IRNode]:
+        """
+        Creates the nodes that create the shared objective if it does not exist yet
+        and call the init function if the constants were not initialized for this pool.
+
+        Args:
+            init_function: the function created by `make_init_function`
+
+        Returns:
+            The nodes
+        """
+        return [
+            CommandNode(f"scoreboard objectives add {self.scoreboard.get_name()} dummy"),
+            IfNode(
+                ConditionalNode([ConditionalNode.IfScoreMatches(
+                    self.fingerprint_value, ScoreRange(self.fingerprint()), True
+                )]),
+                FunctionCallNode(init_function)
+            )
+        ]
+
+    def __len__(self):
+        return len(self.constants)
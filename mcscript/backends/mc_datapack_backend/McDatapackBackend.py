@@ -1,14 +1,17 @@
 from __future__ import annotations
 
+import json
 from contextlib import contextmanager
 from typing import Dict
 
 from mcscript.backends.IRBackend import IRBackend
 from mcscript.backends.mc_datapack_backend import get_resource
+from mcscript.backends.mc_datapack_backend.ConstantPool import ConstantPool
 from mcscript.backends.mc_datapack_backend.Datapack import Datapack
-from mcscript.backends.mc_datapack_backend.runtime import make_on_load_function
-from mcscript.backends.mc_datapack_backend.utils import position_to_str, relation_to_str
+from mcscript.backends.mc_datapack_backend.runtime import make_on_load_function, make_profile_dump_function
+from mcscript.backends.mc_datapack_backend.utils import position_to_str, relation_to_str, to_snbt
 from mcscript.data.Config import Config
+from mcscript.ir import SourceSpan
 from mcscript.ir.components import *
 from mcscript.utils.resources import Identifier
 
@@ -23,23 +26,25 @@ class McDatapackBackend(IRBackend[Datapack]):
         # A List of pending commands
         self.command_buffer: List[List[str]] = []
 
-        # A list of all constants used by this backend
-        self.constant_scores: Dict[int, ScoreboardValue] = {}
+        # Maps each function to a list of (mcfunction line, source line, source column)
+        self.source_map: Dict[str, List[Tuple[int, int, int]]] = {}
+
+        # All constants used by this backend
+        self.constant_pool = ConstantPool(
+            Scoreboard(self.config.get_scoreboard("constants"), True, 0),
+            self.config.project_name
+        )
 
         self.on_tick_function: Optional[FunctionNode] = None
         self.on_load_function: Optional[FunctionNode] = None
 
-    def _get_constant(self, value: int, scoreboard: Scoreboard) -> ScoreboardValue:
-        if value in self.constant_scores:
-            return self.constant_scores[value]
-
-        scoreboard_value = ScoreboardValue(
-            Identifier(f"#{value}"),
-            scoreboard
-        )
-
-        self.constant_scores[value] = scoreboard_value
-        return scoreboard_value
+        # If profiling, every user function increments its own call counter on this scoreboard
+        self.profile_scoreboard: Optional[Scoreboard] = None
+        self.profile_counters: List[ScoreboardValue] = []
+        self.profile_functions = self.config.is_profile
+        if self.profile_functions:
+            self.profile_scoreboard = Scoreboard("profile", False, len(self.ir_master.scoreboards))
+            self.ir_master.scoreboards.append(self.profile_scoreboard)
 
     @contextmanager
     def assemble_command(self):
@@ -64,11 +69,17 @@ class McDatapackBackend(IRBackend[Datapack]):
         return self.datapack
 
     def on_finish(self):
+        if self.profile_scoreboard is not None:
+            # the runtime functions should not be profiled
+            self.profile_functions = False
+            self.handle(make_profile_dump_function(self, self.profile_counters))
+
         # Add constant values
-        nodes = [StoreFastVarNode(self.constant_scores[i], i)
-                 for i in self.constant_scores]
-        init_constants_fn = FunctionNode(self.config.resource_specifier_main("init_constants"),
-                                         nodes) if nodes else None
+        init_constants_fn = None
+        if len(self.constant_pool) > 0:
+            init_constants_fn = self.constant_pool.make_init_function(
+                self.config.resource_specifier_main("init_constants"))
+            self.handle(init_constants_fn)
 
         init_scoreboards_fn = FunctionNode(
             self.config.resource_specifier_main("init_scoreboards"),
@@ -80,6 +91,13 @@ class McDatapackBackend(IRBackend[Datapack]):
         load_json = self.datapack.get_minecraft_directory().getPath("tags/functions").addFile("load.json")
         load_json.write(get_resource("load.json").format(load_fn["name"]))
 
+        source_map = self.datapack.addFile("mcscript.sourcemap.json")
+        source_map.write(json.dumps({
+            "version": 1,
+            "source": self.config.input_name,
+            "functions": self.source_map
+        }))
+
         if self.on_tick_function is not None:
             tick_json = self.datapack.get_minecraft_directory().getPath("tags/functions").addFile("tick.json")
             tick_json.write(get_resource("tick.json").format(self.on_tick_function["name"]))
@@ -92,15 +110,53 @@ class McDatapackBackend(IRBackend[Datapack]):
             self.on_load_function = node
 
         self.files.push(f"{node['name'].path}.mcfunction")
+        # the source span of each command
+        sources: List[Optional[SourceSpan]] = []
+
+        if self.profile_functions:
+            counter = ScoreboardValue(Identifier(node["name"].path), self.profile_scoreboard)
+            self.profile_counters.append(counter)
+            self.command_buffer.append([])
+            sources.append(None)
+            self.handle(FastVarOperationNode(counter, 1, BinaryOperator.PLUS))
+
         for child in node.inner_nodes:
             self.command_buffer.append([])
+            sources.append(child.metadata.source)
             self.handle(child)
 
-        for command in self.command_buffer:
+        self.write_commands(f"{node['name'].base}:{node['name'].path}", sources)
+
+    def write_commands(self, function_name: str, sources: List[Optional[SourceSpan]]):
+        """
+        Writes the command buffer to the current file and records the source of each line.
+        In debug mode, a comment with the source line is written whenever the source line changes.
+
+        Args:
+            function_name: the name of the current function
+            sources: the source span for each command in the command buffer
+        """
+        line_number = 0
+        previous_line = None
+        source_map = []
+
+        for source, command in zip(sources, self.command_buffer):
+            if source is not None and command:
+                if not self.config.is_release and source.line != previous_line:
+                    self.write_line(f"# {self.config.input_name}:{source.line}")
+                    line_number += 1
+                previous_line = source.line
+
             for line in command:
+                line_number += 1
+                if source is not None:
+                    source_map.append((line_number, source.line, source.column))
                 self.write_line(line)
         self.command_buffer.clear()
 
+        if source_map:
+            self.source_map[function_name] = source_map
+
     def handle_function_call_node(self, node: FunctionCallNode):
         function = node["function"]
         value = function["name"]
@@ -216,7 +272,60 @@ class McDatapackBackend(IRBackend[Datapack]):
         self.command_buffer[-1].append(f"{execute} {command}")
 
     def handle_store_var_node(self, node: StoreVarNode):
-        raise NotImplementedError()
+        var = node["var"]
+        value = node["val"]
+
+        if isinstance(value, int):
+            self.command_buffer[-1].append(
+                f"data modify storage {var.storage} {var.dotted_path()} set value {value}"
+            )
+        elif isinstance(value, ScoreboardValue):
+            self.command_buffer[-1].append(
+                f"execute store result storage {var.storage} {var.dotted_path()} int 1 "
+                f"run scoreboard players get {value}"
+            )
+        elif isinstance(value, DataPath):
+            self.command_buffer[-1].append(
+                f"data modify storage {var.storage} {var.dotted_path()} "
+                f"set from storage {value.storage} {value.dotted_path()}"
+            )
+        else:
+            raise ValueError(f"Unknown integer value source: {value}")
+
+    def handle_merge_var_node(self, node: MergeVarNode):
+        var = node["var"]
+        value = to_snbt(node["val"])
+
+        if var.path:
+            self.command_buffer[-1].append(
+                f"data modify storage {var.storage} {var.dotted_path()} merge value {value}"
+            )
+        else:
+            self.command_buffer[-1].append(f"data merge storage {var.storage} {value}")
+
+    def handle_save_frame_node(self, node: SaveFrameNode):
+        stack = node["stack"]
+        if not node["scores"]:
+            return
+
+        self.command_buffer[-1].append(f"data modify storage {stack.storage} {stack.dotted_path()} append value {{}}")
+        for index, score in enumerate(node["scores"]):
+            self.command_buffer[-1].append(
+                f"execute store result storage {stack.storage} {stack.dotted_path()}[-1].s{index} int 1 "
+                f"run scoreboard players get {score}"
+            )
+
+    def handle_restore_frame_node(self, node: RestoreFrameNode):
+        stack = node["stack"]
+        if not node["scores"]:
+            return
+
+        for index, score in enumerate(node["scores"]):
+            self.command_buffer[-1].append(
+                f"execute store result score {score} run data get storage {stack.storage} "
+                f"{stack.dotted_path()}[-1].s{index}"
+            )
+        self.command_buffer[-1].append(f"data remove storage {stack.storage} {stack.dotted_path()}[-1]")
 
     def handle_store_var_from_result_node(self, node: StoreVarFromResultNode):
         var = node["var"]
@@ -239,7 +348,7 @@ class McDatapackBackend(IRBackend[Datapack]):
         # if b is an integer and this is not a subtraction or sum
         # use a constant to create a scoreboard value for b
         if isinstance(b, int) and operator not in (BinaryOperator.PLUS, BinaryOperator.MINUS):
-            b = self._get_constant(b, a.scoreboard)
+            b = self.constant_pool.get(b)
 
         self.handle_children(node)
 
@@ -289,13 +398,15 @@ class McDatapackBackend(IRBackend[Datapack]):
         self.command_buffer[-1].append(node["cmd"])
 
     def handle_set_block_node(self, node: SetBlockNode):
-        raise NotImplementedError()
+        block = node["block"].getMinecraftName()
+        nbt = node["nbt"] or ""
+        self.command_buffer[-1].append(f"setblock {position_to_str(node['pos'])} {block}{nbt}")
 
     def handle_summon_node(self, node: SummonNode):
-        raise NotImplementedError()
+        self.command_buffer[-1].append(f"summon {node['entity']} {position_to_str(node['pos'])}")
 
     def handle_kill_node(self, node: KillNode):
-        raise NotImplementedError()
+        self.command_buffer[-1].append(f"kill {node['selector']}")
 
     def handle_scoreboard_init_node(self, node: ScoreboardInitNode):
         scoreboard = node["scoreboard"]
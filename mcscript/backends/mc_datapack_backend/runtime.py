@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import json
-from typing import Optional, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
 
 from mcscript.data.selector import Selector
 from mcscript.data.selector.Selector import Selector
-from mcscript.ir.components import FunctionNode, FunctionCallNode, CommandNode, MessageNode
-from mcscript.utils.JsonTextFormat.objectFormatter import format_text, format_color
+from mcscript.ir.command_components import BinaryOperator
+from mcscript.ir.components import (FunctionNode, FunctionCallNode, CommandNode, MessageNode,
+                                    StoreFastVarFromResultNode, FastVarOperationNode)
+from mcscript.utils.JsonTextFormat.objectFormatter import format_text, format_color, format_score
+from mcscript.utils.resources import ScoreboardValue, Identifier
+from mcscript.utils.Scoreboard import Scoreboard
 
 if TYPE_CHECKING:
     from mcscript.backends.mc_datapack_backend.McDatapackBackend import McDatapackBackend
@@ -19,8 +23,9 @@ def make_on_load_function(main: FunctionNode, backend: McDatapackBackend, init_c
 
     When the datapack is loaded, the following things should happen:
         * initialize all scoreboards
-        * initialize all scoreboard constants
+        * initialize all scoreboard constants if they do not have the correct values yet
         * If in debug, set the main scoreboard as sidebar
+        * If profiling, store the current game time as start of the profiling window
         * Make a installation message
         * run main
 
@@ -39,14 +44,56 @@ def make_on_load_function(main: FunctionNode, backend: McDatapackBackend, init_c
         commands.extend(init_scoreboards.inner_nodes)
 
     if init_constants:
-        commands.extend(init_constants.inner_nodes)
+        commands.extend(backend.constant_pool.make_init_check(init_constants))
 
     if not backend.config.is_release and len(backend.ir_master.scoreboards) > 0:
         commands.append(CommandNode(f"scoreboard objectives setdisplay sidebar {backend.ir_master.scoreboards[0]}"))
 
+    if backend.profile_scoreboard is not None:
+        commands.append(StoreFastVarFromResultNode(
+            _profile_start_time(backend.profile_scoreboard),
+            CommandNode("time query gametime")
+        ))
+
     message = format_text("["), format_color(format_text(backend.config.project_name), "gold"), format_text("] loaded!")
     commands.append(MessageNode(MessageNode.MessageType.CHAT, json.dumps(message), selector=Selector("a", [])))
 
     commands.append(FunctionCallNode(main))
 
     return FunctionNode(backend.config.resource_specifier_main("load"), commands)
+
+
+def make_profile_dump_function(backend: McDatapackBackend, counters: List[ScoreboardValue]) -> FunctionNode:
+    """
+    Creates the function `profile_dump` which prints the call counter of every profiled function
+    and the number of ticks since the datapack was loaded.
+    The game time only changes between ticks, so the elapsed ticks are the only timing information available.
+
+    Args:
+        backend: the datapack backend
+        counters: the call counters of all profiled functions
+
+    Returns:
+        A new function node that prints the profiling results
+    """
+    scoreboard = backend.profile_scoreboard
+    elapsed = ScoreboardValue(Identifier("#elapsed"), scoreboard)
+
+    commands = [
+        StoreFastVarFromResultNode(elapsed, CommandNode("time query gametime")),
+        FastVarOperationNode(elapsed, _profile_start_time(scoreboard), BinaryOperator.MINUS)
+    ]
+
+    header = (format_text("["), format_color(format_text(backend.config.project_name), "gold"),
+              format_text("] profile after "), format_score(elapsed), format_text(" ticks:"))
+    commands.append(MessageNode(MessageNode.MessageType.CHAT, json.dumps(header), selector=Selector("a", [])))
+
+    for counter in sorted(counters, key=lambda value: value.value):
+        line = format_text(f"  {counter.value}: "), format_score(counter), format_text(" calls")
+        commands.append(MessageNode(MessageNode.MessageType.CHAT, json.dumps(line), selector=Selector("a", [])))
+
+    return FunctionNode(backend.config.resource_specifier_main("profile_dump"), commands)
+
+
+def _profile_start_time(scoreboard: Scoreboard) -> ScoreboardValue:
+    return ScoreboardValue(Identifier("#start"), scoreboard)
@@ -1,5 +1,11 @@
+import re
+from typing import Any
+
 from mcscript.ir.command_components import Position, PositionAxis, PositionKind, ScoreRelation
 
+# Compound keys that contain other characters must be quoted
+UNQUOTED_KEY = re.compile(r"[A-Za-z0-9_.+-]+")
+
 
 def position_to_str(pos: Position) -> str:
     """
@@ -33,3 +39,34 @@ def relation_to_str(relation: ScoreRelation):
         ScoreRelation.LESS: "<",
         ScoreRelation.LESS_OR_EQUAL: "<="
     }[relation]
+
+
+def to_snbt(value: Any) -> str:
+    """
+    Converts a value to stringified nbt.
+    Supports integers, strings and nested dictionaries.
+
+    >>> to_snbt({"a": 1, "b": {"c": -2, "key with spaces": "text"}})
+    '{a:1,b:{c:-2,"key with spaces":"text"}}'
+
+    Args:
+        value: the value
+
+    Returns:
+        A snbt string
+    """
+    if isinstance(value, dict):
+        entries = (
+            f"{key if UNQUOTED_KEY.fullmatch(key) else _quote(key)}:{to_snbt(element)}"
+            for key, element in value.items()
+        )
+        return "{" + ",".join(entries) + "}"
+    if isinstance(value, str):
+        return _quote(value)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"Cannot convert {value!r} to snbt")
+    return str(value)
+
+
+def _quote(text: str) -> str:
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
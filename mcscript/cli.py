@@ -4,6 +4,7 @@ from typing import Optional
 
 import click
 
+from mcscript.assets.data_generator import makeData
 from mcscript.compile import compileMcScript
 from mcscript.data.Config import Config
 from mcscript.utils.cmdHelper import generate_datapack, MCWorld
@@ -24,7 +25,8 @@ def main():
 
 @main.command()
 @click.option("--release", "-r", is_flag=True, help="Whether to compile in release mode")
-def build(release: bool):
+@click.option("--profile", "-p", is_flag=True, help="Whether to instrument functions with call counters")
+def build(release: bool, profile: bool):
     """
     Builds the mcscript files of this project and writes the datapack
 
@@ -62,10 +64,14 @@ def build(release: bool):
     if release:
         config.is_release = True
 
+    if profile:
+        config.is_profile = True
+
     with open(src_path) as f:
         input_file = f.read()
 
     config.input_string = input_file
+    config.input_path = str(src_path)
     datapack = compileMcScript(config)
 
     generate_datapack(config, datapack)
@@ -79,12 +85,16 @@ def build(release: bool):
 @click.argument("output", type=click.Path(exists=True, file_okay=False, dir_okay=True, resolve_path=True))
 @click.option("--name", "-n", envvar="MCSCRIPT_NAME", type=str)
 @click.option("--release/", "-d", default=False, is_flag=True, help="Whether to compile in release mode")
+@click.option("--profile", "-p", default=False, is_flag=True,
+              help="Whether to instrument functions with call counters. Ignored in release mode")
 @click.option("--mc-version", envvar="MCSCRIPT_MCVERSION", type=str,
               help="The target minecraft version. If not specified latest full-release")
+@click.option("--server-jar", envvar="MCSCRIPT_SERVER_JAR", help="A local server jar of the minecraft version",
+              type=click.Path(exists=True, dir_okay=False, resolve_path=True))
 @click.option("--config", help="The config file",
               type=click.Path(exists=True, dir_okay=False, writable=True, resolve_path=True))
-def compile(input: str, output: str, name: str, release: bool, mc_version: Optional[str],
-            config: Optional[str]):
+def compile(input: str, output: str, name: str, release: bool, profile: bool, mc_version: Optional[str],
+            server_jar: Optional[str], config: Optional[str]):
     """
     Compiles the INPUT and writes the result to OUTPUT directory
     """
@@ -100,6 +110,12 @@ def compile(input: str, output: str, name: str, release: bool, mc_version: Optio
     if release:
         config.is_release = True
 
+    if profile:
+        config.is_profile = True
+
+    if server_jar is not None:
+        config.server_jar = server_jar
+
     if mc_version is not None:
         config.minecraft_version = mc_version
 
@@ -107,6 +123,7 @@ def compile(input: str, output: str, name: str, release: bool, mc_version: Optio
         input_file = f.read()
 
     config.input_string = input_file
+    config.input_path = input
     config.output_dir = output
 
     datapack = compileMcScript(config)
@@ -116,6 +133,19 @@ def compile(input: str, output: str, name: str, release: bool, mc_version: Optio
     click.echo(f"Compiled successfully to {click.format_filename(config.output_dir)}")
 
 
+@main.command()
+@click.argument("mc_version", envvar="MCSCRIPT_MCVERSION", type=str)
+@click.option("--server-jar", envvar="MCSCRIPT_SERVER_JAR", help="A local server jar of the minecraft version",
+              type=click.Path(exists=True, dir_okay=False, resolve_path=True))
+def data(mc_version: str, server_jar: Optional[str]):
+    """
+    Generates the minecraft data for MC_VERSION and caches it
+
+    Run this once with network access or a local server jar, later compilations for the version work offline.
+    """
+    click.echo(f"Created data file {click.format_filename(makeData(mc_version, server_jar))}")
+
+
 @main.command()
 def doc():
     click.echo("Doc")
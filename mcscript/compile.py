@@ -1,12 +1,13 @@
 from logging import DEBUG
 from time import perf_counter
-from typing import Callable
+from typing import Callable, List, Tuple
 
 import lark
 from lark import Tree
 
 from mcscript import get_compiler, get_grammar, Logger
 from mcscript.analyzer.Analyzer import Analyzer
+from mcscript.analyzer.ParseEvents import Event, ParseEvents
 from mcscript.backends import get_default_backend
 from mcscript.backends.mc_datapack_backend.Datapack import Datapack
 from mcscript.data.Config import Config
@@ -30,7 +31,7 @@ def compileMcScript(config: Config, callback: Callable = None) -> Datapack:
     """
     steps = (
         (_parseCode, "Parsing"),
-        (lambda tree: Analyzer().analyze(tree), "Analyzing context"),
+        (lambda parsed: Analyzer().analyze(*parsed), "Analyzing context"),
         (lambda tree: get_compiler().compile(tree[0], tree[1], text, config), "Compiling"),
         (lambda ir_master: get_default_backend()(config, ir_master).generate(), "Running ir backend")
     )
@@ -54,8 +55,6 @@ def compileMcScript(config: Config, callback: Callable = None) -> Datapack:
                 Logger.critical(f"Internal compiler error occurred: {repr(e)}")
             raise e
         Logger.info(f"{step[1]} finished in {perf_counter() - start_time:.4f} seconds")
-        if isinstance(arg, Tree):
-            _debug_log_tree(arg)
 
     if callback is not None:
         callback("Done", 1, arg)
@@ -66,14 +65,22 @@ def compileMcScript(config: Config, callback: Callable = None) -> Datapack:
     return arg
 
 
-def _parseCode(code: str) -> Tree:
+def _parseCode(code: str) -> Tuple[Tree, List[Event]]:
+    """
+    Parses the code and returns the tree and the variable events that were recorded while parsing.
+    """
+    grammar = get_grammar()
+    parse_events: ParseEvents = grammar.options.transformer
     try:
         # keeping tabs can produce error messages that are offset
-        return get_grammar().parse(code.replace("\t", "  "))
+        tree, events = parse_events.parse(grammar, code.replace("\t", "  "))
     except lark.exceptions.UnexpectedToken as e:
         # noinspection PyUnresolvedReferences
         raise McScriptParseException(e.line, e.column, code, e.expected, e.token) from None
 
+    _debug_log_tree(tree)
+    return tree, events
+
 
 def _debug_log_tree(tree: Tree):
     if Logger.isEnabledFor(DEBUG):
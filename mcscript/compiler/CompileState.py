@@ -11,6 +11,7 @@ from mcscript.compiler.ContextStack import ContextStack
 from mcscript.compiler.ContextType import ContextType
 from mcscript.data.Config import Config
 from mcscript.exceptions.exceptions import McScriptUnexpectedTypeError
+from mcscript.ir import SourceSpan
 from mcscript.ir.IrMaster import IrMaster
 from mcscript.ir.command_components import ScoreRange
 from mcscript.ir.components import FunctionNode, ConditionalNode
@@ -21,7 +22,7 @@ from mcscript.lang.resource.BooleanResource import BooleanResource
 from mcscript.lang.resource.base.ResourceBase import Resource
 from mcscript.lang.resource.base.functionSignature import FunctionSignature
 from mcscript.utils.Scoreboard import Scoreboard
-from mcscript.utils.addressCounter import ScoreboardAddressCounter, AddressCounter, StorageAddressCounter
+from mcscript.utils.addressCounter import ScoreboardAddressCounter, StorageAddressCounter, ContentAddressCounter
 from mcscript.utils.resources import DataPath, ScoreboardValue, Identifier, ResourceSpecifier
 
 
@@ -35,6 +36,8 @@ class CompileState:
         self._compile_function = compile_function
 
         self.code = code.split("\n")
+        # the code as seen by the parser, used to resolve the source positions of trees
+        self.source = code.replace("\t", "  ")
         self._currentTree: Optional[Tree] = None
 
         self.config = config
@@ -49,15 +52,20 @@ class CompileState:
         self.data_path_temp = DataPath(self.config.storage_id, self.config.get_storage("temp").split("."))
 
         # ToDo: maybe move to ir gen code?
-        self.node_block_counter = AddressCounter("block_{}_")
+        self.node_block_counter = ContentAddressCounter("block_{}_")
         self.temp_data_counter = StorageAddressCounter(self.data_path_temp)
 
         # ToDO: add (line, column) class
         self.contexts = contexts
         self.stack: ContextStack = ContextStack()
         # self.stack.append(Namespace(0, namespaceType=NamespaceType.GLOBAL))
-        self.stack.append(Context(0, None, ContextType.GLOBAL, NamespaceContext([], [], (0, 0)), self.scoreboard_main,
+        self.stack.append(Context(0, None, ContextType.GLOBAL, NamespaceContext((0, 0)), self.scoreboard_main,
                                   self.data_path_main))
+        # the tables generated by the `lut` builtin by their arguments
+        self.lookup_tables: Dict[Tuple, LookupTable] = {}
+        # the selectors cached by the `cache` builtin by their arguments
+        self.selector_caches: Dict[Tuple, SelectorCache] = {}
+
         # keeps track of all functions that are right now called
         self.function_call_stack: List[FunctionSignature] = []
 
@@ -78,9 +86,12 @@ class CompileState:
     @currentTree.setter
     def currentTree(self, value: Tree):
         self._currentTree = value
-        if value is None:
+        if not isinstance(value, Tree) or value.meta.empty:
             return
 
+        meta = value.meta
+        self.ir.current_source = SourceSpan(meta.line, meta.column, meta.end_line, meta.end_column)
+
     @contextmanager
     def with_function(self, signature: FunctionSignature):
         self.function_call_stack.append(signature)
@@ -159,7 +170,7 @@ class CompileState:
     def pop_context(self):
         self.stack.pop()
 
-    def push_context(self, contextType: ContextType, line: int, column: int) -> Context:
+    def push_context(self, contextType: ContextType, line: int, column: int, identifier: str = None) -> Context:
         """
         Creates a new context and pushes it on the stack.
         Line and column are used to associate the variable context data.
@@ -168,32 +179,36 @@ class CompileState:
             contextType: The type of the context
             line: The line of the definition
             column: The column of the definition
+            identifier: A stable identifier for the names of the context variables. Defaults to the context index.
 
         Returns:
             The new context
         """
 
         context = Context(self.stack.index(), (line, column), contextType, self.contexts[line, column],
-                          self.scoreboard_main, self.data_path_main, self.stack.tail())
+                          self.scoreboard_main, self.data_path_main, self.stack.tail(), identifier)
         context.update_static_resources(self)
         self.stack.append(context)
         return context
 
     @contextmanager
-    def node_block(self, context_type: ContextType, line: int, column: int, block_name: str = None) \
+    def node_block(self, context_type: ContextType, block: Tree, block_name: str = None) \
             -> ContextManager[FunctionNode]:
         """
         Creates a new context and a new ir function.
         Yields the name of the block as a resource specifier
 
+        The names of the block function and of the context variables are derived from the source code of the block,
+        so they do not change if unrelated code is modified.
+
         Args:
             context_type: the type of context
-            line: the line
-            column: the column
+            block: the tree of the block
             block_name: If specified the name for this block
         """
-        self.push_context(context_type, line, column)
-        block_name = block_name if block_name is not None else self.node_block_counter.next()
+        identifier = self.node_block_counter.next_identifier(self.get_source(block))
+        self.push_context(context_type, block.line, block.column, identifier)
+        block_name = block_name if block_name is not None else self.node_block_counter.fmt_str.format(identifier)
 
         with self.ir.with_function(self.resource_specifier_main(block_name)) as function:
             try:
@@ -201,6 +216,20 @@ class CompileState:
             finally:
                 self.pop_context()
 
+    def get_source(self, tree: Tree) -> str:
+        """
+        Returns the normalized source code of a tree.
+        Indentation and empty lines are removed so that they do not influence generated names.
+
+        Args:
+            tree: the tree
+
+        Returns:
+            The source code
+        """
+        text = self.source[tree.meta.start_pos:tree.meta.end_pos]
+        return "\n".join(line.strip() for line in text.split("\n") if line.strip())
+
     def getDebugLines(self, a, _):
         return self.code[a - 1].strip()
 
@@ -1,4 +1,4 @@
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from lark import Tree, Token
 from lark.visitors import Interpreter
@@ -7,26 +7,31 @@ from mcscript.analyzer.Analyzer import NamespaceContext
 from mcscript.compiler.CompileState import CompileState
 from mcscript.compiler.ContextType import ContextType
 from mcscript.compiler.common import (conditional_loop, get_property, readContextManipulator, set_property,
-                                      declare_variable, update_variable)
+                                      declare_variable, update_variable, for_loop)
 from mcscript.compiler.tokenConverter import convert_token_to_resource, convert_token_to_type
 from mcscript.data.Config import Config
 from mcscript.exceptions.exceptions import (McScriptUnexpectedTypeError, McScriptEnumValueAlreadyDefinedError,
                                             McScriptUnsupportedOperationError, McScriptDeclarationError,
-                                            McScriptArgumentError, McScriptIfElseReturnTypeError)
+                                            McScriptArgumentError, McScriptIfElseReturnTypeError,
+                                            McScriptDivisionByZeroError)
 from mcscript.ir.IrMaster import IrMaster
 from mcscript.ir.command_components import BinaryOperator, ScoreRelation, UnaryOperator
 from mcscript.ir.components import (ConditionalNode, ExecuteNode, FunctionCallNode, StoreFastVarFromResultNode,
                                     StoreFastVarNode, IfNode)
 from mcscript.lang import std, atomic_types
 from mcscript.lang.atomic_types import Null
+from mcscript.lang.evaluator import evaluate
 from mcscript.lang.resource.BooleanResource import BooleanResource
 from mcscript.lang.resource.EnumResource import EnumResource
+from mcscript.lang.resource.FixedNumberResource import FixedNumberResource
 from mcscript.lang.resource.FunctionResource import FunctionResource
+from mcscript.lang.resource.IntegerResource import IntegerResource
 from mcscript.lang.resource.StructResource import StructResource
 from mcscript.lang.resource.TupleResource import TupleResource
 from mcscript.lang.resource.TypeResource import TypeResource
 from mcscript.lang.resource.base.ResourceBase import Resource, ValueResource
 from mcscript.lang.resource.base.functionSignature import FunctionSignature, FunctionParameter
+from mcscript.lang.std.builtins import selector_cache
 from mcscript.lang.utility import is_static
 
 
@@ -56,9 +61,11 @@ class Compiler(Interpreter):
         for builtin in builtins:
             self.compileState.currentContext().add_var(builtin.name, builtin)
 
-        with self.compileState.ir.with_function(self.compileState.resource_specifier_main("main")):
+        with self.compileState.ir.with_function(self.compileState.resource_specifier_main("main")) as main:
             self.compileState.push_context(ContextType.GLOBAL, 0, 0)
             self.visit(tree)
+        # the timed selector caches schedule themselves once they were started on load
+        main.inner_nodes[:0] = selector_cache.start_selector_caches(self.compileState)
 
         self.compileState.ir.optimize()
 
@@ -268,7 +275,47 @@ class Compiler(Interpreter):
         self.compileState.ir.append(value)
         return BooleanResource(None, stack)
 
+    def fold_static_operation(self, args: List) -> Optional[ValueResource]:
+        """
+        Evaluates a sum or product in one call if all operands, including those of nested operations,
+        are static integers or all are static fixed point numbers.
+
+        Returns:
+            The result or None if the operation cannot be folded
+        """
+        resource_types = set()
+
+        def to_expression(operation: List) -> Optional[List]:
+            expression = []
+            for index, value in enumerate(operation):
+                if index % 2 == 1:
+                    expression.append(BinaryOperator(value))
+                elif isinstance(value, list):
+                    if (value := to_expression(value)) is None:
+                        return None
+                    expression.append(value)
+                elif type(value) in (IntegerResource, FixedNumberResource) and value.is_static:
+                    resource_types.add(type(value))
+                    expression.append(value.static_value)
+                else:
+                    return None
+            return expression
+
+        expression = to_expression(args)
+        if expression is None or len(resource_types) != 1:
+            return None
+
+        resource_type, = resource_types
+        fixed_base = FixedNumberResource.BASE if resource_type is FixedNumberResource else None
+        try:
+            return resource_type(evaluate(expression, fixed_base), None)
+        except ZeroDivisionError:
+            raise McScriptDivisionByZeroError(self.compileState)
+
     def binaryOperation(self, *args, assignment_resource: Resource = None):
+        if (folded := self.fold_static_operation(list(args))) is not None:
+            return folded
+
         number1, *values = args
 
         # whether the first number may be overwritten
@@ -314,6 +361,8 @@ class Compiler(Interpreter):
             except TypeError:
                 raise McScriptUnsupportedOperationError(operator.value, number1.type(), number2.type(),
                                                         self.compileState)
+            except ZeroDivisionError:
+                raise McScriptDivisionByZeroError(self.compileState)
 
         return number1
 
@@ -437,8 +486,9 @@ class Compiler(Interpreter):
         condition_boolean = self.compileState.to_condition(condition)
         static_value = condition_boolean.static_value()
         if static_value is not None:
-            line_and_column = (block.line, block.column) if static_value else (block_else.line, block_else.column)
-            with self.compileState.node_block(ContextType.BLOCK, *line_and_column) as function:
+            # the context of the if-block is used if there is no else-block to compile
+            executed_block = block if static_value or block_else is None else block_else
+            with self.compileState.node_block(ContextType.BLOCK, executed_block) as function:
                 if static_value is True:
                     self.visit_children(block)
                 elif block_else is not None:
@@ -448,13 +498,12 @@ class Compiler(Interpreter):
             self.compileState.ir.append(FunctionCallNode(function))
             return return_value
 
-        with self.compileState.node_block(ContextType.CONDITIONAL, block.line, block.column) as pos_branch:
+        with self.compileState.node_block(ContextType.CONDITIONAL, block) as pos_branch:
             self.visit_children(block)
             pos_branch_resource = self.compileState.currentContext().return_resource
 
         if block_else is not None:
-            with self.compileState.node_block(ContextType.CONDITIONAL, block_else.line,
-                                              block_else.column) as neg_branch:
+            with self.compileState.node_block(ContextType.CONDITIONAL, block_else) as neg_branch:
                 self.visit_children(block_else)
                 neg_branch_resource = self.compileState.currentContext().return_resource
         else:
@@ -525,11 +574,11 @@ class Compiler(Interpreter):
         except TypeError:
             raise McScriptUnsupportedOperationError("iteration", resource.type(), None, self.compileState)
 
+        elements = []
         while (value := iterator.next()) is not None:
-            with self.compileState.node_block(ContextType.UNROLLED_LOOP, block.line, block.column) as block_function:
-                self.compileState.currentContext().add_var(var_name, value)
-                self.visit(block)
-            self.compileState.ir.append(FunctionCallNode(block_function))
+            elements.append(value)
+
+        for_loop(self.compileState, var_name, elements, block)
 
     def function_parameter(self, tree):
         identifier, datatype = tree.children
@@ -572,7 +621,7 @@ class Compiler(Interpreter):
             if len(parameter_list) > 0:
                 raise McScriptArgumentError("The on_tick function takes no arguments", self.compileState)
 
-            with self.compileState.node_block(ContextType.FUNCTION, block.line, block.column, "tick"):
+            with self.compileState.node_block(ContextType.FUNCTION, block, "tick"):
                 function.call(self.compileState, [], {})
 
         self.compileState.currentContext().add_var(function_name, function)
@@ -597,8 +646,7 @@ class Compiler(Interpreter):
 
     def control_struct(self, tree):
         name, block = tree.children
-        self.compileState.push_context(
-            ContextType.OBJECT, block.line, block.column)
+        self.compileState.push_context(ContextType.OBJECT, block.line, block.column, f"struct_{name}")
         context = self.compileState.currentContext()
 
         struct = StructResource(name, context, self.compileState)
@@ -613,7 +661,7 @@ class Compiler(Interpreter):
     def context_manipulator(self, tree: Tree):
         *modifiers, block = tree.children
 
-        with self.compileState.node_block(ContextType.CONTEXT_MANIPULATOR, block.line, block.column) as block_function:
+        with self.compileState.node_block(ContextType.CONTEXT_MANIPULATOR, block) as block_function:
             self.visit_children(block)
 
         self.compileState.ir.append(ExecuteNode(
@@ -625,7 +673,6 @@ class Compiler(Interpreter):
         return self.visit(tree.children[0])
 
     def statement(self, tree):
-        # self.compileState.writeline(f"# {self.compileState.getDebugLines(tree.meta.line, tree.meta.end_line)}")
         res = self.visit_children(tree)
         # # now clear up the expression counter
         # self.compileState.expressionStack.reset()
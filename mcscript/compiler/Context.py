@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Dict, Optional, Tuple, TYPE_CHECKING, Any, List
+from typing import Dict, Optional, Tuple, TYPE_CHECKING, Any, List, Iterator, Mapping
 
 from mcscript import Logger
 from mcscript.analyzer.VariableContext import VariableContext, NamespaceContext
@@ -54,6 +54,7 @@ class Context:
         * The previous `Context`
         * The definition of this context as (line, column)
         * The numerical id of this `Context` (deprecated, unused)
+        * A stable identifier which is used to generate variable names
         * The variables unique to this context
         * Some Arbitrary data that can be modified using context managers
         * The type of context, ia. if it can be evaluated at compile time (not influenced by inner non-static contexts)
@@ -62,6 +63,9 @@ class Context:
         * An optional resource which is the resource that is returned from this stack.
     """
 
+    # incremented every time a namespace changes that a cached variable lookup depends on
+    version = 0
+
     @dataclass()
     class Variable:
         """
@@ -79,25 +83,33 @@ class Context:
             main_scoreboard: Scoreboard,
             base_path: DataPath,
             predecessor: Context = None,
+            identifier: str = None
     ):
         self.index = index
+        self.identifier = identifier if identifier is not None else str(index)
         self.definition = definition
         self.context_type = ctx_type
         self.predecessor = predecessor
 
-        # make a simple lookup table name -> ctx
-        self.variable_context: Dict[str, VariableContext] = {i.identifier: i for i in namespace_context.variables}
-        self.inner_contexts = namespace_context.inner_contexts
+        # lookup table name -> ctx
+        self.variable_context: Dict[str, VariableContext] = namespace_context.variables
+        self.namespace_context = namespace_context
 
         # the namespace of variables unique to this context
         self.namespace: Dict[str, Context.Variable] = {}
 
+        # caches the variables of the predecessors by name. Only valid if `_cache_version` is `Context.version`.
+        self._lookup_cache: Dict[str, Optional[Context.Variable]] = {}
+        self._cache_version = Context.version
+        # whether a successor has cached variables of this context or of its predecessors
+        self._has_dependents = False
+
         self.user_data: UserData = UserData()
 
         # formats scoreboard variables to ".exp<x>_<varId>"
-        self.scoreboard_formatter = ScoreboardAddressCounter(main_scoreboard, f".exp{self.index}_{{}}")
+        self.scoreboard_formatter = ScoreboardAddressCounter(main_scoreboard, f".exp{self.identifier}_{{}}")
         # for nbt names
-        self.nbt_format = StorageAddressCounter(base_path, f"{self.index}_{{}}" if self.index != 0 else "{}")
+        self.nbt_format = StorageAddressCounter(base_path, f"{self.identifier}_{{}}" if self.index != 0 else "{}")
 
         # A resource which is returned when this context is popped
         self.return_resource: Optional[Resource] = None
@@ -119,10 +131,18 @@ class Context:
         """
         self.namespace.clear()
         self.return_resource = None
+        self._invalidate_dependents()
+
+    def _invalidate_dependents(self):
+        """ Invalidates the lookup caches of all contexts if a successor cached a lookup through this context """
+        if self._has_dependents:
+            Context.version += 1
+            self._has_dependents = False
 
     def find_var(self, name: str) -> Optional[Context.Variable]:
         """
         Recursively looks for a variable with key `name`.
+        The variables found in predecessors are cached, so repeated lookups do not walk the whole chain.
 
         Args:
             name: The name of the variable
@@ -130,13 +150,22 @@ class Context:
         Returns:
             The variable or None if not found
         """
-        if name in self.namespace:
-            return self.namespace[name]
+        if (variable := self.namespace.get(name)) is not None:
+            return variable
 
-        if self.predecessor is not None:
-            return self.predecessor.find_var(name)
+        if self.predecessor is None:
+            return None
 
-        return None
+        if self._cache_version != Context.version:
+            self._lookup_cache.clear()
+            self._cache_version = Context.version
+
+        try:
+            return self._lookup_cache[name]
+        except KeyError:
+            self.predecessor._has_dependents = True
+            variable = self._lookup_cache[name] = self.predecessor.find_var(name)
+            return variable
 
     def find_resource(self, name: str) -> Optional[Resource]:
         """
@@ -160,14 +189,14 @@ class Context:
         Returns:
             The name of the resource if found
         """
-        for name, variable in self.namespace.items():
-            if variable.resource is resource:
-                return name
-
-        if self.predecessor is None:
-            return None
+        context = self
+        while context is not None:
+            for name, variable in context.namespace.items():
+                if variable.resource is resource:
+                    return name
+            context = context.predecessor
 
-        return self.predecessor.find_resource_name(resource)
+        return None
 
     def add_var(self, name: str, value: Resource) -> Resource:
         """
@@ -195,6 +224,7 @@ class Context:
 
         value.is_variable = True
         self.namespace[name] = self.Variable(value, variable_context)
+        self._invalidate_dependents()
         return value
 
     def set_var(self, name: str, value: Resource) -> Resource:
@@ -214,32 +244,41 @@ class Context:
             KeyError: If the variable does not exist
         """
 
-        if name in self.namespace:
-            value.is_variable = True
-            self.namespace[name].resource = value
-        elif self.predecessor is not None:
-            self.predecessor.set_var(name, value)
-        else:
+        if (variable := self.find_var(name)) is None:
             raise KeyError(f"Variable '{name}' does not exist and thus cannot be changed!")
 
+        value.is_variable = True
+        variable.resource = value
         return value
 
     def as_dict(self) -> Dict[str, Context.Variable]:
         """
         Creates a dictionary containing all variable names from this and earlier contexts.
         If a variable shares the same name on multiple contexts, the variable in the highest context will be kept.
+        Prefer `resources` to look up single variables, which does not copy the namespaces.
 
         Returns:
             A Dict containing all variables from this and previous contexts
         """
-        if self.predecessor is not None:
-            data = self.predecessor.as_dict()
-        else:
-            data = {}
-
-        data.update(self.namespace)
+        contexts = []
+        context = self
+        while context is not None:
+            contexts.append(context)
+            context = context.predecessor
+
+        data = {}
+        for context in reversed(contexts):
+            data.update(context.namespace)
         return data
 
+    def resources(self) -> Mapping[str, Resource]:
+        """
+        Returns:
+            A read-only view of the resources of all variables from this and earlier contexts.
+            Looking up a name uses `find_var`.
+        """
+        return ResourceView(self)
+
     def update_static_resources(self, compile_state: CompileState):
         """
         Goes through every resource of the previous context and checks if it is still allowed to be static.
@@ -258,7 +297,8 @@ class Context:
         if self.context_type.hasStaticContext:
             return
 
-        definitions = [self.definition] + [i.definition for i in self.inner_contexts]
+        definitions = {self.definition}
+        definitions.update(i.definition for i in self.namespace_context.descendants())
 
         for name, variable in self.predecessor.namespace.items():
             resource, var_context = variable.resource, variable.context
@@ -283,13 +323,30 @@ class Context:
         """
         Tests recursively if the item is in this contexts namespace or below
         """
-        if item in self.namespace:
-            return True
-
-        if self.predecessor:
-            return item in self.predecessor
-
-        return False
+        return self.find_var(item) is not None
 
     def __str__(self):
         return f"Context(index={self.index},type={self.context_type},namespace={self.namespace})"
+
+
+class ResourceView(Mapping):
+    """
+    A mapping of variable names to the resources visible in a context. Used to format strings.
+    """
+
+    def __init__(self, context: Context):
+        self.context = context
+
+    def __getitem__(self, key: str) -> Resource:
+        if (variable := self.context.find_var(key)) is None:
+            raise KeyError(key)
+        return variable.resource
+
+    def __contains__(self, key) -> bool:
+        return self.context.find_var(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.context.as_dict())
+
+    def __len__(self) -> int:
+        return len(self.context.as_dict())
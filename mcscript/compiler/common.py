@@ -3,10 +3,11 @@ Code that is often used on an ast.
 """
 from __future__ import annotations
 
-from typing import List, Optional, TYPE_CHECKING
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple, TYPE_CHECKING
 
 from lark import Tree
 
+from mcscript import Logger
 from mcscript.compiler.ContextType import ContextType
 from mcscript.data import defaultEnums
 from mcscript.exceptions.McScriptException import McScriptError
@@ -14,13 +15,17 @@ from mcscript.exceptions.exceptions import (McScriptUndefinedVariableError, McSc
                                             McScriptUnexpectedTypeError, McScriptValueError)
 from mcscript.exceptions.utils import requireType
 from mcscript.ir import IRNode
-from mcscript.ir.command_components import Position, ExecuteAnchor
-from mcscript.ir.components import ExecuteNode, FunctionCallNode, ConditionalNode, FunctionNode, IfNode
+from mcscript.ir.command_components import Position, ExecuteAnchor, BinaryOperator, ScoreRange
+from mcscript.ir.components import (ExecuteNode, FunctionCallNode, ConditionalNode, FunctionNode, IfNode,
+                                    StoreFastVarNode, FastVarOperationNode)
 from mcscript.lang.atomic_types import Selector as SelectorType, String
+from mcscript.lang.resource.FunctionResource import FunctionResource
+from mcscript.lang.resource.IntegerResource import IntegerResource
 from mcscript.lang.resource.SelectorResource import SelectorResource
 from mcscript.lang.resource.StringResource import StringResource
 from mcscript.lang.resource.base.ResourceBase import ObjectResource, Resource, ValueResource
 from mcscript.lang.utility import is_static
+from mcscript.utils.resources import ScoreboardValue
 
 if TYPE_CHECKING:
     from mcscript.compiler.CompileState import CompileState
@@ -195,7 +200,7 @@ def conditional_loop(compile_state: CompileState,
         compile_state.ir.append(IfNode(condition, call_node))
 
     # 1. Create the new function
-    with compile_state.node_block(ContextType.LOOP, block.line, block.column) as loop_function:
+    with compile_state.node_block(ContextType.LOOP, block) as loop_function:
 
         # 2. Check the initial condition if needed
         # Yes, this seems ugly, but:
@@ -217,6 +222,158 @@ def conditional_loop(compile_state: CompileState,
         repeat_if(recurse_condition, loop_function)
 
 
+def for_loop(compile_state: CompileState, var_name: str, elements: List[Resource], block: Tree):
+    """
+    Unrolls a for loop over the elements.
+
+    If the body does not change any state outside of the loop, it is only compiled once per distinct element shape:
+    Once for every static value and once for every type of dynamic value, which is copied to a shared score.
+    If there are more elements than the unroll budget allows and the elements are a static integer progression,
+    a loop that is evaluated at runtime is created instead.
+
+    Args:
+        compile_state: the compile state
+        var_name: the name of the loop variable
+        elements: the elements to iterate over
+        block: the body of the loop
+
+    Returns:
+        None
+    """
+    if len(elements) > compile_state.config.unroll_budget:
+        if (progression := _integer_progression(elements)) is not None:
+            return runtime_range_loop(compile_state, var_name, *progression, block)
+        Logger.warning(f"[Compiler] Unrolling a for loop with {len(elements)} elements, "
+                       f"which is more than the budget of {compile_state.config.unroll_budget}")
+
+    memoize = not changes_outer_state(compile_state, block)
+    functions: Dict[Hashable, Tuple[FunctionNode, Optional[ScoreboardValue]]] = {}
+
+    for element in elements:
+        shape = _element_shape(element) if memoize else None
+
+        if shape in functions:
+            function, score = functions[shape]
+            if score is not None:
+                element.copy(score, compile_state)
+            compile_state.ir.append(FunctionCallNode(function))
+            continue
+
+        score = None
+        if shape is not None and not element.is_static:
+            # compile the body for any value of this type
+            score = compile_state.expressionStack.next()
+            element.copy(score, compile_state)
+            element = type(element)(None, score)
+
+        with compile_state.node_block(ContextType.UNROLLED_LOOP, block) as block_function:
+            compile_state.currentContext().add_var(var_name, element)
+            compile_state.compile_ast(block)
+        compile_state.ir.append(FunctionCallNode(block_function))
+
+        if shape is not None:
+            functions[shape] = block_function, score
+
+
+def runtime_range_loop(compile_state: CompileState, var_name: str, start: int, step: int, count: int, block: Tree):
+    """
+    Creates a recursive function call loop which iterates over `count` integers, starting at `start`.
+
+    Args:
+        compile_state: the compile state
+        var_name: the name of the loop variable
+        start: the first value
+        step: the difference between two values
+        count: the amount of values, at least 1
+        block: the body of the loop
+
+    Returns:
+        None
+    """
+    last = start + step * (count - 1)
+    counter = compile_state.expressionStack.next()
+    compile_state.ir.append(StoreFastVarNode(counter, start))
+
+    with compile_state.node_block(ContextType.LOOP, block) as loop_function:
+        context = compile_state.currentContext()
+        value = IntegerResource(None, counter)
+
+        # the counter must not be changed by the body
+        variable_context = context.variable_context.get(var_name, None)
+        if variable_context is not None and variable_context.writes:
+            value = value.copy(compile_state.expressionStack.next(), compile_state)
+        context.add_var(var_name, value)
+
+        compile_state.compile_ast(block)
+
+        compile_state.ir.append(FastVarOperationNode(counter, step, BinaryOperator.PLUS))
+        compile_state.ir.append(IfNode(
+            ConditionalNode([ConditionalNode.IfScoreMatches(counter, ScoreRange(min(start, last), max(start, last)),
+                                                            False)]),
+            FunctionCallNode(loop_function)
+        ))
+
+    compile_state.ir.append(FunctionCallNode(loop_function))
+
+
+def _integer_progression(elements: List[Resource]) -> Optional[Tuple[int, int, int]]:
+    """ Returns start, step and count if the elements are static integers with a constant, non-zero step """
+    if len(elements) < 2 or not all(type(i) is IntegerResource and i.is_static for i in elements):
+        return None
+
+    values = [i.static_value for i in elements]
+    step = values[1] - values[0]
+    if step == 0 or any(b - a != step for a, b in zip(values, values[1:])):
+        return None
+
+    return values[0], step, len(values)
+
+
+def _element_shape(element: Resource) -> Optional[Hashable]:
+    """ Returns a key which is equal for elements for which the loop body compiles to the same code """
+    if not isinstance(element, ValueResource):
+        return None
+
+    if not element.is_static:
+        return type(element)
+
+    try:
+        return type(element), hash(element.static_value), element.static_value
+    except TypeError:
+        return None
+
+
+def changes_outer_state(compile_state: CompileState, block: Tree,
+                        ignored_functions: Sequence[Resource] = ()) -> bool:
+    """
+    Whether compiling the block may change variables declared outside of it.
+    This is the case if a variable from an outer context is written to in the block, a method is called
+    or a user defined function is called, which could change global variables.
+    Calls to `ignored_functions` are not considered, ie. recursive calls of the function that is being checked.
+    """
+    namespace_context = compile_state.contexts[block.line, block.column]
+    definitions = {namespace_context.definition}
+    definitions.update(i.definition for i in namespace_context.descendants())
+
+    context = compile_state.currentContext()
+    while context is not None:
+        for variable in context.namespace.values():
+            if variable.context is not None and any(i.master_context in definitions for i in variable.context.writes):
+                return True
+        context = context.predecessor
+
+    for function_call in block.find_data("function_call"):
+        accessor, *_ = function_call.children
+        name, *attributes = accessor.children
+        if attributes:
+            return True
+        resource = compile_state.currentContext().find_resource(name)
+        if isinstance(resource, FunctionResource) and not any(resource is i for i in ignored_functions):
+            return True
+
+    return False
+
+
 def readContextManipulator(modifiers: List[Tree], compileState: CompileState) -> List[ExecuteNode.ExecuteArgument]:
     def for_(selector: SelectorResource) -> IRNode:
         requireType(selector, SelectorType, compileState)
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import configparser
-from functools import cached_property
-from os.path import exists, join
-from typing import Optional, TYPE_CHECKING
+from dataclasses import dataclass, replace
+from functools import cached_property, lru_cache
+from os.path import abspath, basename, dirname, exists, getmtime, isabs, join
+from typing import Dict, Optional, Tuple, TYPE_CHECKING, get_type_hints
 
 from mcscript import Logger
 from mcscript.assets.DataManager import DataManager
@@ -13,6 +14,108 @@ if TYPE_CHECKING:
     from mcscript.utils.cmdHelper import MCWorld
 
 
+@dataclass(frozen=True)
+class ConfigValues:
+    """
+    The typed values of a config file.
+    Immutable, so that all configs created from the same file share one instance.
+    """
+    release: bool = False
+    profile: bool = False
+    unroll_budget: int = 256
+    inline_limit: int = 64
+    minecraft_version: str = ""
+    server_jar: str = ""
+    name: str = "mcscript"
+
+    score_format: str = ".exp_{block}_{index}"
+
+    # maximum scoreboard name has 16 chars so `name` must contain 12 chars at most
+    # the constants objective is shared by all mcscript datapacks
+    scoreboard_main: str = "mcscript"
+    scoreboard_constants: str = "mcscript.const"
+
+    storage_name: str = "main"
+    storage_stack: str = "state.stack"
+    storage_frames: str = "state.frames"
+    storage_temp: str = "state.temp"
+
+    def __post_init__(self):
+        if not self.checkData():
+            raise ValueError("Invalid values for config detected!")
+
+    def checkData(self) -> bool:
+        """ Checks that all data are in an allowed range """
+        return all(len(i) <= 16 for i in (self.scoreboard_main, self.scoreboard_constants))
+
+    @classmethod
+    def from_parser(cls, parser: configparser.ConfigParser) -> ConfigValues:
+        values = {}
+        # resolves the annotations, which are strings because of `from __future__ import annotations`
+        field_types = get_type_hints(cls)
+        for (section, key), field_name in CONFIG_FIELDS.items():
+            if not parser.has_option(section, key):
+                continue
+            if field_types[field_name] is bool:
+                values[field_name] = parser.getboolean(section, key)
+            elif field_types[field_name] is int:
+                values[field_name] = parser.getint(section, key)
+            else:
+                values[field_name] = parser.get(section, key)
+        return cls(**values)
+
+    def to_parser(self) -> configparser.ConfigParser:
+        parser = configparser.ConfigParser()
+        for (section, key), field_name in CONFIG_FIELDS.items():
+            if not parser.has_section(section):
+                parser.add_section(section)
+            parser.set(section, key, str(getattr(self, field_name)))
+        return parser
+
+
+# maps the options of the config file to the fields of `ConfigValues`
+CONFIG_FIELDS: Dict[Tuple[str, str], str] = {
+    ("main", "release"): "release",
+    ("main", "profile"): "profile",
+    ("main", "unroll_budget"): "unroll_budget",
+    ("main", "inline_limit"): "inline_limit",
+    ("main", "minecraft_version"): "minecraft_version",
+    ("main", "server_jar"): "server_jar",
+    ("main", "name"): "name",
+    ("scores", "format_string"): "score_format",
+    ("scoreboards", "main"): "scoreboard_main",
+    ("scoreboards", "constants"): "scoreboard_constants",
+    ("storage", "name"): "storage_name",
+    ("storage", "stack"): "storage_stack",
+    ("storage", "frames"): "storage_frames",
+    ("storage", "temp"): "storage_temp",
+}
+
+DEFAULT_VALUES = ConfigValues()
+
+
+def load_config_values(path: str) -> ConfigValues:
+    """ Returns the values of a config file and writes the default config if the file does not exist """
+    if not exists(path):
+        Logger.info("[Config] Write default config")
+        with open(path, "w+") as f:
+            DEFAULT_VALUES.to_parser().write(f)
+    return _load_config_values(path, getmtime(path))
+
+
+@lru_cache(maxsize=32)
+def _load_config_values(path: str, _mtime: float) -> ConfigValues:
+    # the modification time is part of the cache key, so changed files are parsed again
+    parser = DEFAULT_VALUES.to_parser()
+    parser.read(path)
+    Logger.info("[Config] loaded from file")
+    values = ConfigValues.from_parser(parser)
+    # paths in the config file are relative to the file, not to the working directory
+    if values.server_jar and not isabs(values.server_jar):
+        values = replace(values, server_jar=join(dirname(abspath(path)), values.server_jar))
+    return values
+
+
 class Config:
     currentConfig: Config = None
 
@@ -22,79 +125,86 @@ class Config:
             Logger.warning("[Config] currentConfig already exists!")
         Config.currentConfig = self
         self.path = path
-        self.config = configparser.ConfigParser()
+        self.values = load_config_values(path) if path else DEFAULT_VALUES
 
         self._input_string: Optional[str] = None
+        self._input_path: Optional[str] = None
         self._world: Optional[MCWorld] = None
         self._output_dir: Optional[str] = None
-        self._data_manager: DataManager = DataManager()
-
-        self.config["main"] = {
-            "release": "False",
-            "minecraft_version": "",
-            "name": "mcscript"
-        }
-
-        self.config["scores"] = {
-            "format_string": ".exp_{block}_{index}"
-        }
-
-        # maximum scoreboard name has 16 chars so `name` must contain 12 chars at most
-        self.config["scoreboards"] = {
-            "main": self["main"]["name"]
-        }
-
-        self.config["storage"] = {
-            "name": "main",
-            "stack": "state.stack",
-            "temp": "state.temp"
-        }
-
-        if path:
-            if not exists(path):
-                Logger.info("[Config] Write default config")
-                with open(path, "w+") as f:
-                    self.config.write(f)
-            self.config.read(path)
-            Logger.info("[Config] loaded from file")
-
-        if not self.checkData():
-            raise ValueError("Invalid values for config detected!")
+        self._data_manager: DataManager = DataManager.get(self.minecraft_version, self.server_jar)
 
     def checkData(self):
         """ Checks that all data are in an allowed range """
-        return (
-            all(len(self.get_scoreboard(i)) <= 16 for i in ("main",))
-        )
+        return self.values.checkData()
 
     #########################################
     #             Main variables            #
     #########################################
     @property
     def project_name(self) -> str:
-        return self.get_main("name")
+        return self.values.name
 
     @project_name.setter
     def project_name(self, value: str):
-        self["main"]["name"] = value
-        self["scoreboards"]["main"] = value
+        self.values = replace(self.values, name=value, scoreboard_main=value)
+        self.__dict__.pop("storage_id", None)
 
     @property
     def is_release(self) -> bool:
-        return self.config.getboolean("main", "release")
+        return self.values.release
 
     @is_release.setter
     def is_release(self, value: bool):
-        self["main"]["release"] = str(value)
+        self.values = replace(self.values, release=value)
+
+    @property
+    def is_profile(self) -> bool:
+        """ Whether functions should be instrumented with call counters. Never enabled for release builds. """
+        return self.values.profile and not self.values.release
+
+    @is_profile.setter
+    def is_profile(self, value: bool):
+        self.values = replace(self.values, profile=value)
+
+    @property
+    def unroll_budget(self) -> int:
+        """ The maximum amount of iterations of a for loop that are unrolled at compile time """
+        return self.values.unroll_budget
+
+    @unroll_budget.setter
+    def unroll_budget(self, value: int):
+        self.values = replace(self.values, unroll_budget=value)
+
+    @property
+    def inline_limit(self) -> int:
+        """
+        The maximum size of a function body in syntax tree nodes for which the function is inlined at every call.
+        Larger functions are generated once and called at runtime.
+        """
+        return self.values.inline_limit
+
+    @inline_limit.setter
+    def inline_limit(self, value: int):
+        self.values = replace(self.values, inline_limit=value)
 
     @property
     def minecraft_version(self) -> Optional[str]:
-        return self.get_main("minecraft_version") or None
+        return self.values.minecraft_version or None
 
     @minecraft_version.setter
     def minecraft_version(self, value: str):
-        self["main"]["minecraft_version"] = value
-        self._data_manager = DataManager(self.minecraft_version)
+        self.values = replace(self.values, minecraft_version=value)
+        self._data_manager = DataManager.get(self.minecraft_version, self.server_jar)
+
+    @property
+    def server_jar(self) -> Optional[str]:
+        """ A local server jar of the minecraft version, which is used to generate the data without downloading """
+        return self.values.server_jar or None
+
+    @server_jar.setter
+    def server_jar(self, value: str):
+        self.values = replace(self.values, server_jar=value)
+        self._data_manager = DataManager.get(self.minecraft_version, self.server_jar)
 
     #########################################
     #                 I/O                   #
@@ -107,6 +217,20 @@ class Config:
     def input_string(self, value: str):
         self._input_string = value
 
+    @property
+    def input_path(self) -> Optional[str]:
+        """ The path of the input file, if the input was read from a file """
+        return self._input_path
+
+    @input_path.setter
+    def input_path(self, value: str):
+        self._input_path = value
+
+    @property
+    def input_name(self) -> str:
+        """ A short name of the input used in debug information """
+        return basename(self._input_path) if self._input_path else "<input>"
+
     @property
     def world(self) -> Optional[MCWorld]:
         return self._world
@@ -144,21 +268,21 @@ class Config:
         return ResourceSpecifier(self.project_name, self.get_storage("name"))
 
     def get_main(self, key) -> str:
-        return self["main"][key]
+        return str(self._get("main", key))
 
     def get_score(self, key) -> str:
-        return self["scores"][key]
+        return self._get("scores", key)
 
     def get_scoreboard(self, key) -> str:
-        return self["scoreboards"][key]
+        return self._get("scoreboards", key)
 
     def get_storage(self, key) -> str:
-        return self["storage"][key]
+        return self._get("storage", key)
+
+    def _get(self, section: str, key: str):
+        return getattr(self.values, CONFIG_FIELDS[section, key])
 
     # Utility functions
 
     def resource_specifier_main(self, name: str) -> ResourceSpecifier:
         return ResourceSpecifier(self.project_name, name)
-
-    def __getitem__(self, item):
-        return self.config[item]
@@ -3,16 +3,46 @@ from typing import Optional
 from mcscript.data.Config import Config
 from mcscript.data.minecraft_data import blocks
 from mcscript.lang.resource.EnumResource import EnumResource
-from mcscript.lang.resource.IntegerResource import IntegerResource
+from mcscript.lang.resource.LazyEnumResource import LazyEnumResource
 
 
 def makeBlocks(config: Config) -> EnumResource:
-    names = {block.name: IntegerResource(block.index, None) for block in blocks.getBlocks(config)}
-    return EnumResource(**names)
+    def resolve(name: str) -> Optional[int]:
+        block = blocks.getBlockByName(name, config)
+        return block.index if block is not None else None
+
+    return LazyEnumResource(resolve, lambda: [block.name for block in blocks.getBlocks(config)])
+
+
+def memberName(entry: str) -> str:
+    """ Converts a registry entry like `minecraft:entity.pig.ambient` to an enum member name """
+    return entry.split(":", 1)[-1].replace(".", "_").replace("/", "_")
+
+
+def makeRegistry(*registries: str):
+    """ Creates the enum for a registry of the registries report. The members are the protocol ids of the entries """
+    def make(config: Config) -> EnumResource:
+        entries = None
+
+        def getEntries():
+            nonlocal entries
+            if entries is None:
+                registry = config.data_manager.get_registry(*registries)
+                entries = {memberName(entry): value for entry, value in registry.items()}
+            return entries
+
+        return LazyEnumResource(lambda name: getEntries().get(name), lambda: getEntries().keys())
+
+    return make
 
 
 ENUMS = {
     "blocks": makeBlocks,
+    "items": makeRegistry("minecraft:item"),
+    "entities": makeRegistry("minecraft:entity_type"),
+    # biomes became a data driven registry in 1.16.2
+    "biomes": makeRegistry("minecraft:worldgen/biome", "minecraft:biome"),
+    "sounds": makeRegistry("minecraft:sound_event"),
 }
 
 
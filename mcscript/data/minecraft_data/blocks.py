@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+from bisect import bisect_right
 from dataclasses import dataclass, field
 from itertools import product
-from typing import Generator, List, Optional
+from typing import Dict, Generator, List, Optional, Sequence, Tuple
 
+from mcscript.assets.block_table import BlockTable
 from mcscript.data.Config import Config
 
 
@@ -53,6 +55,42 @@ class Block:
     def getBlockstatePermutations(self) -> Generator[List[BlockstateValue]]:
         yield from product(*(blockstate.getValues() for blockstate in self.blockstates))
 
+    def getPermutation(self, offset: int) -> Tuple[BlockstateValue, ...]:
+        """
+        Decodes the offset of a state id from the first state id of this block.
+        The state ids enumerate the permutations of the blockstates with the last blockstate changing fastest,
+        so the offset is a mixed radix number with one digit per blockstate.
+
+        Raises:
+            ValueError: if the offset does not belong to this block
+        """
+        if not 0 <= offset < self.getNumberBlockstates():
+            raise ValueError(f"Block {self.minecraft_id} has no state with offset {offset}")
+
+        state = []
+        for blockstate in reversed(self.blockstates):
+            offset, digit = divmod(offset, len(blockstate.values))
+            state.append(BlockstateValue(blockstate, blockstate.values[digit]))
+        return tuple(reversed(state))
+
+    def getPermutationIndex(self, state: Sequence[BlockstateValue]) -> int:
+        """
+        Encodes a permutation of the blockstates of this block to the offset of its state id.
+        This is the inverse of `getPermutation`.
+
+        Raises:
+            ValueError: if the state does not contain a valid value for every blockstate in order
+        """
+        if len(state) != len(self.blockstates):
+            raise ValueError(f"Expected values for {len(self.blockstates)} blockstates, got {len(state)}")
+
+        offset = 0
+        for blockstate, value in zip(self.blockstates, state):
+            if value.blockstate.id != blockstate.id:
+                raise ValueError(f"Expected a value for blockstate {blockstate.id}, got {value.blockstate.id}")
+            offset = offset * len(blockstate.values) + blockstate.values.index(value.value)
+        return offset
+
     def getBlockstate(self, identifier: str) -> Blockstate:
         for blockstate in self.blockstates:
             if blockstate.id == identifier:
@@ -62,22 +100,58 @@ class Block:
         return b
 
 
-BLOCKS = []
+BLOCKS: List[Block] = []
 
+# the blocks sorted by their first state id and the first state ids, for bisecting
+_BLOCKS_BY_INDEX: List[Block] = []
+_BLOCK_INDICES: List[int] = []
+_BLOCKS_BY_NAME: Dict[str, Block] = {}
+
+# the table the blocks were loaded from or None if they were loaded from a report
+_loadedTable: Optional[BlockTable] = None
+
+
+def loadBlocks(blockJson: Dict):
+    """ Loads the blocks from the blocks report of the minecraft data generator """
+    global _loadedTable
+    _loadedTable = None
+    BLOCKS.clear()
+    for blockId in blockJson:
+        properties = blockJson[blockId].get("properties", [])
+        blockstates = [Blockstate(i, properties[i]) for i in properties]
+
+        blockIndex = min(permutation["id"] for permutation in blockJson[blockId]["states"])
+
+        BLOCKS.append(Block(blockId, blockId.split("minecraft:")[1], blockIndex, blockstates))
+
+    _buildIndex()
+
+
+def loadBlockTable(table: BlockTable):
+    """ Loads the blocks from a block table, which is much faster than loading the blocks report """
+    global _loadedTable
+    _loadedTable = table
+    BLOCKS.clear()
+    for block in range(table.block_count):
+        blockId = table.block_name(block)
+        blockstates = [Blockstate(name, values) for name, values in table.blockstates(block)]
+        BLOCKS.append(Block(blockId, blockId.split("minecraft:")[1], table.block_index(block), blockstates))
+
+    _buildIndex()
 
-def assertLoaded(config: Config):
-    if not BLOCKS:
-        blockJson = config.data_manager.get_data("blocks")
-        for blockId in blockJson:
-            properties = blockJson[blockId].get("properties", [])
-            blockstates = [Blockstate(i, properties[i]) for i in properties]
 
-            blockIndex = float("inf")
-            permutations = blockJson[blockId]["states"]
-            for permutation in permutations:
-                blockIndex = min(blockIndex, permutation["id"])
+def _buildIndex():
+    _BLOCKS_BY_INDEX[:] = sorted(BLOCKS, key=lambda block: block.index)
+    _BLOCK_INDICES[:] = [block.index for block in _BLOCKS_BY_INDEX]
+    _BLOCKS_BY_NAME.clear()
+    _BLOCKS_BY_NAME.update((block.name, block) for block in BLOCKS)
 
-            BLOCKS.append(Block(blockId, blockId.split("minecraft:")[1], blockIndex, blockstates))
+
+def assertLoaded(config: Config):
+    # versions with the same blocks share their table, so the blocks are only loaded again if they differ.
+    # Blocks loaded from a report are kept for every version.
+    if not BLOCKS or (_loadedTable is not None and _loadedTable is not config.data_manager.get_block_table()):
+        loadBlockTable(config.data_manager.get_block_table())
 
 
 def getBlocks(config: Config) -> List[Block]:
@@ -90,39 +164,36 @@ def getBlock(index: int, config: Config) -> Block:
     return BLOCKS[index]
 
 
-def getBlockstateIndexed(index: int, config: Config) -> Optional[BlockstateBlock]:
+def getBlockByName(name: str, config: Config) -> Optional[Block]:
+    """ Returns the block with the name without namespace, like `stone`, or None if it does not exist """
     assertLoaded(config)
+    return _BLOCKS_BY_NAME.get(name)
+
+
+def getBlockstateIndexed(index: int, config: Config) -> Optional[BlockstateBlock]:
+    """
+    Finds the block and the blockstate values of a state id.
 
-    lastBlock: Optional[Block] = None
-    for block in BLOCKS:
-        if block.index > index:
-            break
-        lastBlock = block
+    Returns:
+        The blockstate block or None if the id is larger than the largest state id
 
-    if lastBlock is None:
+    Raises:
+        ValueError: if the id is smaller than the smallest state id
+    """
+    assertLoaded(config)
+
+    position = bisect_right(_BLOCK_INDICES, index) - 1
+    if position < 0:
         raise ValueError(f"Unknown blockstate {index}")
 
-    if lastBlock.index == index and not lastBlock.blockstates:
-        return BlockstateBlock(lastBlock, [])
-
-    for blockstateId, blockstate in enumerate(lastBlock.getBlockstatePermutations()):
-        if lastBlock.index + blockstateId == index:
-            return BlockstateBlock(lastBlock, blockstate)
-
-# def getBlock(self, index: int) -> Block:
-#     self.assertLoaded()
-#     return self.blocks[index]
-#
-# def getBlockstateIndexed(self, index: int) -> Optional[BlockstateBlock]:
-#     lastBlock = None
-#     for block in self.getBlocks():
-#         if block.index > index:
-#             break
-#         lastBlock = block
-#
-#     if lastBlock.index == index and not lastBlock.blockstates:
-#         return BlockstateBlock(lastBlock, [])
-#     for blockstateId, blockstate in enumerate(lastBlock.getBlockstatePermutations()):
-#         if lastBlock.index + blockstateId == index:
-#             return BlockstateBlock(lastBlock, blockstate)
-#     return None
+    block = _BLOCKS_BY_INDEX[position]
+    offset = index - block.index
+    if offset >= block.getNumberBlockstates():
+        return None
+
+    return BlockstateBlock(block, block.getPermutation(offset))
+
+
+def getBlockstateId(block: Block, state: Sequence[BlockstateValue]) -> int:
+    """ Returns the state id of the block with the blockstate values. This is the inverse of `getBlockstateIndexed`"""
+    return block.index + block.getPermutationIndex(state)
@@ -2,20 +2,22 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from functools import lru_cache
-from typing import List, Literal, TYPE_CHECKING
+from typing import List, Literal, Optional, Tuple, TYPE_CHECKING
 
 from lark import LarkError
 
 from mcscript import get_selector_grammar
 from mcscript.data.selector.selectorData import (
-    getByName, getSelectors, Integer, Nbt, Range, Repeat, SelectorArgument,
-    String,
+    get_schema, getByName, getSelectors, Integer, Nbt, Range, Repeat, SelectorArgument, SelectorSchema, String,
 )
 from mcscript.exceptions.exceptions import McScriptInvalidSelectorError
 
 if TYPE_CHECKING:
     from mcscript.compiler.CompileState import CompileState
 
+# arguments that restrict the search to an area, which minecraft evaluates before looking at single entities
+POSITIONAL_ARGUMENTS = frozenset(("x", "y", "z", "dx", "dy", "dz", "distance"))
+
 
 @dataclass()
 class Selector:
@@ -24,22 +26,67 @@ class Selector:
 
     def sort(self):
         """
-        Sorts the arguments to match the specified priority values for the best performance in minecraft
+        Sorts the arguments to match the specified priority values for the best performance in minecraft.
+        Positional arguments come first, because they limit the search to the nearby chunks.
 
         Returns:
             None
         """
 
-        def get_priority(x: SelectorArgument) -> int:
-            if x.negative:
-                return x.selector.priority[1]
-            return x.selector.priority[0]
+        def get_priority(x: SelectorArgument) -> Tuple[bool, int]:
+            return x.selector.name in POSITIONAL_ARGUMENTS, x.selector.priority[1 if x.negative else 0]
 
         self.arguments.sort(key=get_priority, reverse=True)
 
+    def sorted(self) -> Selector:
+        """ Returns a sorted copy. Use this on selectors from `from_string`, which are cached and must not change. """
+        selector = Selector(self.selector, list(self.arguments))
+        selector.sort()
+        return selector
+
+    def optimized(self, exists_only: bool = False, dead_players: bool = False) -> Selector:
+        """
+        Returns an equivalent selector that is faster to evaluate. This selector is not modified.
+
+        - duplicate arguments and negations next to a positive value (`type=zombie,type=!pig`) are removed
+        - if dead players may be selected, `@e[type=player]` becomes `@p`, `@r` or `@a`
+        - if only the existence of an entity matters, `limit=1` stops the search at the first match
+        - the arguments are sorted
+
+        Args:
+            exists_only: whether the selector is only used to check if any entity matches, like in `if entity`
+            dead_players: whether selecting dead players does not change the result, like for the target of a message.
+                Unlike `@e`, the player selectors also select dead players.
+        """
+        kind = self.selector
+        arguments = list(dict.fromkeys(self.arguments))
+
+        positive = {i.selector for i in arguments if not i.negative and i.selector.repeat == Repeat.ZERO_OR_ONCE}
+        arguments = [i for i in arguments if not (i.negative and i.selector in positive)]
+        values = {i.selector.name: str(i.value) for i in arguments if not i.negative}
+
+        if dead_players and kind == "e" and values.get("type") in ("player", "minecraft:player"):
+            if values.get("limit") == "1" and values.get("sort") in ("nearest", "random"):
+                kind = "p" if values["sort"] == "nearest" else "r"
+                removed = ("type", "limit", "sort")
+            else:
+                kind = "a"
+                removed = ("type",)
+            arguments = [i for i in arguments if i.selector.name not in removed]
+
+        if kind in ("e", "a") and values.get("sort") == "arbitrary":
+            arguments = [i for i in arguments if i.selector.name != "sort"]
+
+        if exists_only and kind in ("e", "a") and "limit" not in values:
+            arguments.append(SelectorArgument(getByName("limit"), Integer(1), False))
+
+        selector = Selector(kind, arguments)
+        selector.sort()
+        return selector
+
     def verify(self, compileState: CompileState):
         """
-        Verifies that the selector is specified correctly. Raises an error if not.
+        Verifies that the selector is specified correctly for the target minecraft version. Raises an error if not.
 
         Args:
             compileState: the compile state
@@ -47,53 +94,10 @@ class Selector:
         Returns:
             None
         """
-        forbidden = []
-        if self.selector in ("p", "a", "r"):
-            # the type may not be specified because it is already set to player
-            forbidden.append("type")
-
-        if self.selector in ("p", "r", "s"):
-            # the limit is already one
-            forbidden.append("limit")
-            forbidden.append("sort")
-
-        used_arguments = set()
-
-        # repeat zero or once means at most one positive
-        used_argument_selectors = {}
-
-        for argument in self.arguments:
-            if argument.selector.name in forbidden:
-                raise McScriptInvalidSelectorError(
-                    f"May not use argument '{argument.selector.name}' "
-                    f"which is already specified by the selector @{self.selector}",
-                    compileState
-                )
-            if argument in used_arguments:
-                raise McScriptInvalidSelectorError(
-                    f"Argument '{argument.selector.name}' specified twice with the same value",
-                    compileState
-                )
-            if argument.selector in used_argument_selectors and argument.selector.repeat == Repeat.ZERO_OR_ONCE:
-                if used_argument_selectors[argument.selector] is True or (
-                        used_argument_selectors[argument.selector] is False and not argument.negative):
-                    raise McScriptInvalidSelectorError(
-                        f"Argument '{argument.selector.name}' can be used at most once",
-                        compileState
-                    )
-
-            if not argument.selector.accepts.matches(argument.value):
-                raise McScriptInvalidSelectorError(
-                    f"Invalid type '{type(argument.value).__name__}' for argument '{argument.selector.name}': "
-                    f"Expected '{argument.selector.accepts.class_representation()}'",
-                    compileState
-                )
-
-            used_arguments.add(argument)
-
-            # noinspection PyTypeChecker
-            used_argument_selectors[argument.selector] = used_argument_selectors.get(argument,
-                                                                                     False) or not argument.negative
+        schema = get_schema(compileState.config.minecraft_version)
+        error = _verify(self.selector, tuple(self.arguments), schema)
+        if error is not None:
+            raise McScriptInvalidSelectorError(error, compileState)
 
     @classmethod
     @lru_cache(maxsize=32)
@@ -160,3 +164,35 @@ class Selector:
         arguments = ",".join(str(i) for i in self.arguments)
         arguments = f"[{arguments}]" if self.arguments else ""
         return f"@{self.selector}{arguments}"
+
+
+@lru_cache(maxsize=1024)
+def _verify(selector: str, arguments: Tuple[SelectorArgument, ...], schema: SelectorSchema) -> Optional[str]:
+    """ Returns the error message for an invalid selector or None. Cached because most selectors repeat. """
+    forbidden = schema.forbidden[selector]
+    used_arguments = set()
+
+    # repeat zero or once means at most one positive
+    used_argument_selectors = {}
+
+    for argument in arguments:
+        name = argument.selector.name
+        if schema.arguments.get(name) is not argument.selector:
+            return f"Argument '{name}' is not available in minecraft version {schema.version}"
+        if name in forbidden:
+            return f"May not use argument '{name}' which is already specified by the selector @{selector}"
+        if argument in used_arguments:
+            return f"Argument '{name}' specified twice with the same value"
+        if argument.selector in used_argument_selectors and argument.selector.repeat == Repeat.ZERO_OR_ONCE:
+            if used_argument_selectors[argument.selector] or not argument.negative:
+                return f"Argument '{name}' can be used at most once"
+
+        if not argument.selector.accepts.matches(argument.value):
+            return (f"Invalid type '{type(argument.value).__name__}' for argument '{name}': "
+                    f"Expected '{argument.selector.accepts.class_representation()}'")
+
+        used_arguments.add(argument)
+        used_argument_selectors[argument.selector] = used_argument_selectors.get(argument.selector, False) or \
+            not argument.negative
+
+    return None
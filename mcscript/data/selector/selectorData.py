@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import json
+import re
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import List, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
 from mcscript.data import getResource
 
@@ -90,7 +92,7 @@ class Integer(Predicate):
 
     @classmethod
     def matches(cls, other) -> bool:
-        return isinstance(other, int)
+        return isinstance(other, (cls, int))
 
     def __str__(self):
         return str(self.value)
@@ -107,7 +109,8 @@ selectorString2Class = {
 }
 
 
-@dataclass(frozen=True)
+# loaded once, so the identity comparison makes hashing the arguments of a selector cheap
+@dataclass(frozen=True, eq=False)
 class SelectorData:
     name: str
     accepts: SelectorValueType
@@ -126,8 +129,33 @@ class SelectorArgument:
         return f"{self.selector.name}={'!' if self.negative else ''}{self.value}"
 
 
+@dataclass(frozen=True, eq=False)
+class SelectorSchema:
+    """
+    The selector arguments of a minecraft version, compiled into lookup tables for the validation of selectors.
+    Schemas are cached per version and compared by identity.
+    """
+    version: Optional[str]
+    arguments: Dict[str, SelectorData]
+    # the arguments that a selector kind may not use, because the selector already specifies them
+    forbidden: Dict[str, FrozenSet[str]]
+
+
+# the players selectors already select players and the single entity selectors already have a limit
+FORBIDDEN_ARGUMENTS = {
+    "p": frozenset(("type", "limit", "sort")),
+    "a": frozenset(("type",)),
+    "r": frozenset(("type", "limit", "sort")),
+    "s": frozenset(("limit", "sort")),
+    "e": frozenset(),
+}
+
 SELECTORS: Optional[List[SelectorData]] = None
 
+# the first and last minecraft version of arguments that are not available in all versions
+_VERSIONS: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+_VERSION_PATTERN = re.compile(r"\d+(\.\d+)*")
+
 
 def getSelectors() -> List[SelectorData]:
     assertLoaded()
@@ -135,13 +163,40 @@ def getSelectors() -> List[SelectorData]:
 
 
 def getByName(name: str) -> SelectorData:
+    try:
+        return get_schema(None).arguments[name]
+    except KeyError:
+        raise ValueError(f"Unknown selector: '{name}'")
+
+
+def parse_version(version: str) -> Optional[Tuple[int, ...]]:
+    """
+    Parses a release version like `1.16.5`. Returns None for snapshots, which are treated like the latest version.
+
+    >>> parse_version("1.16.5"), parse_version("20w16a")
+    ((1, 16, 5), None)
+    """
+    if not _VERSION_PATTERN.fullmatch(version):
+        return None
+    return tuple(int(i) for i in version.split("."))
+
+
+@lru_cache()
+def get_schema(version: Optional[str]) -> SelectorSchema:
+    """ Returns the selector arguments of a minecraft version. If the version is None, all arguments are used """
     assertLoaded()
+    parsed = parse_version(version) if version else None
 
-    for selector in SELECTORS:
-        if selector.name == name:
-            return selector
+    def available(selector: SelectorData) -> bool:
+        since, until = _VERSIONS.get(selector.name, (None, None))
+        return parsed is None or ((since is None or parse_version(since) <= parsed) and
+                                  (until is None or parsed <= parse_version(until)))
 
-    raise ValueError(f"Unknown selector: '{name}'")
+    return SelectorSchema(
+        version,
+        {selector.name: selector for selector in SELECTORS if available(selector)},
+        FORBIDDEN_ARGUMENTS
+    )
 
 
 def assertLoaded():
@@ -171,3 +226,6 @@ def assertLoaded():
                 repeat,
                 priority
             ))
+
+            if "since" in selector or "until" in selector:
+                _VERSIONS[selector["name"]] = selector.get("since"), selector.get("until")
@@ -71,6 +71,11 @@ class McScriptInvalidMarkupError(McScriptError):
         super().__init__(msg, compile_state)
 
 
+class McScriptDivisionByZeroError(McScriptError):
+    def __init__(self, compile_state: CompileState):
+        super().__init__("Cannot divide by zero", compile_state)
+
+
 class McScriptOutOfBoundsError(McScriptError):
     def __init__(self, value: int, max_value: int, compile_state: CompileState):
         super().__init__(f"Index out of bounds. Maximum allowed index is {max_value}, got {value}", compile_state)
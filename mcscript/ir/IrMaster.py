@@ -4,7 +4,7 @@ from contextlib import contextmanager
 from itertools import chain
 from typing import List, Union, Generator, Iterable, Optional, ContextManager
 
-from mcscript.ir import IRNode
+from mcscript.ir import IRNode, SourceSpan
 from mcscript.ir.components import FunctionNode
 from mcscript.ir.optimize import optimize
 from mcscript.utils.Scoreboard import Scoreboard
@@ -27,6 +27,9 @@ class IrMaster:
 
         self.node_counter = 0
 
+        # The source span of the code that is currently compiled. Attached to every appended node.
+        self.current_source: Optional[SourceSpan] = None
+
     def optimize(self):
         """ Optimizes the contained function nodes"""
         # simple optimization pass
@@ -45,6 +48,8 @@ class IrMaster:
             self.function_nodes = [i for i in function_nodes if not i["drop"]]
 
     def append(self, node: IRNode):
+        if self.current_source is not None:
+            node.set_source(self.current_source)
         self.active_nodes[-1].append(node)
 
         # Done after the function node is created
@@ -73,6 +78,7 @@ class IrMaster:
         node = FunctionNode(
             name, []
         )
+        node.metadata.source = self.current_source
 
         try:
             yield node
@@ -16,9 +16,23 @@ if TYPE_CHECKING:
     from mcscript.ir.IrMaster import IrMaster
 
 
+@dataclass(frozen=True)
+class SourceSpan:
+    """ A span in the mcscript source code. Lines and columns start at 1. """
+    line: int
+    column: int
+    end_line: int
+    end_column: int
+
+    def __str__(self):
+        return f"{self.line}:{self.column}"
+
+
 @dataclass()
 class IrNodeMetadata:
     index: Optional[int] = field(default=None)
+    # the source code that generated this node
+    source: Optional[SourceSpan] = field(default=None)
 
 
 T = TypeVar("T")
@@ -138,6 +152,18 @@ class IRNode:
                + (" # " + metadata if metadata else "") \
                + (f"\n{spacer}|-{children}" if children else "")
 
+    def set_source(self, source: SourceSpan):
+        """
+        Sets the source span of this node and all inner nodes which do not have a source yet.
+
+        Args:
+            source: the source span
+        """
+        if self.metadata.source is None:
+            self.metadata.source = source
+        for child in self.inner_nodes:
+            child.set_source(source)
+
     def read_scoreboard_values(self) -> List[ScoreboardValue]:
         """
         Returns all scoreboard values that this node reads
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from enum import Enum, auto
 from itertools import chain
-from typing import List, Union, TYPE_CHECKING, Tuple, Any, Optional
+from typing import List, Union, TYPE_CHECKING, Tuple, Any, Optional, Dict
 
 from mcscript.data.minecraft_data.blocks import Block, BlockstateBlock
 from mcscript.data.selector.Selector import Selector
@@ -28,6 +28,8 @@ class FunctionNode(IRNode):
         self["drop"] = False
         # modified by every FunctionCallNode that points to this function
         self["num_callers"] = 0
+        # whether this function calls itself. Recursive functions are never inlined
+        self["recursive"] = False
 
 
 class FunctionCallNode(IRNode):
@@ -41,6 +43,9 @@ class FunctionCallNode(IRNode):
         self["function"]["num_callers"] += 1
 
     def optimized(self, ir_master: IrMaster, parent: IRNode) -> Tuple[Union[IRNode, Tuple[IRNode, ...]], bool]:
+        if self["function"]["recursive"]:
+            return super().optimized(ir_master, parent)
+
         # inline if the called function only has one child
         if len(self["function"].inner_nodes) == 1:
             # prevent infinite inlining
@@ -317,6 +322,52 @@ class StoreVarNode(IRNode):
         self["var"] = storage
         self["val"] = value
 
+    def read_scoreboard_values(self) -> List[ScoreboardValue]:
+        if isinstance(self["val"], ScoreboardValue):
+            return [self["val"]]
+        return []
+
+
+# A nested nbt compound of integers
+Compound = Dict[str, Union[int, "Compound"]]
+
+
+class MergeVarNode(IRNode):
+    """ Merges a compound into the compound at the storage path. Created by the storage optimizer. """
+
+    def __init__(self, storage: DataPath, value: Compound):
+        super().__init__()
+        self["var"] = storage
+        self["val"] = value
+
+
+class SaveFrameNode(IRNode):
+    """
+    Pushes the values of the scores as a new frame to the call stack in the storage.
+    Used to keep the scores of a function across a recursive call.
+    """
+
+    def __init__(self, stack: DataPath, scores: List[ScoreboardValue]):
+        super().__init__()
+        self["stack"] = stack
+        # may be extended after this node was created
+        self["scores"] = scores
+
+    def read_scoreboard_values(self) -> List[ScoreboardValue]:
+        return list(self["scores"])
+
+
+class RestoreFrameNode(IRNode):
+    """ Restores the scores saved by a `SaveFrameNode` and pops the frame from the call stack. """
+
+    def __init__(self, stack: DataPath, scores: List[ScoreboardValue]):
+        super().__init__()
+        self["stack"] = stack
+        self["scores"] = scores
+
+    def written_scoreboard_values(self) -> List[ScoreboardValue]:
+        return list(self["scores"])
+
 
 class StoreVarFromResultNode(IRNode):
     def __init__(self, storage: DataPath, command: IRNode, dtpye: StorageDataType, scale: float = 1.0):
@@ -3,7 +3,7 @@ from typing import List, Optional
 
 from mcscript.ir import IRNode
 from mcscript.ir.command_components import BinaryOperator
-from mcscript.ir.components import FastVarOperationNode
+from mcscript.ir.components import FastVarOperationNode, StoreFastVarNode
 from mcscript.ir.optimize.Optimizer import Optimizer
 
 ADDITION = (BinaryOperator.PLUS, BinaryOperator.MINUS)
@@ -25,6 +25,11 @@ class ArithmeticOptimizer(Optimizer):
         =>
         var += 100
 
+    Afterwards, operations with a constant are replaced by cheaper operations that do not need a constant score:
+        var *= 2 => var += var
+        var *= 1 => (dropped)
+        var *= 0 => var = 0
+
     These optimizations can often be applied on fixed point operations.
 
     ToDo: This code currently does not get optimized:
@@ -44,6 +49,7 @@ class ArithmeticOptimizer(Optimizer):
                 could_optimize = True
                 while could_optimize:
                     could_optimize = self.optimize_function(function.inner_nodes)
+            self.reduce_strength(function.inner_nodes)
 
     def optimize_function(self, nodes: List[IRNode]) -> bool:
         """ Optimizes the nodes in a function. Returns true if an optimization could be made"""
@@ -89,6 +95,34 @@ class ArithmeticOptimizer(Optimizer):
                         del nodes[index]
                     return True
 
+    def reduce_strength(self, nodes: List[IRNode]):
+        """
+        Replaces multiplications, divisions and modulo operations with a constant by cheaper nodes.
+        Scoreboard operations wrap around on overflow, so `var += var` is identical to `var *= 2`.
+        """
+        index = 0
+        while index < len(nodes):
+            node = nodes[index]
+            if not isinstance(node, FastVarOperationNode) or not isinstance(node["b"], int):
+                index += 1
+                continue
+
+            var, b, operator = node["var"], node["b"], node["operator"]
+            if operator in MULTIPLICATION and b == 1:
+                del nodes[index]
+                continue
+
+            if operator == BinaryOperator.TIMES and b == 2:
+                nodes[index] = FastVarOperationNode(var, var, BinaryOperator.PLUS)
+            elif (operator == BinaryOperator.TIMES and b == 0) or (operator == BinaryOperator.MODULO and b == 1):
+                nodes[index] = StoreFastVarNode(var, 0)
+            else:
+                index += 1
+                continue
+
+            nodes[index].metadata = node.metadata
+            index += 1
+
     def optimize_multiplication_nodes(self, nodes: List[IRNode], indices: List[int]) -> Optional[List[int]]:
         product = Fraction(1, 1)
         first_index = indices[0]
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from typing import Dict, Iterator, List, Set, Tuple
+
+from mcscript.data.selector.Selector import POSITIONAL_ARGUMENTS, Selector
+from mcscript.ir import IRNode
+from mcscript.ir.components import (CommandNode, ConditionalNode, ExecuteNode, FastVarOperationNode, FunctionCallNode,
+                                    FunctionNode, GetFastVarNode, IfNode, MessageNode, StoreFastVarFromResultNode,
+                                    StoreFastVarNode, KillNode)
+from mcscript.ir.optimize.Optimizer import Optimizer
+from mcscript.utils.addressCounter import ContentAddressCounter
+
+# nodes that never change entities, as long as their inner nodes don't
+ENTITY_SAFE_NODES = (ConditionalNode, ExecuteNode, FastVarOperationNode, GetFastVarNode, IfNode, MessageNode,
+                     StoreFastVarFromResultNode, StoreFastVarNode)
+
+
+class SelectorOptimizer(Optimizer):
+    """
+    Optimizes the selectors of all nodes.
+
+    Every selector is replaced by `Selector.optimized`. Selectors that only check whether an entity exists
+    get `limit=1`, and the targets of messages may use the player selectors, which also select dead players.
+
+    Expensive selectors, which check the nbt of entities, are evaluated only once per function if they are used
+    several times in the same execution context and no entity can change in between:
+        tag @e[nbt={a:1b}] add mcs_sel_...
+        ... @e[tag=mcs_sel_...] ...
+        tag @e[tag=mcs_sel_...] remove mcs_sel_...
+    """
+
+    def __init__(self, node: FunctionNode, nodes: Dict[str, FunctionNode]):
+        super().__init__(node, nodes)
+        self.tags = ContentAddressCounter("mcs_sel_{}")
+
+    def optimize(self):
+        for function in self.visit_top_functions():
+            for node, key, exists_only, _ in self.selector_nodes(function):
+                node[key] = node[key].optimized(exists_only, dead_players=isinstance(node, MessageNode))
+
+        for function in self.visit_top_functions():
+            self.hoist_selectors(function)
+
+    def selector_nodes(self, node: IRNode, context: Tuple = ()) -> Iterator[Tuple[IRNode, str, bool, Tuple]]:
+        """
+        Yields all nodes with a selector, the key of the selector, whether only its existence matters
+        and the execute components that the selector is evaluated in
+        """
+        if isinstance(node, (ExecuteNode.As, ExecuteNode.At, MessageNode, KillNode)):
+            yield node, "selector", False, context
+        elif isinstance(node, ConditionalNode.IfEntity):
+            yield node, "selector", True, context
+        elif isinstance(node, ExecuteNode):
+            components = node["components"]
+            for index, component in enumerate(components):
+                yield from self.selector_nodes(component, context + tuple(map(component_key, components[:index])))
+            context += tuple(map(component_key, components))
+        elif isinstance(node, ConditionalNode):
+            for condition in node["conditions"]:
+                yield from self.selector_nodes(condition, context)
+
+        if isinstance(node, IfNode):
+            yield from self.selector_nodes(node["condition"], context)
+
+        for inner_node in node.inner_nodes:
+            yield from self.selector_nodes(inner_node, context)
+
+    def hoist_selectors(self, function: FunctionNode):
+        uses: Dict[str, List[Tuple[int, Tuple]]] = {}
+        for index, node in enumerate(function.inner_nodes):
+            for use, key, _, context in self.selector_nodes(node):
+                uses.setdefault(str(use[key]), []).append((index, context))
+
+        for selector_string, selector_uses in uses.items():
+            indices = [index for index, _ in selector_uses]
+            first, last = indices[0], indices[-1]
+            selector = Selector.from_string(selector_string)
+            if first == last or not self.should_hoist(selector):
+                continue
+            # the tag is added once at the top level, so every use must be evaluated once in the same context
+            if len({context for _, context in selector_uses}) != 1:
+                continue
+            # the entities may only change in the last use, after the selector was evaluated for the last time
+            if not all(self.is_entity_safe(node) for node in function.inner_nodes[first:last]):
+                continue
+            if indices.count(last) > 1 and not self.is_entity_safe(function.inner_nodes[last]):
+                continue
+
+            tag = self.tags.next(f"{function['name']} {selector_string}")
+            tagged = Selector.from_string(f"@{selector.selector}[tag={tag}]")
+            for index in set(indices):
+                for node, key, _, _ in self.selector_nodes(function.inner_nodes[index]):
+                    if str(node[key]) == selector_string:
+                        node[key] = tagged
+
+            function.inner_nodes.insert(last + 1, CommandNode(f"tag {tagged} remove {tag}"))
+            function.inner_nodes.insert(first, CommandNode(f"tag {selector} add {tag}"))
+            # the indices of the other selectors changed, so they are hoisted in the next pass
+            return self.hoist_selectors(function)
+
+    @staticmethod
+    def should_hoist(selector: Selector) -> bool:
+        names = {i.selector.name for i in selector.arguments}
+        # a limit or a random order would select different entities than the original selector,
+        # and positional arguments depend on the position the selector is evaluated at
+        return selector.selector in ("e", "a") and "nbt" in names and \
+            not names & {"limit", "sort"} and not names & POSITIONAL_ARGUMENTS
+
+    def is_entity_safe(self, node: IRNode, visited: Set[FunctionNode] = None) -> bool:
+        """ Whether the node can not change any entity """
+        visited = visited or set()
+        if isinstance(node, FunctionCallNode):
+            function = node["function"]
+            if function in visited:
+                return True
+            visited.add(function)
+            return all(self.is_entity_safe(i, visited) for i in function.inner_nodes)
+
+        return isinstance(node, ENTITY_SAFE_NODES) and all(self.is_entity_safe(i, visited) for i in node.inner_nodes)
+
+
+def component_key(component: IRNode) -> Tuple[str, ...]:
+    """ A key that is equal for execute components that set the same context """
+    return (type(component).__name__, *(f"{key}={value}" for key, value in component.data.items()))
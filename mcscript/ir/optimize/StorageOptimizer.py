@@ -0,0 +1,105 @@
+from typing import List, Sequence
+
+from mcscript.ir import IRNode
+from mcscript.ir.components import StoreVarNode, MergeVarNode, Compound
+from mcscript.ir.optimize.Optimizer import Optimizer
+from mcscript.utils.resources import DataPath
+
+
+def is_batchable(node: IRNode) -> bool:
+    """ Whether the node writes a constant to a storage path that does not index into a list """
+    return isinstance(node, StoreVarNode) and isinstance(node["val"], int) and \
+           not any("[" in element for element in node["var"].path)
+
+
+class StorageOptimizer(Optimizer):
+    """
+    Batches writes of constants to the same storage.
+
+    A run of adjacent writes is merged into a single compound at the common prefix of their paths:
+        data modify storage mcscript:main state.a set value 1
+        data modify storage mcscript:main state.b.c set value 2
+        =>
+        data modify storage mcscript:main state merge value {a:1,b:{c:2}}
+
+    Merging compounds is recursive, so every other value stored below the prefix is kept.
+    A run ends before a write that would change the type of a previously written path,
+    for example `state.a = 1` followed by `state.a.b = 2`.
+    """
+
+    def optimize(self):
+        for function in self.visit_top_functions():
+            function.inner_nodes = self.optimize_nodes(function.inner_nodes)
+
+    def optimize_nodes(self, nodes: List[IRNode]) -> List[IRNode]:
+        new_nodes = []
+        index = 0
+        while index < len(nodes):
+            end = self.find_run(nodes, index)
+            if end - index < 2:
+                new_nodes.append(nodes[index])
+                index += 1
+                continue
+
+            new_nodes.append(self.merge_run(nodes[index:end]))
+            index = end
+
+        return new_nodes
+
+    def find_run(self, nodes: List[IRNode], start: int) -> int:
+        """ Returns the end index of the run of batchable writes that starts at `start`"""
+        if not is_batchable(nodes[start]):
+            return start + 1
+
+        storage = nodes[start]["var"].storage
+        compound: Compound = {}
+        end = start
+        while end < len(nodes) and is_batchable(nodes[end]) and nodes[end]["var"].storage == storage:
+            if not self.insert(compound, nodes[end]["var"].path, nodes[end]["val"]):
+                break
+            end += 1
+
+        return end
+
+    def merge_run(self, nodes: List[IRNode]) -> MergeVarNode:
+        paths = [node["var"].path for node in nodes]
+        prefix = self.common_prefix(paths)
+
+        compound: Compound = {}
+        for node in nodes:
+            self.insert(compound, node["var"].path[len(prefix):], node["val"])
+
+        merged = MergeVarNode(DataPath(nodes[0]["var"].storage, prefix), compound)
+        merged.metadata = nodes[0].metadata
+        return merged
+
+    @staticmethod
+    def common_prefix(paths: List[Sequence[str]]) -> List[str]:
+        # the last element is always written, so it cannot be part of the prefix
+        prefix = list(paths[0][:-1])
+        for path in paths[1:]:
+            length = 0
+            while length < len(prefix) and length < len(path) - 1 and prefix[length] == path[length]:
+                length += 1
+            del prefix[length:]
+        return prefix
+
+    @staticmethod
+    def insert(compound: Compound, path: Sequence[str], value: int) -> bool:
+        """
+        Inserts the value at the path into the compound.
+
+        Returns:
+            False if the path conflicts with a previously inserted path
+        """
+        *parents, key = path
+        for parent in parents:
+            compound = compound.setdefault(parent, {})
+            if not isinstance(compound, dict):
+                return False
+
+        if isinstance(compound.get(key), dict):
+            return False
+
+        compound[key] = value
+        return True
@@ -4,8 +4,10 @@ from mcscript.ir.components import FunctionNode
 from mcscript.ir.optimize.ArithmeticOptimizer import ArithmeticOptimizer
 from mcscript.ir.optimize.ConditionOptimizer import ConditionOptimizer
 from mcscript.ir.optimize.Optimizer import Optimizer
+from mcscript.ir.optimize.SelectorOptimizer import SelectorOptimizer
+from mcscript.ir.optimize.StorageOptimizer import StorageOptimizer
 
-OPTIMIZERS: List[Type[Optimizer]] = [ArithmeticOptimizer, ConditionOptimizer]
+OPTIMIZERS: List[Type[Optimizer]] = [ArithmeticOptimizer, ConditionOptimizer, StorageOptimizer, SelectorOptimizer]
 
 
 def optimize(start_node: FunctionNode, nodes: List[FunctionNode]):
@@ -0,0 +1,174 @@
+"""
+Evaluates static arithmetic with the semantics of minecraft scoreboard operations:
+    - all values are 32 bit integers, so results of `+`, `-` and `*` wrap around on overflow
+    - `/` rounds down and `%` has the sign of the divisor (java `Math.floorDiv` and `Math.floorMod`)
+    - dividing by zero fails
+
+Fixed point numbers are scaled integers, so `*` and `/` rescale the result like the generated commands do.
+
+An expression is a chain of operands and operators, where every operand may be a nested expression:
+    >>> evaluate([1, BinaryOperator.PLUS, [2, BinaryOperator.TIMES, 3]])
+    7
+    >>> evaluate([2 ** 31 - 1, BinaryOperator.PLUS, 1])
+    -2147483648
+    >>> evaluate_array([(1, 2, 3), BinaryOperator.TIMES, 2])
+    [2, 4, 6]
+
+`evaluate_array` evaluates an expression for many operands at once and uses numpy if it is installed.
+"""
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+from mcscript.ir.command_components import BinaryOperator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+
+Operand = Union[int, Sequence[int]]
+Expression = Union[Operand, Sequence[Union["Expression", BinaryOperator]]]
+
+
+def wrap_int32(value: int) -> int:
+    """ Converts the value to a 32 bit integer like a java int cast """
+    return (value - INT_MIN) % 2 ** 32 + INT_MIN
+
+
+def _divide(a: int, b: int) -> int:
+    if b == 0:
+        raise ZeroDivisionError("Cannot divide by zero")
+    # INT_MIN / -1 overflows
+    return wrap_int32(a // b)
+
+
+def _modulo(a: int, b: int) -> int:
+    if b == 0:
+        raise ZeroDivisionError("Cannot divide by zero")
+    return a % b
+
+
+SCORE_OPERATIONS: Dict[BinaryOperator, Callable[[int, int], int]] = {
+    BinaryOperator.PLUS: lambda a, b: wrap_int32(a + b),
+    BinaryOperator.MINUS: lambda a, b: wrap_int32(a - b),
+    BinaryOperator.TIMES: lambda a, b: wrap_int32(a * b),
+    BinaryOperator.DIVIDE: _divide,
+    BinaryOperator.MODULO: _modulo
+}
+
+
+def operate(a: int, b: int, operator: BinaryOperator, fixed_base: Optional[int] = None) -> int:
+    """
+    Applies a single operation.
+
+    Args:
+        a: the first operand
+        b: the second operand
+        operator: the operator
+        fixed_base: the scale of fixed point operands or None for integers
+
+    Returns:
+        The result as 32 bit integer
+
+    Raises:
+        ZeroDivisionError: if `/` or `%` is used with a divisor of zero
+    """
+    if fixed_base is not None:
+        if operator == BinaryOperator.TIMES:
+            return _divide(wrap_int32(a * b), fixed_base)
+        if operator == BinaryOperator.DIVIDE:
+            return _divide(wrap_int32(a * fixed_base), b)
+    return SCORE_OPERATIONS[operator](a, b)
+
+
+def evaluate(expression: Expression, fixed_base: Optional[int] = None) -> int:
+    """ Evaluates the expression from left to right. Nested expressions are evaluated first. """
+    if isinstance(expression, int):
+        return wrap_int32(expression)
+
+    first, *rest = expression
+    value = evaluate(first, fixed_base)
+    for index in range(0, len(rest), 2):
+        operator, operand = rest[index:index + 2]
+        value = operate(value, evaluate(operand, fixed_base), operator, fixed_base)
+    return value
+
+
+def evaluate_array(expression: Expression, fixed_base: Optional[int] = None) -> List[int]:
+    """
+    Evaluates the expression for every element of its sequence operands.
+    All sequences must have the same length, integer operands are used for every element.
+
+    Returns:
+        The results as list of ints
+    """
+    if numpy is not None:
+        return [int(i) for i in numpy.atleast_1d(_evaluate_numpy(expression, fixed_base))]
+
+    length = _array_length(expression)
+    return [evaluate(_element(expression, index), fixed_base) for index in range(length)]
+
+
+def _is_operand_sequence(expression: Expression) -> bool:
+    return not isinstance(expression, int) and all(isinstance(i, int) for i in expression)
+
+
+def _array_length(expression: Expression) -> int:
+    if isinstance(expression, int):
+        return 1
+    if _is_operand_sequence(expression):
+        return len(expression)
+    return max(_array_length(i) for i in expression[::2])
+
+
+def _element(expression: Expression, index: int) -> Expression:
+    """ Returns the expression for the element at `index` """
+    if isinstance(expression, int):
+        return expression
+    if _is_operand_sequence(expression):
+        return expression[index]
+    return [_element(value, index) if position % 2 == 0 else value for position, value in enumerate(expression)]
+
+
+def _evaluate_numpy(expression: Expression, fixed_base: Optional[int]):
+    if isinstance(expression, int) or _is_operand_sequence(expression):
+        return _numpy_wrap(numpy.asarray(expression, dtype=numpy.int64))
+
+    first, *rest = expression
+    value = _evaluate_numpy(first, fixed_base)
+    for index in range(0, len(rest), 2):
+        operator, operand = rest[index:index + 2]
+        operand = _evaluate_numpy(operand, fixed_base)
+
+        # the operands are 32 bit integers, so no intermediate result overflows 64 bits
+        if fixed_base is not None and operator == BinaryOperator.TIMES:
+            value = _numpy_divide(_numpy_wrap(value * operand), numpy.int64(fixed_base))
+        elif fixed_base is not None and operator == BinaryOperator.DIVIDE:
+            value = _numpy_divide(_numpy_wrap(value * fixed_base), operand)
+        elif operator == BinaryOperator.PLUS:
+            value = _numpy_wrap(value + operand)
+        elif operator == BinaryOperator.MINUS:
+            value = _numpy_wrap(value - operand)
+        elif operator == BinaryOperator.TIMES:
+            value = _numpy_wrap(value * operand)
+        elif operator == BinaryOperator.DIVIDE:
+            value = _numpy_divide(value, operand)
+        else:
+            if numpy.any(operand == 0):
+                raise ZeroDivisionError("Cannot divide by zero")
+            value = numpy.mod(value, operand)
+    return value
+
+
+def _numpy_wrap(values):
+    return (values - INT_MIN) % 2 ** 32 + INT_MIN
+
+
+def _numpy_divide(a, b):
+    if numpy.any(b == 0):
+        raise ZeroDivisionError("Cannot divide by zero")
+    return _numpy_wrap(numpy.floor_divide(a, b))
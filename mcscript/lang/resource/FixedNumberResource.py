@@ -6,6 +6,7 @@ from mcscript.ir.command_components import StorageDataType, ScoreRelation, Binar
 from mcscript.ir.components import (StoreVarFromResultNode, GetFastVarNode, ConditionalNode, FastVarOperationNode)
 from mcscript.lang.Type import Type
 from mcscript.lang.atomic_types import Fixed
+from mcscript.lang.evaluator import operate
 from mcscript.lang.resource.base.ResourceBase import Resource, ValueResource
 from mcscript.lang.utility import compare_scoreboard_values, operate_scoreboard_values
 from mcscript.utils.JsonTextFormat.objectFormatter import format_nbt
@@ -55,7 +56,9 @@ class FixedNumberResource(ValueResource):
 
     def operation_times(self, other: FixedNumberResource, compileState: CompileState) -> FixedNumberResource:
         if self.is_static and other.is_static:
-            return FixedNumberResource(self.static_value * other.static_value // self.BASE, None)
+            return FixedNumberResource(
+                operate(self.static_value, other.static_value, BinaryOperator.TIMES, self.BASE), None
+            )
 
         # 1. a *= b
         # 2. a += base // 2 (for correct rounding, round(a) = int(a+0.5)), rounding not implemented for now(performance)
@@ -93,7 +96,9 @@ class FixedNumberResource(ValueResource):
 
     def operation_divide(self, other: FixedNumberResource, compileState: CompileState) -> FixedNumberResource:
         if self.is_static and other.is_static:
-            return FixedNumberResource(self.static_value * self.BASE // other.static_value, None)
+            return FixedNumberResource(
+                operate(self.static_value, other.static_value, BinaryOperator.DIVIDE, self.BASE), None
+            )
 
         # 1. a *= base
         # 1.a. (for correct rounding) a += base
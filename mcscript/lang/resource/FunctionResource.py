@@ -1,16 +1,26 @@
 from __future__ import annotations
 
-from typing import Dict, List, TYPE_CHECKING
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, Hashable, List, Optional, Set, TYPE_CHECKING
 
 from lark import Tree
 
 from mcscript.compiler.ContextType import ContextType
-from mcscript.exceptions.exceptions import McScriptInlineRecursionError
-from mcscript.ir.components import FunctionCallNode
+from mcscript.exceptions.exceptions import McScriptInlineRecursionError, McScriptUnexpectedTypeError
+from mcscript.ir import IRNode
+from mcscript.ir.components import FunctionCallNode, FunctionNode, RestoreFrameNode, SaveFrameNode
 from mcscript.lang.Type import Type
-from mcscript.lang.atomic_types import Function
+from mcscript.lang.atomic_types import Bool, Fixed, Function, Int, Null
+from mcscript.lang.resource.BooleanResource import BooleanResource
+from mcscript.lang.resource.FixedNumberResource import FixedNumberResource
+from mcscript.lang.resource.IntegerResource import IntegerResource
 from mcscript.lang.resource.NullResource import NullResource
-from mcscript.lang.resource.base.ResourceBase import GenericFunctionResource, Resource, ValueResource
+from mcscript.lang.resource.SelectorResource import SelectorResource
+from mcscript.lang.resource.StringResource import StringResource
+from mcscript.lang.resource.TupleResource import TupleResource
+from mcscript.lang.resource.base.ResourceBase import GenericFunctionResource, Resource, ValueResource, ObjectResource
+from mcscript.utils.resources import DataPath, ScoreboardValue
 
 if TYPE_CHECKING:
     from mcscript.compiler.CompileState import CompileState
@@ -18,16 +28,80 @@ if TYPE_CHECKING:
     from mcscript.lang.resource.StructObjectResource import StructObjectResource
 
 
+# the resources that can be returned from a function that is called at runtime
+RUNTIME_RETURN_TYPES = {
+    Int: IntegerResource,
+    Fixed: FixedNumberResource,
+    Bool: BooleanResource
+}
+
+
 class FunctionResource(GenericFunctionResource):
     """
-    A function which will execute at runtime
+    A function which will execute at runtime.
+
+    Small functions are inlined at every call site.
+    Functions that are larger than the inline limit of the config or that call themselves are generated once
+    and called at runtime with this calling convention:
+        - The caller copies the arguments to the parameter scores of the function
+        - The function copies its result to the return score, which the caller copies to a new score
+        - Before a recursive call, all scores that are written in the function are pushed to the frame stack
+          in the storage and restored afterwards
     """
 
+    @dataclass()
+    class Specialization:
+        """
+        A generated function that can be called again with parameters of the same shape.
+        Dynamic parameters are passed by copying them to the parameter scores.
+        """
+        function: FunctionNode
+        parameter_scores: List[Optional[ScoreboardValue]]
+        return_resource: ValueResource
+        # the scores that are saved on a recursive call. Filled after the function body was compiled
+        frame_scores: List[ScoreboardValue] = field(default_factory=list)
+
     def __init__(self, name: str, function_signature: FunctionSignature, code: Tree):
         self.function_signature = function_signature
         self.code = code
         self.name = name
 
+        # the generated functions by the fingerprints of the parameters and the environment.
+        # None if the function was called once with this key.
+        self.specializations: Dict[Hashable, Optional[FunctionResource.Specialization]] = {}
+        # the functions that are called at runtime by their keys. None if the function was inlined once for this key.
+        self.runtime_functions: Dict[Hashable, Optional[FunctionResource.Specialization]] = {}
+        # the runtime function whose body is currently compiled
+        self.active_runtime_function: Optional[FunctionResource.Specialization] = None
+
+    @cached_property
+    def free_names(self) -> Set[str]:
+        """ All variable names that are accessed in the function body """
+        return {str(accessor.children[0]) for accessor in self.code.find_data("accessor")}
+
+    @cached_property
+    def size(self) -> int:
+        """ The number of syntax tree nodes in the function body """
+        return sum(1 for _ in self.code.iter_subtrees())
+
+    def is_recursive(self, compile_state: CompileState) -> bool:
+        """ Whether the body contains a call to this function """
+        # names that are declared in the body shadow this function
+        namespace_context = compile_state.contexts[self.code.line, self.code.column]
+        local_names = set(namespace_context.variables)
+        for context in namespace_context.descendants():
+            local_names.update(context.variables)
+        local_names.update(str(i.children[1]) for i in self.code.find_data("function_definition"))
+
+        for function_call in self.code.find_data("function_call"):
+            accessor, *_ = function_call.children
+            name, *attributes = accessor.children
+            if attributes or name in local_names:
+                continue
+            if compile_state.currentContext().find_resource(name) is self:
+                return True
+        return False
+
     def make_method(self, self_object: StructObjectResource) -> MethodResource:
         return MethodResource(self_object, self)
 
@@ -36,16 +110,227 @@ class FunctionResource(GenericFunctionResource):
 
     def call(self, compile_state: CompileState, parameters: List[Resource],
              keyword_parameters: Dict[str, Resource]) -> Resource:
-        # ToDo: Check whether to use an already generated file
         if any(i is self.function_signature for i in compile_state.function_call_stack):
-            raise McScriptInlineRecursionError(self.function_signature, compile_state)
+            if self.active_runtime_function is None:
+                raise McScriptInlineRecursionError(self.function_signature, compile_state)
+            return self.call_recursive(compile_state, parameters, self.active_runtime_function)
 
         with compile_state.with_function(self.function_signature):
-            return self.generate_new(compile_state, parameters, keyword_parameters)
+            is_recursive = self.is_recursive(compile_state)
+            if is_recursive or self.size > compile_state.config.inline_limit:
+                key = self.runtime_key(compile_state, parameters)
+                if key in self.runtime_functions:
+                    if (specialization := self.runtime_functions[key]) is None:
+                        return self.generate_runtime_function(compile_state, parameters, key)
+                    return self.call_specialization(compile_state, parameters, specialization)
+                if key is not None:
+                    # a function that is only called once is inlined, unless it needs a frame stack
+                    self.runtime_functions[key] = None
+                    if is_recursive:
+                        return self.generate_runtime_function(compile_state, parameters, key)
+
+            key = self.specialization_key(compile_state, parameters)
+            if key is None:
+                return self.generate_new(compile_state, parameters, keyword_parameters)
+
+            if key not in self.specializations:
+                # most functions are only called once, which does not need the parameter scores
+                self.specializations[key] = None
+                return self.generate_new(compile_state, parameters, keyword_parameters)
+
+            if (specialization := self.specializations[key]) is None:
+                return self.generate_specialization(compile_state, parameters, key)
+
+            return self.call_specialization(compile_state, parameters, specialization)
+
+    def call_specialization(self, compile_state: CompileState, parameters: List[Resource],
+                            specialization: FunctionResource.Specialization) -> Resource:
+        for score, parameter in zip(specialization.parameter_scores, parameters):
+            if score is not None:
+                parameter.copy(score, compile_state)
+        compile_state.ir.append(FunctionCallNode(specialization.function))
+        return self._copy_return_value(compile_state, specialization.return_resource)
+
+    def call_recursive(self, compile_state: CompileState, parameters: List[Resource],
+                       specialization: FunctionResource.Specialization) -> Resource:
+        """ Calls the function from its own body and keeps the scores of the current call on the frame stack """
+        frames = DataPath(compile_state.config.storage_id, compile_state.config.get_storage("frames").split("."))
+        specialization.function["recursive"] = True
+
+        compile_state.ir.append(SaveFrameNode(frames, specialization.frame_scores))
+        for score, parameter in zip(specialization.parameter_scores, parameters):
+            parameter.copy(score, compile_state)
+        compile_state.ir.append(FunctionCallNode(specialization.function))
+        compile_state.ir.append(RestoreFrameNode(frames, specialization.frame_scores))
+
+        return self._copy_return_value(compile_state, specialization.return_resource)
+
+    def runtime_key(self, compile_state: CompileState, parameters: List[Resource]) -> Optional[Hashable]:
+        """
+        Creates the key for a function that is called at runtime.
+        All parameters are passed in scores, so only their types are part of the key.
+
+        Returns:
+            The key or None if the function cannot be called at runtime
+        """
+        if not all(isinstance(parameter, ValueResource) for parameter in parameters):
+            return None
+        if self.function_signature.returnType not in RUNTIME_RETURN_TYPES and \
+                self.function_signature.returnType != Null:
+            return None
+        return self.specialization_key(compile_state, parameters, static_parameters=False)
+
+    def generate_runtime_function(self, compile_state: CompileState, parameters: List[Resource],
+                                  key: Hashable) -> Resource:
+        """
+        Generates a function that reads all parameters from scores and stores its result in the return score.
+        The function is registered before its body is compiled, so that the body can call it recursively.
+        """
+        return_type = self.function_signature.returnType
+        parameter_scores = []
+        with compile_state.node_block(ContextType.FUNCTION, self.code) as block_function:
+            for template, parameter in zip(self.function_signature.parameters, parameters):
+                score = compile_state.expressionStack.next()
+                with compile_state.ir.with_previous():
+                    parameter.copy(score, compile_state)
+                parameter_scores.append(score)
+                compile_state.currentContext().add_var(template.name, type(parameter)(None, score))
+
+            if return_type in RUNTIME_RETURN_TYPES:
+                return_resource = RUNTIME_RETURN_TYPES[return_type](None, compile_state.expressionStack.next())
+            else:
+                return_resource = NullResource()
+
+            specialization = self.Specialization(block_function, parameter_scores, return_resource)
+            self.runtime_functions[key] = specialization
+
+            previous_function, self.active_runtime_function = self.active_runtime_function, specialization
+            try:
+                compile_state.compile_ast(self.code)
+            finally:
+                self.active_runtime_function = previous_function
+
+            return_value = compile_state.currentContext().return_resource or NullResource()
+            if isinstance(return_resource, ValueResource):
+                if not isinstance(return_value, ValueResource) or not return_value.type().matches(return_type):
+                    raise McScriptUnexpectedTypeError("return value", return_value.type(), return_type, compile_state)
+                return_value.copy(return_resource.scoreboard_value, compile_state)
+
+        compile_state.ir.append(FunctionCallNode(block_function))
+
+        specialization.frame_scores.extend(self._frame_scores(block_function, return_resource))
+        return self._copy_return_value(compile_state, return_resource)
+
+    @staticmethod
+    def _frame_scores(function: FunctionNode, return_resource: Resource) -> List[ScoreboardValue]:
+        """ Collects the scores that are written by the function and all functions that are called from it """
+        # a dict keeps the order of the scores
+        scores: Dict[ScoreboardValue, None] = {}
+        visited = {id(function)}
+        nodes: List[IRNode] = [function]
+        while nodes:
+            node = nodes.pop()
+            for score in node.written_scoreboard_values():
+                scores[score] = None
+            nodes.extend(node.inner_nodes)
+            if isinstance(node, FunctionCallNode) and id(node["function"]) not in visited:
+                visited.add(id(node["function"]))
+                nodes.append(node["function"])
+
+        if isinstance(return_resource, ValueResource):
+            scores.pop(return_resource.scoreboard_value, None)
+        return list(scores)
+
+    def specialization_key(self, compile_state: CompileState, parameters: List[Resource],
+                           static_parameters: bool = True) -> Optional[Hashable]:
+        """
+        Creates a key which is equal for calls that generate the same function.
+        The key consists of the static values or types of the parameters and of the resources
+        that the names used in the body refer to at the call site.
+
+        Args:
+            compile_state: the compile state
+            parameters: the parameters of the call
+            static_parameters: whether static parameters are inlined into the function
+
+        Returns:
+            The key or None if the function must be generated for this call
+        """
+        # imported here to avoid a cyclic import
+        from mcscript.compiler.common import changes_outer_state
+
+        parameter_fingerprints = []
+        for parameter in parameters:
+            if isinstance(parameter, ValueResource):
+                if static_parameters and parameter.is_static:
+                    fingerprint = type(parameter), parameter.static_value
+                else:
+                    fingerprint = type(parameter)
+            elif isinstance(parameter, StringResource):
+                fingerprint = type(parameter), parameter.static_value
+            elif isinstance(parameter, SelectorResource):
+                fingerprint = type(parameter), str(parameter.value)
+            else:
+                return None
+            parameter_fingerprints.append(fingerprint)
+
+        environment = []
+        for name in sorted(self.free_names):
+            resource = compile_state.currentContext().find_resource(name)
+            if isinstance(resource, (ObjectResource, TupleResource)):
+                # the attributes or elements may change without changing the resource
+                return None
+            environment.append((resource, resource.static_value) if isinstance(resource, ValueResource) else resource)
+
+        if changes_outer_state(compile_state, self.code, ignored_functions=(self,)):
+            return None
+
+        try:
+            key = tuple(parameter_fingerprints), tuple(environment)
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def generate_specialization(self, compile_state: CompileState, parameters: List[Resource],
+                                key: Hashable) -> Resource:
+        """
+        Generates a function whose dynamic parameters are read from fixed scores
+        and stores it for calls with the same key.
+        """
+        parameter_scores = []
+        with compile_state.node_block(ContextType.FUNCTION, self.code) as block_function:
+            for template, parameter in zip(self.function_signature.parameters, parameters):
+                score = None
+                if isinstance(parameter, ValueResource) and not parameter.is_static:
+                    score = compile_state.expressionStack.next()
+                    with compile_state.ir.with_previous():
+                        parameter.copy(score, compile_state)
+                    parameter = type(parameter)(None, score)
+                parameter_scores.append(score)
+                compile_state.currentContext().add_var(template.name, parameter)
+
+            compile_state.compile_ast(self.code)
+            return_value = compile_state.currentContext().return_resource or NullResource()
+
+        compile_state.ir.append(FunctionCallNode(block_function))
+
+        if not isinstance(return_value, ValueResource):
+            return return_value
+
+        self.specializations[key] = self.Specialization(block_function, parameter_scores, return_value)
+        return self._copy_return_value(compile_state, return_value)
+
+    @staticmethod
+    def _copy_return_value(compile_state: CompileState, return_value: ValueResource) -> ValueResource:
+        """ The function may be called again, so the caller gets its own copy of a dynamic return value """
+        if return_value.is_static:
+            return type(return_value)(return_value.static_value)
+        return return_value.copy(compile_state.expressionStack.next(), compile_state)
 
     def generate_new(self, compile_state: CompileState, parameters: List[Resource],
                      keyword_parameters: Dict[str, Resource]) -> Resource:
-        with compile_state.node_block(ContextType.FUNCTION, self.code.line, self.code.column) as block_function:
+        with compile_state.node_block(ContextType.FUNCTION, self.code) as block_function:
             for template, parameter in zip(self.function_signature.parameters, parameters):
                 compile_state.currentContext().add_var(template.name, parameter)
 
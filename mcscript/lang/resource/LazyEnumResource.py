@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from typing import Callable, Iterable, Optional, TYPE_CHECKING
+
+from mcscript.exceptions.exceptions import McScriptUndefinedAttributeError
+from mcscript.lang.resource.EnumResource import EnumResource
+from mcscript.lang.resource.IntegerResource import IntegerResource
+from mcscript.lang.resource.base.ResourceBase import Resource
+
+if TYPE_CHECKING:
+    from mcscript.compiler.CompileState import CompileState
+    from mcscript.utils.JsonTextFormat.ResourceTextFormatter import ResourceTextFormatter
+
+
+class LazyEnumResource(EnumResource):
+    """
+    An enum whose members are created on first access.
+    Used for the large enums of the minecraft data, where a script only ever accesses a few members.
+    """
+
+    def __init__(self, resolve: Callable[[str], Optional[int]], members: Callable[[], Iterable[str]]):
+        """
+        Args:
+            resolve: returns the value of a member or None if the member does not exist
+            members: returns the names of all members, only used when the whole enum is needed
+        """
+        super().__init__()
+        self.resolve = resolve
+        self.members = members
+
+    def getAttribute(self, compileState: CompileState, name: str) -> Resource:
+        if name not in self.public_namespace:
+            value = self.resolve(name)
+            if value is None:
+                raise McScriptUndefinedAttributeError(self, name, compileState)
+            self.public_namespace[name] = IntegerResource(value, None)
+        return self.public_namespace[name]
+
+    def to_json_text(self, compileState: CompileState, formatter: ResourceTextFormatter) -> list:
+        for name in self.members():
+            self.getAttribute(compileState, name)
+        return super().to_json_text(compileState, formatter)
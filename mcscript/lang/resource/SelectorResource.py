@@ -22,13 +22,11 @@ class SelectorResource(Resource):
     def __init__(self, value: str, compileState: CompileState = None):
         super().__init__()
         if compileState is not None:
-            namespace_dict = compileState.currentContext().as_dict()
-            replacements = {key: str(namespace_dict[key].resource) for key in namespace_dict}
-
-            value = Selector.from_string(StringResource.StringFormatter().format(value, **replacements), compileState)
+            replacements = compileState.currentContext().resources()
+            value = Selector.from_string(StringResource.formatter.vformat(value, (), replacements), compileState)
 
             value.verify(compileState)
-            value.sort()
+            value = value.sorted()
         else:
             value = Selector.from_string(value)
 
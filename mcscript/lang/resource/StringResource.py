@@ -56,10 +56,7 @@ class StringResource(Resource):
         self.length = len(value)
 
         if context is not None:
-            namespace_dict = context.as_dict()
-            replacements = {
-                key: namespace_dict[key].resource for key in namespace_dict}
-            self.static_value = self.formatter.format(self.static_value, **replacements)
+            self.static_value = self.formatter.vformat(self.static_value, (), context.resources())
 
     def type(self) -> Type:
         return String
@@ -4,16 +4,21 @@ import json
 from typing import TYPE_CHECKING, List
 
 from mcscript.data.selector.Selector import Selector
-from mcscript.exceptions.exceptions import McScriptUnexpectedTypeError
-from mcscript.ir.components import MessageNode, StoreFastVarFromResultNode, CommandNode, StoreFastVarNode
-from mcscript.lang.atomic_types import String, Any, Null, Int
+from mcscript.exceptions.exceptions import McScriptArgumentError, McScriptUnexpectedTypeError
+from mcscript.ir.components import (MessageNode, StoreFastVarFromResultNode, CommandNode, StoreFastVarNode,
+                                    FunctionCallNode)
+from mcscript.lang.atomic_types import String, Any, Null, Int, Fixed, Selector as SelectorType
+from mcscript.lang.resource.BooleanResource import BooleanResource
+from mcscript.lang.resource.FixedNumberResource import FixedNumberResource
 from mcscript.lang.resource.IntegerResource import IntegerResource
 from mcscript.lang.resource.MacroResource import MacroResource
 from mcscript.lang.resource.NullResource import NullResource
+from mcscript.lang.resource.SelectorResource import SelectorResource
 from mcscript.lang.resource.StringResource import StringResource
 from mcscript.lang.resource.base.ResourceBase import Resource, ValueResource
 from mcscript.lang.resource.base.functionSignature import FunctionParameter
 from mcscript.lang.std import macro
+from mcscript.lang.std.builtins import lookup_table, selector_cache
 from mcscript.utils.JsonTextFormat.MarkupParser import MarkupParser
 from mcscript.utils.JsonTextFormat.objectFormatter import format_text, format_score
 from mcscript.utils.Scoreboard import Scoreboard
@@ -134,6 +139,102 @@ def execute(compile_state: CompileState, string: StringResource) -> NullResource
     return NullResource()
 
 
+@macro(
+    parameters=[
+        FunctionParameter("function", String, accepts=FunctionParameter.ResourceMode.STATIC),
+        FunctionParameter("value", Any),
+        FunctionParameter("min", Any, accepts=FunctionParameter.ResourceMode.STATIC),
+        FunctionParameter("max", Any, accepts=FunctionParameter.ResourceMode.STATIC),
+        FunctionParameter("step", Any, accepts=FunctionParameter.ResourceMode.STATIC)
+    ],
+    return_type=Fixed
+)
+def lut(compile_state: CompileState, function: StringResource, value: Resource, min_: Resource, max_: Resource,
+        step: Resource) -> FixedNumberResource:
+    """
+    Evaluates a math function with a lookup table that is computed at compile time.
+    The table contains the function values for `min, min + step, ...` up to `max`,
+    an input is rounded down to the previous entry and inputs outside of the range use the first or last entry.
+    The lookup is a binary search, which takes about 2 * log2(entries) commands.
+
+    Available functions are sin, cos, tan, asin, acos, atan (angles in degrees), sqrt, exp, log, log2 and log10.
+    The value can be an Int or a Fixed number and the result is a Fixed number.
+
+    Example: `lut("sin", angle, 0, 359, 1)`
+    """
+    if function.static_value not in lookup_table.FUNCTIONS:
+        raise McScriptArgumentError(f"Unknown function '{function.static_value}' for lut. "
+                                    f"Expected one of {', '.join(lookup_table.FUNCTIONS)}", compile_state)
+    if not isinstance(value, (IntegerResource, FixedNumberResource)) or isinstance(value, BooleanResource):
+        raise McScriptUnexpectedTypeError("value", value.type(), "Int or Fixed", compile_state)
+
+    scale = FixedNumberResource.BASE if isinstance(value, FixedNumberResource) else 1
+    bounds = []
+    for name, bound in (("min", min_), ("max", max_), ("step", step)):
+        if type(bound) is FixedNumberResource and scale != 1:
+            bounds.append(bound.static_value)
+        elif type(bound) is IntegerResource:
+            bounds.append(bound.static_value * scale)
+        else:
+            raise McScriptUnexpectedTypeError(name, bound.type(), value.type(), compile_state)
+    start, stop, step_size = bounds
+
+    if step_size <= 0 or stop < start:
+        raise McScriptArgumentError("The step of a lookup table must be positive and max must not be less than min",
+                                    compile_state)
+    if (stop - start) // step_size + 1 > lookup_table.MAX_ENTRIES:
+        raise McScriptArgumentError(f"A lookup table may have at most {lookup_table.MAX_ENTRIES} entries",
+                                    compile_state)
+
+    try:
+        if value.is_static:
+            values = lookup_table.sample(function.static_value, start, stop, step_size, scale)
+            index = min(max((value.static_value - start) // step_size, 0), len(values) - 1)
+            return FixedNumberResource(values[index], None)
+
+        table = lookup_table.get_lookup_table(compile_state, function.static_value, start, stop, step_size, scale)
+    except ValueError:
+        raise McScriptArgumentError(f"The function '{function.static_value}' is not defined for every value "
+                                    f"of the lookup table", compile_state)
+    except OverflowError:
+        raise McScriptArgumentError(f"The function '{function.static_value}' is too large for some values "
+                                    f"of the lookup table", compile_state)
+
+    value.copy(table.input_score, compile_state)
+    compile_state.ir.append(FunctionCallNode(table.function))
+    return FixedNumberResource(None, table.result_score).copy(compile_state.expressionStack.next(), compile_state)
+
+
+@macro(
+    parameters=[
+        FunctionParameter("selector", SelectorType),
+        FunctionParameter("interval", Int, accepts=FunctionParameter.ResourceMode.STATIC)
+    ],
+    return_type=SelectorType
+)
+def cache(compile_state: CompileState, selector: SelectorResource, interval: IntegerResource) -> SelectorResource:
+    """
+    Caches the entities that match an expensive selector, like one with nbt, in a tag.
+    Returns `@e[tag=...]`, which is cheap to evaluate. The cache is refreshed when the datapack is loaded
+    and after that every `interval` ticks, independent of where `cache` is used.
+    With an interval of 0 the cache is instead refreshed every time `cache` is called, for example in an event.
+    The cache is refreshed at the world spawn without an executing entity,
+    so positional arguments require x, y and z.
+
+    Example: `run for cache(@e[nbt={Glowing: 1b}], 20) { ... }`
+    """
+    reason = selector_cache.check_selector(selector.value)
+    if reason:
+        raise McScriptArgumentError(f"Cannot cache selector '{selector.value}': {reason}", compile_state)
+    if interval.static_value < 0:
+        raise McScriptArgumentError("The interval of a selector cache must not be negative", compile_state)
+
+    cached = selector_cache.get_selector_cache(compile_state, selector.value, interval.static_value)
+    if cached.interval == 0:
+        compile_state.ir.append(FunctionCallNode(cached.function))
+    return SelectorResource(str(cached.tagged))
+
+
 # Pycharm cannot apply the type macro at type-check time (Which actually creates a MacroResource)
 # noinspection PyTypeChecker
 EXPORTS: List[MacroResource] = [
@@ -142,4 +243,6 @@ EXPORTS: List[MacroResource] = [
     set_score,
     evaluate,
     execute,
+    lut,
+    cache,
 ]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple, TYPE_CHECKING
+
+from mcscript.ir import IRNode
+from mcscript.ir.command_components import ScoreRange
+from mcscript.ir.components import ConditionalNode, FunctionCallNode, FunctionNode, IfNode, StoreFastVarNode
+from mcscript.lang.evaluator import INT_MAX, INT_MIN
+from mcscript.lang.resource.FixedNumberResource import FixedNumberResource
+from mcscript.utils.addressCounter import ContentAddressCounter
+from mcscript.utils.resources import ScoreboardValue
+
+if TYPE_CHECKING:
+    from mcscript.compiler.CompileState import CompileState
+
+# the functions that can be tabulated. Angles are in degrees.
+FUNCTIONS: Dict[str, Callable[[float], float]] = {
+    "sin": lambda x: math.sin(math.radians(x)),
+    "cos": lambda x: math.cos(math.radians(x)),
+    "tan": lambda x: math.tan(math.radians(x)),
+    "asin": lambda x: math.degrees(math.asin(x)),
+    "acos": lambda x: math.degrees(math.acos(x)),
+    "atan": lambda x: math.degrees(math.atan(x)),
+    "sqrt": math.sqrt,
+    "exp": math.exp,
+    "log": math.log,
+    "log2": math.log2,
+    "log10": math.log10
+}
+
+# the maximum number of entries of a table
+MAX_ENTRIES = 4096
+
+
+@dataclass()
+class LookupTable:
+    """
+    A table of precomputed function values, which is searched at runtime with a binary search over the input.
+    The search calls one function per level, so a lookup takes about 2 * log2(entries) commands.
+    """
+    input_score: ScoreboardValue
+    result_score: ScoreboardValue
+    function: FunctionNode
+
+
+def sample(function: str, start: int, stop: int, step: int, scale: int) -> List[int]:
+    """
+    Computes the values of the function at `start, start + step, ...` up to `stop` inclusive.
+    The inputs are scaled by `scale` and the results are fixed point numbers, clamped to the range of a score.
+
+    Raises:
+        ValueError: if the function is not defined at any of the inputs
+        OverflowError: if the function is not finite at any of the inputs
+    """
+    values = []
+    for value in range(start, stop + 1, step):
+        result = FUNCTIONS[function](value / scale)
+        if not math.isfinite(result):
+            raise OverflowError(f"{function}({value / scale}) is not finite")
+        values.append(min(max(FixedNumberResource.fromNumber(result).static_value, INT_MIN), INT_MAX))
+    return values
+
+
+def get_lookup_table(compile_state: CompileState, function: str, start: int, stop: int, step: int,
+                     scale: int) -> LookupTable:
+    """
+    Returns the lookup table for the function with the inputs `start, start + step, ...` up to `stop`.
+    The table is generated once per compilation and shared by all lookups with the same arguments.
+
+    Raises:
+        ValueError: if the function is not defined at any of the inputs
+        OverflowError: if the function is not finite at any of the inputs
+    """
+    key = function, start, stop, step, scale
+    tables: Dict[Tuple, LookupTable] = compile_state.lookup_tables
+    if key not in tables:
+        tables[key] = _generate(compile_state, key, sample(function, start, stop, step, scale))
+    return tables[key]
+
+
+def _generate(compile_state: CompileState, key: Tuple, values: List[int]) -> LookupTable:
+    function, start, _stop, step, _scale = key
+    identifier = ContentAddressCounter().next_identifier(" ".join(map(str, key)))
+    input_score = compile_state.scoreboard_value(f".lut_{identifier}_in")
+    result_score = compile_state.scoreboard_value(f".lut_{identifier}_out")
+
+    def build(low: int, high: int) -> IRNode:
+        """ Generates the search for the entries in [low, high) """
+        if high - low == 1:
+            return StoreFastVarNode(result_score, values[low])
+
+        middle = (low + high) // 2
+        functions = []
+        for branch_low, branch_high in ((low, middle), (middle, high)):
+            name = compile_state.resource_specifier_main(f"lut_{identifier}_{branch_low}_{branch_high}")
+            with compile_state.ir.with_function(name) as branch:
+                compile_state.ir.append(build(branch_low, branch_high))
+            functions.append(branch)
+
+        # every input below the first input of the middle entry belongs to the lower half
+        bound = start + middle * step - 1
+        return IfNode(
+            ConditionalNode([ConditionalNode.IfScoreMatches(input_score, ScoreRange(-math.inf, bound), False)]),
+            FunctionCallNode(functions[0]),
+            FunctionCallNode(functions[1])
+        )
+
+    with compile_state.ir.with_function(compile_state.resource_specifier_main(f"lut_{identifier}")) as root:
+        compile_state.ir.append(build(0, len(values)))
+
+    return LookupTable(input_score, result_score, root)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Tuple, TYPE_CHECKING
+
+from mcscript.data.selector.Selector import POSITIONAL_ARGUMENTS, Selector
+from mcscript.ir.components import CommandNode, FunctionCallNode, FunctionNode
+from mcscript.utils.addressCounter import ContentAddressCounter
+
+if TYPE_CHECKING:
+    from mcscript.compiler.CompileState import CompileState
+
+# the selectors that can be cached. The others depend on the executing entity.
+CACHEABLE_SELECTORS = ("e", "a")
+# the sort orders that depend on the position the selector is evaluated at
+POSITIONAL_SORTS = {"nearest", "furthest"}
+
+
+@dataclass()
+class SelectorCache:
+    """
+    A tag on all entities that matched a selector when the cache was refreshed last.
+    The refresh function tags the entities again and schedules itself after `interval` ticks,
+    so the selector is evaluated once per interval instead of every time it is used.
+    It is started once when the datapack is loaded. A cache with an interval of 0 is refreshed on every use instead.
+    """
+    selector: Selector
+    tag: str
+    interval: int
+    function: FunctionNode
+
+    @property
+    def tagged(self) -> Selector:
+        """ The cheap selector for the cached entities """
+        return Selector.from_string(f"@{self.selector.selector}[tag={self.tag}]")
+
+
+def check_selector(selector: Selector) -> str:
+    """
+    Returns why the selector can not be cached, or an empty string.
+    The refresh function runs without an executing entity at the world spawn,
+    so the selector must not depend on either.
+    """
+    if selector.selector not in CACHEABLE_SELECTORS:
+        return f"Only {', '.join('@' + i for i in CACHEABLE_SELECTORS)} selectors can be cached"
+
+    names = {i.selector.name for i in selector.arguments}
+    sorts = {str(i.value) for i in selector.arguments if i.selector.name == "sort"}
+    if names & POSITIONAL_ARGUMENTS and not {"x", "y", "z"} <= names:
+        return "A cached selector with positional arguments must specify x, y and z"
+    if sorts & POSITIONAL_SORTS and not {"x", "y", "z"} <= names:
+        return "A cached selector sorted by distance must specify x, y and z"
+    return ""
+
+
+def get_selector_cache(compile_state: CompileState, selector: Selector, interval: int) -> SelectorCache:
+    """
+    Returns the cache for the selector with this refresh interval in ticks.
+    The cache is generated once per compilation and shared by all uses with the same arguments.
+    """
+    key = str(selector), interval
+    caches: Dict[Tuple, SelectorCache] = compile_state.selector_caches
+    if key not in caches:
+        caches[key] = _generate(compile_state, selector, interval)
+    return caches[key]
+
+
+def _generate(compile_state: CompileState, selector: Selector, interval: int) -> SelectorCache:
+    identifier = ContentAddressCounter().next_identifier(f"{selector} {interval}")
+    tag = f"mcs_cache_{identifier}"
+    name = compile_state.resource_specifier_main(f"cache_{identifier}")
+
+    tagged = Selector.from_string(f"@{selector.selector}[tag={tag}]")
+    with compile_state.ir.with_function(name) as function:
+        compile_state.ir.append(CommandNode(f"tag {tagged} remove {tag}"))
+        compile_state.ir.append(CommandNode(f"tag {selector} add {tag}"))
+        if interval > 0:
+            compile_state.ir.append(CommandNode(f"schedule function {name} {interval}t"))
+    # the function schedules itself, so it must not be inlined
+    function["recursive"] = interval > 0
+
+    return SelectorCache(selector, tag, interval, function)
+
+
+def start_selector_caches(compile_state: CompileState) -> List[FunctionCallNode]:
+    """ Returns the calls that start the timed caches. They have to run once when the datapack is loaded. """
+    return [FunctionCallNode(cache.function) for cache in compile_state.selector_caches.values() if cache.interval > 0]
@@ -4,6 +4,7 @@ from typing import TYPE_CHECKING, Union
 
 from mcscript.ir.command_components import ScoreRelation, BinaryOperator
 from mcscript.ir.components import ConditionalNode, FastVarOperationNode
+from mcscript.lang.evaluator import operate
 from mcscript.lang.resource.base.ResourceBase import Resource, ValueResource
 from mcscript.utils.resources import ScoreboardValue
 
@@ -67,21 +68,13 @@ def operate_scoreboard_values(compile_state: CompileState, a: ValueResource, b:
 
     Returns:
         Either a static int or a scoreboard value
-    """
 
-    # noinspection PyShadowingNames
-    def numeric_operation_static(a: int, b: int, operator: BinaryOperator) -> int:
-        actions = {
-            BinaryOperator.PLUS: lambda first, second: first + second,
-            BinaryOperator.MINUS: lambda first, second: first - second,
-            BinaryOperator.TIMES: lambda first, second: first * second,
-            BinaryOperator.DIVIDE: lambda first, second: first // second,
-            BinaryOperator.MODULO: lambda first, second: first % second
-        }
-        return actions[operator](a, b)
+    Raises:
+        ZeroDivisionError: if both values are static and the second value is zero
+    """
 
     if a.is_static and b.is_static:
-        return numeric_operation_static(a.static_value, b.static_value, operator)
+        return operate(a.static_value, b.static_value, operator)
 
     # Most performance: performing the operation with a scoreboard value
     # as the first operand and a static value as the seconds operand
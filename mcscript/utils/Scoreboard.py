@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
-from functools import cached_property
+from functools import cached_property, lru_cache
+from logging import DEBUG
 from typing import List
 
 from mcscript import Logger
@@ -11,8 +12,33 @@ def _char_range(start, end) -> List[str]:
 
 VALID_OBJECTIVE_CHARACTERS = _char_range("0", "9") + _char_range("A", "Z") + _char_range("a", "z") + list("_-.+")
 
+# all identifiers with two digits, so that an index is encoded with one divmod per two digits
+_DIGIT_PAIRS = [a + b for a in VALID_OBJECTIVE_CHARACTERS for b in VALID_OBJECTIVE_CHARACTERS]
 
-@dataclass
+
+@lru_cache(maxsize=4096)
+def encode_index(index: int) -> str:
+    """
+    Converts the index to a number base `len(VALID_OBJECTIVE_CHARACTERS)` using the valid objective alphabet.
+
+    >>> encode_index(0), encode_index(65), encode_index(66)
+    ('0', '+', '10')
+    """
+    base = len(VALID_OBJECTIVE_CHARACTERS)
+    if index < base:
+        return VALID_OBJECTIVE_CHARACTERS[index]
+
+    out = []
+    while index >= base:
+        index, rest = divmod(index, base * base)
+        out.append(_DIGIT_PAIRS[rest])
+    if index > 0:
+        out.append(VALID_OBJECTIVE_CHARACTERS[index])
+    return "".join(reversed(out)).lstrip("0")
+
+
+# compared by identity, so that scoreboard values can be interned per scoreboard
+@dataclass(eq=False)
 class Scoreboard:
     name: str
     use_real_name: bool
@@ -25,7 +51,8 @@ class Scoreboard:
         if self.index >= len(VALID_OBJECTIVE_CHARACTERS) ** 3:
             raise ValueError(
                 f"Maximum id exceeded: {self.index} expected at most {len(VALID_OBJECTIVE_CHARACTERS) ** 3 - 1}")
-        Logger.debug(f"[Scoreboard] created {self.name} with id {self.get_name()}")
+        if Logger.isEnabledFor(DEBUG):
+            Logger.debug(f"[Scoreboard] created {self.name} with id {self.get_name()}")
 
     def get_name(self) -> str:
         if self.use_real_name:
@@ -42,16 +69,7 @@ class Scoreboard:
         """
         from mcscript.data.Config import Config
 
-        out = []
-        index = self.index
-        while index >= len(VALID_OBJECTIVE_CHARACTERS):
-            index, rest = divmod(index, len(VALID_OBJECTIVE_CHARACTERS))
-            out.append(rest)
-        out.append(index)
-        return "{}.{}".format(
-            Config.currentConfig.get_scoreboard("main"),
-            "".join(VALID_OBJECTIVE_CHARACTERS[i] for i in reversed(out))
-        )
+        return "{}.{}".format(Config.currentConfig.get_scoreboard("main"), encode_index(self.index))
 
     def __repr__(self) -> str:
         return f"Scoreboard({self.get_name()})"
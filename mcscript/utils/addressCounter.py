@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from hashlib import blake2s
+from typing import Dict
+
 from mcscript.utils.Scoreboard import Scoreboard
 from mcscript.utils.resources import ScoreboardValue, Identifier, DataPath
 
@@ -90,3 +93,35 @@ class StorageAddressCounter(AddressCounter):
         a = StorageAddressCounter(self.base_path, self.fmt_str, self.default)
         a.value = self.value
         return a
+
+
+class ContentAddressCounter:
+    """
+    Generates identifiers from a hash of some content.
+    The identifier only depends on the content and on how often the same content was used before,
+    so it does not change if unrelated content is added or removed.
+
+    >>> a = ContentAddressCounter("block_{}_")
+    >>> a.next("foo")
+    'block_073ff7a4_0_'
+    >>> a.next("bar")
+    'block_358d3f36_0_'
+    >>> a.next("foo")
+    'block_073ff7a4_1_'
+    """
+
+    def __init__(self, fmt_string: str = "{}", digest_size: int = 4):
+        self.fmt_str = fmt_string
+        self.digest_size = digest_size
+        # how often each digest was used
+        self.occurrences: Dict[str, int] = {}
+
+    def next_identifier(self, content: str) -> str:
+        """ Returns the unique identifier for this content without the format string. """
+        digest = blake2s(content.encode(), digest_size=self.digest_size).hexdigest()
+        occurrence = self.occurrences.get(digest, 0)
+        self.occurrences[digest] = occurrence + 1
+        return f"{digest}_{occurrence}"
+
+    def next(self, content: str) -> str:
+        return self.fmt_str.format(self.next_identifier(content))
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
-from typing import Set, List
+from typing import Iterable, Set, Tuple
+from weakref import WeakValueDictionary
 
 from mcscript.utils.Scoreboard import Scoreboard
 
@@ -20,29 +22,87 @@ class Identifier(str):
                                     | {chr(i) for i in range(ord('A'), ord('Z') + 1)} \
                                     | {'0', '1', '2', '3', '4', '5', '6', '7', '8', '9'} \
                                     | {'_', '.', '-', '+', '#'}
+    _pattern = re.compile(r"[a-zA-Z0-9_.\-+#]*")
 
     def __new__(cls, content):
-        for char in content:
-            if char not in cls.allowed_identifiers:
-                raise ValueError(f"Failed to create Identifier({content}): Character '{char}' is not allowed.\n"
-                                 f"Use one of {list(sorted(cls.allowed_identifiers))}")
+        if cls._pattern.fullmatch(content) is None:
+            char = next(char for char in content if char not in cls.allowed_identifiers)
+            raise ValueError(f"Failed to create Identifier({content}): Character '{char}' is not allowed.\n"
+                             f"Use one of {list(sorted(cls.allowed_identifiers))}")
         # noinspection PyArgumentList
         return str.__new__(cls, content)
 
 
-@dataclass(frozen=True)
-class ScoreboardValue:
+class _Interned:
+    """
+    Base class for immutable values that are interned: creating a value that is equal to an existing value
+    returns the existing object. Equality and hashing are therefore based on identity.
+    The interning table holds weak references, so unused values are garbage collected.
+    """
+    __slots__ = ("__weakref__",)
+    _fields: Tuple[str, ...] = ()
+    _table: WeakValueDictionary
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._table = WeakValueDictionary()
+
+    @classmethod
+    def _intern(cls, *values):
+        # the key must not reference the new object, else it would be kept alive by the table
+        instance = cls._table.get(values)
+        if instance is None:
+            instance = object.__new__(cls)
+            for name, value in zip(cls._fields, values):
+                object.__setattr__(instance, name, value)
+            cls._table[values] = instance
+        return instance
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"cannot assign to field '{key}' of immutable {type(self).__name__}")
+
+    def __delattr__(self, key):
+        raise AttributeError(f"cannot delete field '{key}' of immutable {type(self).__name__}")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, name) for name in self._fields)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+
+class ScoreboardValue(_Interned):
+    """ A score holder on a scoreboard """
+    __slots__ = ("value", "scoreboard")
+    _fields = __slots__
+
     value: Identifier
     scoreboard: Scoreboard
 
+    def __new__(cls, value: Identifier, scoreboard: Scoreboard):
+        return cls._intern(value, scoreboard)
+
     def __str__(self):
         return f"{self.value} {self.scoreboard.get_name()}"
 
 
-@dataclass(frozen=True)
-class DataPath:
+class DataPath(_Interned):
+    """ A path to a nbt value in a storage """
+    __slots__ = ("storage", "path")
+    _fields = __slots__
+
     storage: ResourceSpecifier
-    path: List[str]
+    path: Tuple[str, ...]
+
+    def __new__(cls, storage: ResourceSpecifier, path: Iterable[str]):
+        return cls._intern(storage, tuple(path))
 
     def dotted_path(self) -> str:
         return ".".join(self.path)
@@ -51,14 +111,11 @@ class DataPath:
         return self.path[-1]
 
     def last_element_indexed(self, index: int) -> DataPath:
-        new_path = self.path[:]
-        new_path[-1] += f"[{index}]"
-        return DataPath(self.storage, new_path)
+        *parents, last = self.path
+        return DataPath(self.storage, (*parents, f"{last}[{index}]"))
 
     def __add__(self, other: str) -> DataPath:
         if not isinstance(other, str):
             return NotImplemented
 
-        new_path = self.path[:]
-        new_path.append(other)
-        return DataPath(self.storage, new_path)
+        return DataPath(self.storage, self.path + (other,))
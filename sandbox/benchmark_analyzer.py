@@ -0,0 +1,49 @@
+"""
+Benchmarks parsing and analyzing a deeply nested script with many variables.
+
+Every block declares some variables and reads and writes variables of all outer blocks.
+Run from the repository root: `python -m sandbox.benchmark_analyzer [depth] [variables]`
+"""
+import sys
+from time import perf_counter
+
+from mcscript import get_grammar
+from mcscript.analyzer.Analyzer import Analyzer
+
+
+def generate_script(depth: int, variables: int) -> str:
+    lines = []
+    for level in range(depth):
+        indent = "  " * level
+        for index in range(variables):
+            lines.append(f"{indent}let v{level}_{index} = {index}")
+        for outer in range(level):
+            lines.append(f"{indent}v{outer}_0 += v{level}_0 + v{outer}_{variables - 1}")
+        lines.append(f"{indent}if v{level}_0 == 0 {{")
+    for level in reversed(range(depth)):
+        lines.append("  " * level + "}")
+    return "\n".join(lines)
+
+
+def main(depth: int = 60, variables: int = 40, repeat: int = 5):
+    code = generate_script(depth, variables)
+    grammar = get_grammar()
+
+    parse_times = []
+    analyze_times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        tree, events = grammar.options.transformer.parse(grammar, code)
+        parse_times.append(perf_counter() - start)
+
+        start = perf_counter()
+        Analyzer().analyze(tree, events)
+        analyze_times.append(perf_counter() - start)
+
+    print(f"depth={depth} variables per block={variables} lines={code.count(chr(10)) + 1}")
+    for name, times in (("parse", parse_times), ("analyze", analyze_times)):
+        print(f"{name}: best {min(times) * 1000:.1f}ms, mean {sum(times) / len(times) * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,70 @@
+"""
+Benchmarks the cold load of the blocks, which happens once per compilation that uses block states.
+
+Compares parsing the json blocks report with mapping the binary block table, on a synthetic report
+about the size of the blocks report of minecraft 1.16 (~760 blocks, ~19000 states).
+Run from the repository root: `python -m sandbox.benchmark_block_table [blocks]`
+"""
+import json
+import sys
+import tempfile
+from itertools import count
+from time import perf_counter
+
+from mcscript.assets import block_table, data_store
+from mcscript.data.minecraft_data import blocks
+
+
+def make_report(block_count: int):
+    ids = count()
+    properties = [
+        {},
+        {"facing": ["north", "south", "west", "east"], "half": ["top", "bottom"],
+         "shape": ["straight", "inner_left", "inner_right", "outer_left", "outer_right"],
+         "waterlogged": ["true", "false"]},
+        {"axis": ["x", "y", "z"]},
+        {"power": [str(i) for i in range(16)]},
+    ]
+    report = {}
+    for index in range(block_count):
+        block_properties = properties[index % len(properties)]
+        states = 1
+        for values in block_properties.values():
+            states *= len(values)
+        report[f"minecraft:block_{index}"] = {
+            "properties": block_properties,
+            "states": [{"id": next(ids)} for _ in range(states)]
+        }
+    return report
+
+
+def measure(name: str, function):
+    start = perf_counter()
+    function()
+    print(f"{name}: {(perf_counter() - start) * 1000:.1f}ms")
+
+
+def main(block_count: int = 760):
+    with tempfile.TemporaryDirectory() as directory:
+        data_store.OBJECT_DIR = directory
+        report = make_report(block_count)
+        key = data_store.put(report)
+        print(f"{len(report)} blocks, {sum(len(i['states']) for i in report.values())} states")
+
+        def load_json():
+            with open(data_store.object_path(key), encoding="utf-8") as f:
+                blocks.loadBlocks(json.load(f))
+
+        def load_table():
+            block_table.close_block_tables()
+            blocks.loadBlockTable(block_table.load_block_table(key))
+
+        measure("json", load_json)
+        measure("create table", lambda: block_table.load_block_table(key))
+        measure("mapped table", load_table)
+        # the mapped file can not be removed while it is open on Windows
+        block_table.close_block_tables()
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
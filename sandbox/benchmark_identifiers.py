@@ -0,0 +1,38 @@
+"""
+Benchmarks the creation of identifiers and scoreboard names, which happens for every generated score.
+
+Compares the regex validation of `Identifier` with the previous validation that checked every character in a loop.
+Run from the repository root: `python -m sandbox.benchmark_identifiers [count]`
+"""
+import sys
+from time import perf_counter
+
+from mcscript.utils.Scoreboard import encode_index
+from mcscript.utils.resources import Identifier
+
+
+def validate_loop(content: str) -> str:
+    for char in content:
+        if char not in Identifier.allowed_identifiers:
+            raise ValueError(char)
+    return str.__new__(Identifier, content)
+
+
+def measure(name: str, function, values):
+    start = perf_counter()
+    for value in values:
+        function(value)
+    print(f"{name}: {(perf_counter() - start) * 1000:.1f}ms")
+
+
+def main(count: int = 1_000_000):
+    names = [f".exp_{index % 997}_{index}" for index in range(count)]
+    print(f"{count} identifiers")
+
+    measure("character loop", validate_loop, names)
+    measure("regex", Identifier, names)
+    measure("scoreboard names", encode_index.__wrapped__, range(count))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,33 @@
+from typing import Callable, Dict
+
+import pytest
+
+from mcscript.backends.mc_datapack_backend.Datapack import Datapack
+from mcscript.compile import compileMcScript
+from mcscript.data.Config import Config
+
+
+def _compile_datapack(code: str, **options) -> Datapack:
+    config = Config()
+    for key, value in options.items():
+        setattr(config, key, value)
+    config.input_string = code
+
+    return compileMcScript(config)
+
+
+def _compile_functions(code: str, **options) -> Dict[str, str]:
+    files = _compile_datapack(code, **options).getMainDirectory().getPath("functions").files
+    return {name: files[name].getvalue() for name in files}
+
+
+@pytest.fixture()
+def compile_datapack() -> Callable[..., Datapack]:
+    """ Compiles the code with the config options and returns the datapack """
+    return _compile_datapack
+
+
+@pytest.fixture()
+def compile_functions() -> Callable[..., Dict[str, str]]:
+    """ Compiles the code with the config options and returns the contents of all functions by their file names """
+    return _compile_functions
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import zipfile
+from os import makedirs
+from os.path import join
+
+import pytest
+
+from mcscript.assets import block_table, data_generator, data_store
+from mcscript.assets.DataManager import DataManager
+from mcscript.assets.downloader import file_sha1
+
+
+def write_reports(output: str):
+    reports = join(output, "reports")
+    makedirs(reports)
+    contents = {
+        "blocks": {"minecraft:air": {"states": [{"id": 0}]}},
+        "commands": {"type": "root", "children": {}},
+        "registries": {
+            "minecraft:item": {"entries": {"minecraft:air": {"protocol_id": 0}}},
+            "minecraft:entity_type": {"entries": {"minecraft:pig": {"protocol_id": 0}}}
+        }
+    }
+    for name, content in contents.items():
+        with open(join(reports, f"{name}.json"), "w") as f:
+            json.dump(content, f)
+
+
+def write_jar(path, version: str, content: str = ""):
+    """ Writes a fake server jar that only contains the version.json """
+    with zipfile.ZipFile(path, "w") as jar:
+        jar.writestr("version.json", json.dumps({"id": version, "name": version}))
+        jar.writestr("content", content)
+
+
+def test_cached_reports(tmp_path, monkeypatch):
+    runs = []
+
+    def run_data_generator(server_jar, output):
+        runs.append(server_jar)
+        write_reports(output)
+
+    monkeypatch.setattr(data_generator, "getVersionDir", lambda version: str(tmp_path / version))
+    monkeypatch.setattr(data_generator, "runDataGenerator", run_data_generator)
+    jar = tmp_path / "server.jar"
+    write_jar(jar, "1.16.5")
+    assert file_sha1(str(jar)) == hashlib.sha1(jar.read_bytes()).hexdigest()
+
+    data = data_generator.getDataJson("1.16.5", str(jar))
+    assert data["items"] == ["minecraft:air"]
+    assert data["entities"] == ["minecraft:pig"]
+    assert set(data) == {"blocks", "commands", "registries", "items", "entities"}
+
+    # cached reports are used without a jar and for the same jar
+    data_generator.getDataJson("1.16.5")
+    data_generator.getDataJson("1.16.5", str(jar))
+    assert len(runs) == 1
+
+    write_jar(jar, "1.16.5", "other jar")
+    data_generator.getDataJson("1.16.5", str(jar))
+    assert len(runs) == 2
+
+    # the jar of another version must not replace the cached reports
+    write_jar(jar, "1.16.4")
+    with pytest.raises(ValueError):
+        data_generator.getDataJson("1.16.5", str(jar))
+    data_generator.getDataJson("1.16.5")
+    assert len(runs) == 2
+
+
+def test_shared_versions(tmp_path, monkeypatch):
+    def version_dir(version):
+        makedirs(tmp_path / version, exist_ok=True)
+        return str(tmp_path / version)
+
+    monkeypatch.setattr(data_generator, "getVersionDir", version_dir)
+    monkeypatch.setattr(data_generator, "runDataGenerator", lambda server_jar, output: write_reports(output))
+    monkeypatch.setattr(data_store, "OBJECT_DIR", str(tmp_path / "objects"))
+
+    managers = []
+    for version in ("1.16.4", "1.16.5"):
+        jar = tmp_path / f"{version}.jar"
+        write_jar(jar, version)
+        managers.append(DataManager(version, str(jar)))
+
+    first, second = managers
+    assert first.get_block_table() is second.get_block_table()
+    assert first.get_registry("minecraft:entity_type") == {"minecraft:pig": 0}
+    assert first.manifest == second.manifest
+    assert DataManager.get("1.16.4") is DataManager.get("1.16.4")
+
+    # blocks, commands, items, entities and two registries
+    stored = [path for path in (tmp_path / "objects").glob("*/*") if path.suffix != ".bin"]
+    assert len(stored) == 6
+    block_table.close_block_tables()
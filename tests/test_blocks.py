@@ -0,0 +1,103 @@
+from itertools import count
+
+import pytest
+
+from mcscript.assets import block_table, data_store
+from mcscript.assets.DataManager import DataManager
+from mcscript.data import defaultEnums
+from mcscript.data.Config import Config
+from mcscript.data.minecraft_data import blocks
+from mcscript.exceptions.exceptions import McScriptUndefinedAttributeError
+
+
+def make_report(definitions):
+    """ Creates a blocks report like the minecraft data generator with consecutive state ids """
+    report = {}
+    ids = count()
+    for name, properties in definitions.items():
+        states = 1
+        for values in properties.values():
+            states *= len(values)
+        report[f"minecraft:{name}"] = {
+            "properties": properties,
+            "states": [{"id": next(ids)} for _ in range(states)]
+        }
+    return report
+
+
+@pytest.fixture()
+def block_report():
+    blocks.loadBlocks(make_report({
+        "air": {},
+        "oak_stairs": {"facing": ["north", "south", "west", "east"], "half": ["top", "bottom"],
+                       "waterlogged": ["true", "false"]},
+        "stone": {},
+        "lever": {"face": ["floor", "wall", "ceiling"], "powered": ["true", "false"]},
+    }))
+    yield
+    blocks.BLOCKS.clear()
+
+
+def test_blockstate_indexed(block_report):
+    config = Config()
+    expected = [
+        (block, list(permutation))
+        for block in blocks.BLOCKS
+        for permutation in (block.getBlockstatePermutations() if block.blockstates else [[]])
+    ]
+
+    for index, (block, state) in enumerate(expected):
+        blockstate_block = blocks.getBlockstateIndexed(index, config)
+        assert blockstate_block.block is block
+        assert list(blockstate_block.state) == state
+        assert blocks.getBlockstateId(block, blockstate_block.state) == index
+
+    assert blocks.getBlockstateIndexed(len(expected), config) is None
+    assert blocks.getBlockstateIndexed(6, config).getMinecraftName() == \
+           "minecraft:oak_stairs[facing=south,half=top,waterlogged=false]"
+
+
+def test_block_table(block_report, tmp_path, monkeypatch):
+    monkeypatch.setattr(data_store, "OBJECT_DIR", str(tmp_path))
+    report = make_report({
+        "air": {},
+        "oak_stairs": {"facing": ["north", "south", "west", "east"], "half": ["top", "bottom"]},
+        "lever": {"face": ["floor", "wall", "ceiling"], "powered": ["true", "false"]},
+    })
+    key = data_store.put(report)
+
+    table = block_table.load_block_table(key)
+    assert block_table.load_block_table(key) is table
+    assert table.block_name(2) == "minecraft:lever"
+
+    blocks.loadBlocks(report)
+    expected = list(blocks.BLOCKS)
+    blocks.loadBlockTable(table)
+    assert blocks.BLOCKS == expected
+
+    # a closed table is mapped again
+    table.close()
+    assert table.closed
+    assert block_table.load_block_table(key).block_name(2) == "minecraft:lever"
+    block_table.close_block_tables()
+
+
+def test_lazy_enums(compile_functions, block_report, tmp_path, monkeypatch):
+    config = Config()
+    enum = defaultEnums.get("blocks", config)
+    assert enum.getAttribute(None, "lever").static_value == 18
+    assert list(enum.public_namespace) == ["lever"]
+
+    monkeypatch.setattr(data_store, "OBJECT_DIR", str(tmp_path))
+    data_manager = DataManager()
+    data_manager.manifest = {"registries": {"minecraft:sound_event": data_store.put({"entries": {
+        "minecraft:entity.pig.ambient": {"protocol_id": 3}
+    }})}}
+    monkeypatch.setattr(config, "_data_manager", data_manager)
+    sounds = defaultEnums.get("sounds", config)
+    assert sounds.getAttribute(None, "entity_pig_ambient").static_value == 3
+
+    functions = compile_functions("let a = dyn(blocks.oak_stairs)\nprint(\"{}\", a)")
+    assert "players set .exp1_0 mcscript 1\n" in functions["main.mcfunction"]
+    with pytest.raises(McScriptUndefinedAttributeError):
+        compile_functions("let a = blocks.unknown")
@@ -10,7 +10,8 @@ from mcscript.exceptions.exceptions import (McScriptUndefinedVariableError, McSc
                                             McScriptUnsupportedOperationError, McScriptDeclarationError,
                                             McScriptIfElseReturnTypeError, McScriptArgumentError, McScriptValueError,
                                             McScriptInvalidSelectorError, McScriptInlineRecursionError,
-                                            McScriptOutOfBoundsError, McScriptInvalidMarkupError)
+                                            McScriptOutOfBoundsError, McScriptInvalidMarkupError,
+                                            McScriptDivisionByZeroError)
 
 EXPECT_FAIL = [
     (
@@ -215,6 +216,22 @@ EXPECT_FAIL = [
         "@e[lalalalala=lalalalala]",
         McScriptInvalidSelectorError
     ),
+    (
+        "@s[limit=1]",
+        McScriptInvalidSelectorError
+    ),
+    (
+        "cache(@s, 20)",
+        McScriptArgumentError
+    ),
+    (
+        "cache(@e[distance=..5], 20)",
+        McScriptArgumentError
+    ),
+    (
+        "cache(@e[type=zombie,sort=nearest,limit=1], 20)",
+        McScriptArgumentError
+    ),
     (
         """
         fun is_even(number: Int) -> Bool {
@@ -295,6 +312,22 @@ EXPECT_FAIL = [
     (
         "print('[regex]test[/]')",
         McScriptInvalidMarkupError
+    ),
+    (
+        "let a = 2 * (3 + 4) / (1 - 1)",
+        McScriptDivisionByZeroError
+    ),
+    (
+        "lut('sqrt', dyn(1), -10, 10, 1)",
+        McScriptArgumentError
+    ),
+    (
+        "lut('exp', dyn(1), 0, 1000, 1)",
+        McScriptArgumentError
+    ),
+    (
+        "lut('exp', 1, 0, 1000, 1)",
+        McScriptArgumentError
     )
 
 ]
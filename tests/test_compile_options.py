@@ -0,0 +1,301 @@
+import json
+import os
+
+import pytest
+
+from mcscript.data.Config import Config, load_config_values
+from mcscript.exceptions.exceptions import McScriptInvalidSelectorError
+
+CODE = """
+fun on_tick() {
+    print("tick")
+}
+print("loaded")
+"""
+
+
+def test_profile(compile_functions):
+    functions = compile_functions(CODE, is_profile=True)
+
+    assert "profile_dump.mcfunction" in functions
+    assert "scoreboard players add tick " in functions["tick.mcfunction"]
+    assert "time query gametime" in functions["load.mcfunction"]
+    # runtime functions are not profiled
+    assert "scoreboard players add load " not in functions["load.mcfunction"]
+
+
+def test_profile_disabled_in_release(compile_functions):
+    functions = compile_functions(CODE, is_release=True, is_profile=True)
+
+    assert "profile_dump.mcfunction" not in functions
+    assert "scoreboard players add tick " not in functions["tick.mcfunction"]
+
+
+def test_source_map(compile_datapack):
+    datapack = compile_datapack(CODE, input_path="/tmp/main.mcscript")
+    source_map = json.loads(datapack.getPath("mcscript.sourcemap.json").getvalue())
+
+    assert source_map["source"] == "main.mcscript"
+    # the print call in on_tick is written to the second line, after the source comment
+    assert source_map["functions"]["mcscript:tick"] == [[2, 3, 5]]
+
+    tick = datapack.getMainDirectory().getPath("functions").files["tick.mcfunction"].getvalue()
+    assert tick.startswith("# main.mcscript:3\n")
+
+
+def test_source_map_release(compile_datapack):
+    datapack = compile_datapack(CODE, is_release=True)
+    source_map = json.loads(datapack.getPath("mcscript.sourcemap.json").getvalue())
+
+    assert source_map["functions"]["mcscript:tick"] == [[1, 3, 5]]
+
+    tick = datapack.getMainDirectory().getPath("functions").files["tick.mcfunction"].getvalue()
+    assert "#" not in tick
+
+
+def test_stable_names(compile_functions):
+    code = """
+    fun on_tick() {
+        let a = dyn(1)
+        while a < 10 {
+            a += 1
+        }
+        print("{}", a)
+    }
+    """
+    prefix = """
+    let b = dyn(2)
+    if b == 2 {
+        b += 1
+    }
+    """
+
+    def strip_comments(text: str) -> str:
+        return "\n".join(line for line in text.split("\n") if not line.startswith("#"))
+
+    functions = compile_functions(code)
+    changed_functions = compile_functions(prefix + code)
+
+    assert strip_comments(functions["tick.mcfunction"]) == strip_comments(changed_functions["tick.mcfunction"])
+    for name in functions:
+        if name.startswith("block_"):
+            assert name in changed_functions
+
+
+def test_constant_pool(compile_functions):
+    functions = compile_functions("""
+    let a = dyn(3)
+    a *= 2
+    a *= 3
+    a /= 1000
+    print("{}", a)
+    """)
+
+    main = functions["main.mcfunction"]
+    # a multiplication by two does not need a constant
+    assert "*= #2 " not in main
+    assert "scoreboard players operation .exp1_0 mcscript += .exp1_0 mcscript" in main
+    assert "*= #3 mcscript.const" in main
+    assert "scoreboard players set #1000 mcscript.const 1000" in functions["init_constants.mcfunction"]
+    # the constants are only initialized if they do not have the correct value yet
+    assert "execute unless score #mcscript.pool mcscript.const matches " in functions["load.mcfunction"]
+
+
+def test_for_loop_memoization(compile_functions):
+    functions = compile_functions("""
+    let a = dyn(1)
+    let b = dyn(2)
+    for i in (a, b) {
+        print("{}", i * 2)
+    }
+    """)
+
+    # the body is compiled once and called for both elements
+    assert len([name for name in functions if name.startswith("block_")]) == 1
+    assert functions["main.mcfunction"].count("function mcscript:block_") == 2
+
+
+def test_for_loop_unroll_budget(compile_functions):
+    code = """
+    let sum = 0
+    for i in (1, 4, 7, 10) {
+        sum += i
+    }
+    print("{}", sum)
+    """
+
+    assert 'tellraw @s [{"text": "22"}]' in compile_functions(code)["main.mcfunction"]
+
+    functions = compile_functions(code, unroll_budget=2)
+    loop = next(text for name, text in functions.items() if name.startswith("block_"))
+    assert "scoreboard players add " in loop
+    assert "matches 1..10 run function mcscript:block_" in loop
+
+
+def test_function_specialization(compile_functions):
+    functions = compile_functions("""
+    fun square(value: Int) -> Int {
+        value * value
+    }
+    let a = dyn(2)
+    let b = dyn(3)
+    print("{} {} {}", square(a), square(b), square(a + b))
+    """)
+
+    main = functions["main.mcfunction"]
+    # the first call is generated as usual, the other calls share one function
+    assert main.count("*=") == 1
+    assert main.count("function mcscript:block_") == 2
+
+
+def test_recursive_function(compile_functions):
+    functions = compile_functions("""
+    fun factorial(n: Int) -> Int {
+        if n <= 1 {
+            1
+        } else {
+            n * factorial(n - 1)
+        }
+    }
+    print("{}", factorial(dyn(5)))
+    """)
+
+    body = next(text for text in functions.values() if "data remove storage" in text)
+    # the scores of the caller are saved before the recursive call and restored afterwards
+    assert body.index("state.frames append value {}") < body.index("function mcscript:block_")
+    assert body.index("function mcscript:block_") < body.index("data remove storage mcscript:main state.frames[-1]")
+
+
+def test_runtime_function(compile_functions):
+    code = """
+    fun f(value: Int) -> Int {
+        let x = value + 1
+        x * 3
+    }
+    let a = dyn(5)
+    print("{} {} {}", f(a), f(3), f(4))
+    """
+
+    assert "function mcscript:block_" not in compile_functions(code)["main.mcfunction"]
+
+    # larger functions are inlined at the first call and called at runtime afterwards, even with static arguments
+    main = compile_functions(code, inline_limit=5)["main.mcfunction"]
+    assert main.count("*=") == 1
+    assert main.count("function mcscript:block_") == 2
+
+
+def test_lookup_table(compile_functions):
+    functions = compile_functions("""
+    let a = dyn(30)
+    print("{} {} {}", lut("sin", a, 0, 90, 10), lut("sin", a + 5, 0, 90, 10), lut("sqrt", 16.0, 0, 100, 1))
+    """)
+
+    main = functions["main.mcfunction"]
+    # static values are looked up at compile time
+    assert '{"text": " 4.0"}' in main
+    # both lookups share the same table with ten entries
+    assert main.count("function mcscript:lut_") == 2
+    tables = [text for name, text in functions.items() if name.startswith("lut_")]
+    assert len(tables) == 9
+    assert sum(text.count("scoreboard players set") for text in tables) == 10
+
+
+def test_config_file(tmp_path):
+    path = tmp_path / "config.config"
+    config = Config(str(path))
+    assert path.exists()
+    assert config.values == Config().values
+
+    path.write_text("[main]\nname = pack\nrelease = True\nunroll_budget = 4\n")
+    os.utime(path, (0, 1))
+    config = Config(str(path))
+    assert (config.project_name, config.is_release, config.unroll_budget) == ("pack", True, 4)
+    assert Config(str(path)).values is config.values
+
+    # setters replace the shared values
+    config.inline_limit = 3
+    assert Config(str(path)).inline_limit == 64
+
+    path.write_text("[main]\nserver_jar = jars/server.jar\n")
+    os.utime(path, (0, 2))
+    assert load_config_values(str(path)).server_jar == str(tmp_path / "jars" / "server.jar")
+
+    path.write_text("[scoreboards]\nmain = a_very_long_scoreboard\n")
+    os.utime(path, (0, 3))
+    with pytest.raises(ValueError):
+        Config(str(path))
+
+
+def test_selector_versions(compile_functions):
+    compile_functions("@e[limit=1,predicate=\"test:a\"]")
+    compile_functions("@e[predicate=\"test:a\"]", minecraft_version="1.15.2")
+    with pytest.raises(McScriptInvalidSelectorError):
+        compile_functions("@e[predicate=\"test:a\"]", minecraft_version="1.14.4")
+
+
+def test_selector_optimizer(compile_functions):
+    main = compile_functions("""
+        run for @e[tag=a,type=player,distance=..5] { print("a") }
+        run for @e[nbt={a:1b}] { print("b") }
+        run for @e[nbt={a:1b}] { print("c") }
+    """)["main.mcfunction"]
+    # @a would also run the body for dead players
+    assert "execute as @e[distance=..5,type=player,tag=a] run" in main
+
+    tag = "tag @e[nbt={a:1b}] add "
+    assert main.count(tag) == 1
+    name = main.split(tag)[1].split()[0]
+    assert main.count(f"execute as @e[tag={name}] run") == 2
+    assert main.index(tag) < main.index(f"tag @e[tag={name}] remove {name}")
+
+
+def test_selector_cache(compile_functions):
+    functions = compile_functions("""
+        let glowing = cache(@e[nbt={Glowing: 1b}], 20)
+        run for glowing { print("a") }
+        run for cache(@e[nbt={Glowing: 1b}], 20) { print("b") }
+    """)
+    refresh = [text for name, text in functions.items() if name.startswith("cache_")]
+    # both calls share the same cache, which is refreshed every 20 ticks
+    assert len(refresh) == 1
+    assert "tag @e[nbt={Glowing: 1b}] add mcs_cache_" in refresh[0]
+    assert " 20t" in refresh[0]
+
+    tag = refresh[0].split(" add ")[1].split()[0]
+    assert functions["main.mcfunction"].count(f"execute as @e[tag={tag}] run") == 2
+    # the refresh is started once on load
+    assert functions["main.mcfunction"].count("function mcscript:cache_") == 1
+
+
+def test_selector_cache_on_tick(compile_functions):
+    functions = compile_functions("""
+        fun on_tick() {
+            run for cache(@e[nbt={Glowing: 1b}], 20) { print("a") }
+        }
+    """)
+    # the tick function only uses the tag, the refresh schedules itself
+    assert "function mcscript:cache_" not in functions["tick.mcfunction"]
+    assert "mcs_cache_" in functions["tick.mcfunction"]
+    assert "function mcscript:cache_" in functions["main.mcfunction"]
+
+    # without an interval, every use refreshes the cache
+    functions = compile_functions("""
+        fun on_tick() {
+            run for cache(@e[nbt={Glowing: 1b}], 0) { print("a") }
+        }
+    """)
+    assert "tag @e[nbt={Glowing: 1b}] add mcs_cache_" in functions["tick.mcfunction"]
+    assert "schedule" not in "".join(functions.values())
+
+
+@pytest.mark.parametrize("context", ["for @a at @s", "relative 10, 0, 0"])
+@pytest.mark.parametrize("selector", ["@e[nbt={a:1b},distance=..5]", "@e[nbt={a:1b}]"])
+def test_selector_optimizer_context(compile_functions, context, selector):
+    functions = compile_functions(f"""
+        run {context} {{
+            run for {selector} {{ print("a") }}
+        }}
+        run for {selector} {{ print("b") }}
+    """)
+    # the selector is evaluated in different contexts, so it must not be replaced by a tag
+    assert not any("mcs_sel_" in text for text in functions.values())
@@ -0,0 +1,35 @@
+from mcscript.analyzer.VariableContext import NamespaceContext
+from mcscript.compiler.Context import Context
+from mcscript.compiler.ContextType import ContextType
+from mcscript.lang.resource.IntegerResource import IntegerResource
+from mcscript.utils.Scoreboard import Scoreboard
+from mcscript.utils.resources import DataPath, ResourceSpecifier
+
+
+def make_context(predecessor: Context = None) -> Context:
+    index = 0 if predecessor is None else predecessor.index + 1
+    return Context(index, (index, 0), ContextType.BLOCK, NamespaceContext((index, 0)), Scoreboard("main", True, 0),
+                   DataPath(ResourceSpecifier("mcscript", "main"), ["state"]), predecessor)
+
+
+def test_cached_lookup_is_invalidated():
+    outer = make_context()
+    middle = make_context(outer)
+    inner = make_context(middle)
+
+    outer.add_var("a", IntegerResource(1, None))
+    assert inner.find_resource("a").static_value == 1
+    assert "b" not in inner
+
+    # shadows the cached variable of the outer context
+    middle.add_var("a", IntegerResource(2, None))
+    middle.add_var("b", IntegerResource(3, None))
+    assert inner.find_resource("a").static_value == 2
+    assert "b" in inner
+
+    inner.set_var("a", IntegerResource(4, None))
+    assert middle.find_resource("a").static_value == 4
+    assert outer.find_resource("a").static_value == 1
+
+    assert inner.resources()["b"].static_value == 3
+    assert inner.as_dict().keys() == {"a", "b"}
@@ -0,0 +1,99 @@
+import asyncio
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mcscript.assets import downloader
+
+CONTENT = bytes(range(256)) * 40
+
+
+class Handler(BaseHTTPRequestHandler):
+    """ Serves `CONTENT` with range requests and can drop a connection after some bytes """
+    requests = []
+    drop_after = None
+    ranges = True
+
+    def do_GET(self):
+        Handler.requests.append(self.headers.get("Range"))
+        start, end = 0, len(CONTENT)
+        if self.headers.get("Range") and Handler.ranges:
+            first, last = self.headers["Range"][len("bytes="):].split("-")
+            start, end = int(first), int(last) + 1 if last else len(CONTENT)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{len(CONTENT)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start))
+        self.end_headers()
+
+        body = CONTENT[start:end]
+        if Handler.drop_after is not None:
+            body, Handler.drop_after = body[:Handler.drop_after], None
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def server():
+    Handler.requests, Handler.drop_after, Handler.ranges = [], None, True
+    http_server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=http_server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{http_server.server_port}/server.jar"
+    http_server.shutdown()
+    http_server.server_close()
+
+
+def download(url, path, **kwargs):
+    progress = []
+    asyncio.run(downloader.download_file(url, str(path), progress=progress.append, **kwargs))
+    return sum(progress)
+
+
+def test_parallel_download(server, tmp_path):
+    sha1 = hashlib.sha1(CONTENT).hexdigest()
+    assert download(server, tmp_path / "server.jar", sha1=sha1, part_size=1000) == len(CONTENT)
+    assert (tmp_path / "server.jar").read_bytes() == CONTENT
+    assert not list(tmp_path.glob("*.part*"))
+    # the size probe and one request per part
+    assert len(Handler.requests) == 1 + 11
+    assert "bytes=10000-10239" in Handler.requests
+
+
+def test_resume_download(server, tmp_path):
+    (tmp_path / "server.jar.part1").write_bytes(CONTENT[1000:1500])
+    Handler.drop_after = 300
+    download(server, tmp_path / "server.jar", size=len(CONTENT), part_size=1000, connections=1)
+
+    assert (tmp_path / "server.jar").read_bytes() == CONTENT
+    # the dropped connection and the partial part file are resumed
+    assert Handler.requests[:3] == ["bytes=0-999", "bytes=300-999", "bytes=1500-1999"]
+
+
+def test_download_without_ranges(server, tmp_path):
+    Handler.ranges = False
+    download(server, tmp_path / "server.jar", part_size=1000)
+    assert (tmp_path / "server.jar").read_bytes() == CONTENT
+    assert Handler.requests == ["bytes=0-0", None]
+
+
+def test_download_without_ranges_retry(server, tmp_path):
+    Handler.ranges, Handler.drop_after = False, 300
+    progress = []
+    downloader.download_part(server, str(tmp_path / "server.jar"), 0, None, progress.append)
+
+    # the truncated response is detected by its content length and downloaded again
+    assert (tmp_path / "server.jar").read_bytes() == CONTENT
+    assert sum(progress) == len(CONTENT)
+    assert Handler.requests == [None, None]
+
+
+def test_download_checksum(server, tmp_path):
+    with pytest.raises(ConnectionError):
+        download(server, tmp_path / "server.jar", sha1="0" * 40)
+    assert not list(tmp_path.iterdir())
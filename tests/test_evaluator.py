@@ -0,0 +1,49 @@
+import pytest
+
+from mcscript.ir.command_components import BinaryOperator
+from mcscript.lang import evaluator
+from mcscript.lang.evaluator import evaluate, evaluate_array, INT_MAX, INT_MIN
+
+PLUS, MINUS, TIMES, DIVIDE, MODULO = BinaryOperator
+
+
+@pytest.mark.parametrize("expression, result", [
+    ([INT_MAX, PLUS, 1], INT_MIN),
+    ([INT_MIN, MINUS, 1], INT_MAX),
+    ([65536, TIMES, 65536], 0),
+    ([INT_MIN, DIVIDE, -1], INT_MIN),
+    ([-7, DIVIDE, 2], -4),
+    ([-7, MODULO, 2], 1),
+    ([7, MODULO, -2], -1),
+    ([2, TIMES, [3, PLUS, 4], MINUS, 1], 13),
+])
+def test_evaluate(expression, result):
+    assert evaluate(expression) == result
+
+
+def test_evaluate_fixed():
+    assert evaluate([1500, TIMES, 2500], fixed_base=1000) == 3750
+    assert evaluate([1000, DIVIDE, 3000], fixed_base=1000) == 333
+    assert evaluate([-1000, DIVIDE, 3000], fixed_base=1000) == -334
+
+
+def test_division_by_zero():
+    with pytest.raises(ZeroDivisionError):
+        evaluate([1, DIVIDE, [2, MINUS, 2]])
+    with pytest.raises(ZeroDivisionError):
+        evaluate([1, MODULO, 0])
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_evaluate_array(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(evaluator, "numpy", None)
+
+    values = list(range(-5, 95))
+    expression = [values, TIMES, 1000, DIVIDE, [values, PLUS, 7], MODULO, 17]
+
+    expected = [evaluate([value, TIMES, 1000, DIVIDE, [value, PLUS, 7], MODULO, 17]) for value in values]
+    assert evaluate_array(expression) == expected
+    assert evaluate_array([INT_MAX, PLUS, (1, 2)]) == [INT_MIN, INT_MIN + 1]
@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from lark.exceptions import LarkError
 
@@ -236,3 +238,19 @@ def test_fail(sample):
     except LarkError:
         return True
     pytest.fail(f"Successfully parsed code that should fail")
+
+
+def test_parse_events_per_thread():
+    grammar = get_grammar()
+    parse_events = grammar.options.transformer
+    samples = [f"let a = 1\n" * count + "if a == 1 { let b = a }" for count in range(1, 20)]
+    expected = [len(parse_events.parse(grammar, sample)[1]) for sample in samples]
+
+    # the parser is shared, but the events of each parse are not
+    with ThreadPoolExecutor(4) as executor:
+        events = executor.map(lambda sample: len(parse_events.parse(grammar, sample)[1]), samples * 4)
+        assert list(events) == expected * 4
+
+    # a plain parse does not keep its events
+    grammar.parse(samples[-1])
+    assert getattr(parse_events._local, "finished_events", None) is None
@@ -0,0 +1,109 @@
+from mcscript.backends.mc_datapack_backend.McDatapackBackend import McDatapackBackend
+from mcscript.data.Config import Config
+from mcscript.ir.IrMaster import IrMaster
+from mcscript.data.minecraft_data.blocks import Block, Blockstate, BlockstateBlock
+from mcscript.ir.command_components import Position
+from mcscript.ir.components import StoreVarNode, MergeVarNode, KillNode, MessageNode, SetBlockNode, SummonNode
+from mcscript.data.selector.Selector import Selector
+from mcscript.utils.resources import DataPath, ResourceSpecifier, ScoreboardValue, Identifier
+from mcscript.utils.Scoreboard import Scoreboard
+
+
+def generate(config: Config, ir_master: IrMaster) -> str:
+    ir_master.optimize()
+    datapack = McDatapackBackend(config, ir_master).generate()
+    return datapack.getMainDirectory().getPath("functions").files["main.mcfunction"].getvalue()
+
+
+def test_storage_batching():
+    config = Config()
+    storage = ResourceSpecifier("mcscript", "main")
+    score = ScoreboardValue(Identifier("a"), Scoreboard("mcscript", True, 0))
+
+    ir_master = IrMaster()
+    with ir_master.with_function(config.resource_specifier_main("main")) as main:
+        ir_master.append_all(
+            StoreVarNode(DataPath(storage, ["state", "a"]), 1),
+            StoreVarNode(DataPath(storage, ["state", "b", "c"]), 2),
+            StoreVarNode(DataPath(storage, ["state", "b", "d"]), 3),
+            # conflicts with state.a
+            StoreVarNode(DataPath(storage, ["state", "a", "x"]), 4),
+            StoreVarNode(DataPath(storage, ["state", "e"]), score),
+            KillNode(Selector("e", []))
+        )
+
+    lines = generate(config, ir_master).split("\n")
+    assert isinstance(main.inner_nodes[0], MergeVarNode)
+    assert lines[:4] == [
+        "data modify storage mcscript:main state merge value {a:1,b:{c:2,d:3}}",
+        "data modify storage mcscript:main state.a.x set value 4",
+        "execute store result storage mcscript:main state.e int 1 run scoreboard players get a mcscript",
+        "kill @e"
+    ]
+
+
+def test_storage_batching_root():
+    config = Config()
+    storage = ResourceSpecifier("mcscript", "main")
+
+    ir_master = IrMaster()
+    with ir_master.with_function(config.resource_specifier_main("main")):
+        ir_master.append_all(
+            StoreVarNode(DataPath(storage, ["a"]), 1),
+            StoreVarNode(DataPath(storage, ["b"]), 2),
+        )
+
+    assert generate(config, ir_master).startswith("data merge storage mcscript:main {a:1,b:2}\n")
+
+
+def test_interned_values():
+    storage = ResourceSpecifier("mcscript", "main")
+    scoreboard = Scoreboard("mcscript", True, 0)
+
+    assert ScoreboardValue(Identifier("a"), scoreboard) is ScoreboardValue(Identifier("a"), scoreboard)
+    assert ScoreboardValue(Identifier("a"), scoreboard) is not ScoreboardValue(Identifier("b"), scoreboard)
+    assert ScoreboardValue(Identifier("a"), scoreboard) is not \
+           ScoreboardValue(Identifier("a"), Scoreboard("mcscript", True, 0))
+
+    path = DataPath(storage, ["state", "a"])
+    assert path is DataPath(storage, ("state", "a"))
+    assert path + "b" is DataPath(storage, ["state", "a", "b"])
+    assert path.last_element_indexed(0).dotted_path() == "state.a[0]"
+    assert len({path, DataPath(storage, ["state", "a"])}) == 1
+
+
+def test_player_selectors():
+    config = Config()
+    players = Selector.from_string("@e[type=player,tag=a]")
+
+    ir_master = IrMaster()
+    with ir_master.with_function(config.resource_specifier_main("main")):
+        ir_master.append_all(
+            MessageNode(MessageNode.MessageType.CHAT, '"a"', players),
+            KillNode(players)
+        )
+
+    lines = generate(config, ir_master).split("\n")
+    # a message to dead players does nothing, but only @e excludes them for other commands
+    assert lines[:2] == ['tellraw @a[tag=a] "a"', "kill @e[type=player,tag=a]"]
+
+
+def test_world_nodes():
+    config = Config()
+    facing = Blockstate("facing", ["north", "south"])
+    chest = BlockstateBlock(Block("minecraft:chest", "chest", 0, [facing]), [facing.getValues()[1]])
+    stone = BlockstateBlock(Block("minecraft:stone", "stone", 2), [])
+
+    ir_master = IrMaster()
+    with ir_master.with_function(config.resource_specifier_main("main")):
+        ir_master.append_all(
+            SetBlockNode(Position.absolute(1, 2, 3), stone),
+            SetBlockNode(Position.relative(0, 1, 0), chest, '{Lock:"key"}'),
+            SummonNode("minecraft:pig", Position.local(0, 0, 2))
+        )
+
+    assert generate(config, ir_master).split("\n")[:3] == [
+        "setblock 1 2 3 minecraft:stone",
+        'setblock ~0 ~1 ~0 minecraft:chest[facing=south]{Lock:"key"}',
+        "summon minecraft:pig ^0 ^0 ^2"
+    ]